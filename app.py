@@ -3,58 +3,157 @@ import logging
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
-from flask_mail import Mail
 from werkzeug.middleware.proxy_fix import ProxyFix
-from werkzeug.security import generate_password_hash
 from sqlalchemy.orm import DeclarativeBase
-from pinger import start_pinger  # import the ping logic
+from services.read_replicas import RoutingSession
 from flask import request  # only if you need to access POST/GET data
 from flask import jsonify  # only if you want to return JSON
 
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (DEBUG floods worker logs, so it is opt-in)
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper())
 
 class Base(DeclarativeBase):
     pass
 
 # Initialize extensions
-db = SQLAlchemy(model_class=Base)
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
 login_manager = LoginManager()
-mail = Mail()
 
 
 def create_app():
     app = Flask(__name__)
     
+    # Stream uploads to disk with type sniffing and per-type size limits
+    from services.upload_service import IngestRequest
+    app.request_class = IngestRequest
+    
     # Configuration
     app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
     
     # Database configuration
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "postgresql://localhost/skillbridge")
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
-    }
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     
+    # Connection pool per worker: DIRECT (Postgres) or PGBOUNCER (transaction pooling);
+    # unset sizes follow GUNICORN_PROFILE/GUNICORN_THREADS. Keep
+    # workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres max_connections
+    app.config['DB_POOL_MODE'] = os.environ.get('DB_POOL_MODE', 'DIRECT').upper()
+    app.config['DB_POOL_SIZE'] = int(os.environ['DB_POOL_SIZE']) if os.environ.get('DB_POOL_SIZE') else None
+    app.config['DB_MAX_OVERFLOW'] = int(os.environ['DB_MAX_OVERFLOW']) if os.environ.get('DB_MAX_OVERFLOW') else None
+    app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+    app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 300))
+    app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', 'false').lower() == 'true'
+    app.config['DB_PGBOUNCER_NULLPOOL'] = os.environ.get('DB_PGBOUNCER_NULLPOOL', 'true').lower() == 'true'
+    from services.db_pool import DatabasePool
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = DatabasePool.engine_options(app.config)
+    
+    # Read replicas (comma-separated URLs) for @replica_reads views; a client reads
+    # from the primary for REPLICA_STICKY_SECONDS after its own writes
+    app.config['DATABASE_REPLICA_URLS'] = [u.strip() for u in os.environ.get(
+        'DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+    app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    app.config['REPLICA_CHECK_INTERVAL'] = int(os.environ.get('REPLICA_CHECK_INTERVAL', 5))
+    app.config['REPLICA_RETRY_SECONDS'] = int(os.environ.get('REPLICA_RETRY_SECONDS', 30))  # skip a failed replica this long
+    from services.read_replicas import ReadReplicas
+    app.config['SQLALCHEMY_BINDS'] = ReadReplicas.binds(
+        app.config, lambda url: DatabasePool.engine_options({**app.config, 'SQLALCHEMY_DATABASE_URI': url}))
+    
     # Mail configuration
-    app.config['MAIL_SERVER'] = 'smtp.gmail.com'
-    app.config['MAIL_PORT'] = 587
-    app.config['MAIL_USE_TLS'] = True
+    app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
+    app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
+    app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'true').lower() == 'true'
     app.config['MAIL_USERNAME'] = os.environ.get('EMAIL')
     app.config['MAIL_PASSWORD'] = os.environ.get('APPPASSWORD')
     app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('EMAIL')
     
     # File upload configuration
     app.config['UPLOAD_FOLDER'] = 'uploads'
-    app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+    app.config['MAX_CONTENT_LENGTH'] = 64 * 1024 * 1024  # 64MB per request; per-file limits below
+    app.config['UPLOAD_LIMITS'] = {
+        'IMAGE': 10 * 1024 * 1024,  # 10MB
+        'VIDEO': 50 * 1024 * 1024,  # 50MB
+    }
+    app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))  # Background resize threads
+    
+    # Storage backend for uploads: LOCAL (uploads folder) or S3 (AWS S3, MinIO, R2...)
+    app.config['STORAGE_BACKEND'] = os.environ.get('STORAGE_BACKEND', 'LOCAL').upper()
+    app.config['S3_BUCKET'] = os.environ.get('S3_BUCKET')
+    app.config['S3_ENDPOINT_URL'] = os.environ.get('S3_ENDPOINT_URL')  # e.g. http://minio:9000
+    app.config['S3_REGION'] = os.environ.get('S3_REGION')
+    app.config['S3_ACCESS_KEY_ID'] = os.environ.get('S3_ACCESS_KEY_ID')
+    app.config['S3_SECRET_ACCESS_KEY'] = os.environ.get('S3_SECRET_ACCESS_KEY')
+    app.config['S3_PUBLIC_BASE_URL'] = os.environ.get('S3_PUBLIC_BASE_URL')  # CDN/public bucket; presigned URLs if unset
+    app.config['S3_PRESIGN_EXPIRY'] = int(os.environ.get('S3_PRESIGN_EXPIRY', 3600))
+    
+    # Who streams local /uploads/ files: DIRECT (worker), X_ACCEL (nginx) or X_SENDFILE (Apache)
+    app.config['UPLOAD_SERVE_MODE'] = os.environ.get('UPLOAD_SERVE_MODE', 'DIRECT').upper()
+    app.config['UPLOAD_ACCEL_PREFIX'] = os.environ.get('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')
+    
+    # Plan catalogue refresh interval (seconds) for changes made by other workers
+    app.config['PLAN_CATALOGUE_TTL'] = int(os.environ.get('PLAN_CATALOGUE_TTL', 300))
+    
+    # How long a CDN / nginx micro-cache may keep anonymous profile and browse pages
+    app.config['HTTP_SHARED_CACHE_SECONDS'] = int(os.environ.get('HTTP_SHARED_CACHE_SECONDS', 60))
+    
+    # Rendered fragment cache (profile cards); CACHE_REDIS_URL shares it between workers
+    app.config['CACHE_REDIS_URL'] = os.environ.get('CACHE_REDIS_URL')
+    app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('FRAGMENT_CACHE_SIZE', 2000))
+    app.config['FRAGMENT_CACHE_TTL'] = int(os.environ.get('FRAGMENT_CACHE_TTL', 300))
+    
+    # Full-page cache for anonymous homepage/about/help center (seconds fresh, then served stale)
+    app.config['PAGE_CACHE_ENABLED'] = os.environ.get('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+    app.config['PAGE_CACHE_TTL'] = int(os.environ.get('PAGE_CACHE_TTL', 60))
+    app.config['PAGE_CACHE_STALE'] = int(os.environ.get('PAGE_CACHE_STALE', 300))
+    
+    # Seconds a logged-in user's row is reused by the user loader (0 disables)
+    app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 30))
+    
+    # Signed admin session tokens: lifetime, revocation list refresh and expired-row purge
+    app.config['ADMIN_SESSION_HOURS'] = int(os.environ.get('ADMIN_SESSION_HOURS', 2))
+    app.config['ADMIN_REVOCATION_REFRESH'] = int(os.environ.get('ADMIN_REVOCATION_REFRESH', 30))
+    app.config['ADMIN_SESSION_PURGE_INTERVAL'] = int(os.environ.get('ADMIN_SESSION_PURGE_INTERVAL', 3600))
+    
+    # Daraja API base URL override (e.g. the fake Daraja in loadtest_fakes.py)
+    app.config['MPESA_API_BASE_URL'] = os.environ.get('MPESA_API_BASE_URL', '')
+    
+    # Per-request query/template/latency instrumentation
+    app.config['REQUEST_DEBUG_HEADERS'] = os.environ.get('REQUEST_DEBUG_HEADERS', 'false').lower() == 'true'
+    app.config['SLOW_REQUEST_MS'] = int(os.environ.get('SLOW_REQUEST_MS', 1000))  # 0 disables the slow-request dump
+    
+    # Sampling profiler: share of requests captured, sample interval, captures kept
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.0))
+    app.config['PROFILE_INTERVAL_MS'] = int(os.environ.get('PROFILE_INTERVAL_MS', 5))
+    app.config['PROFILE_BUFFER_SIZE'] = int(os.environ.get('PROFILE_BUFFER_SIZE', 200))
+    app.config['RELEASE_VERSION'] = os.environ.get('RELEASE_VERSION', '')
+    
+    # Prometheus /metrics: client networks allowed without an admin session (none by
+    # default: behind a same-host proxy every request comes from 127.0.0.1)
+    app.config['METRICS_ALLOWED_NETWORKS'] = [n.strip() for n in os.environ.get(
+        'METRICS_ALLOWED_NETWORKS', '').split(',') if n.strip()]
+    
+    # gzip/brotli compression of HTML/JSON responses (disable if the proxy compresses)
+    app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', 'true').lower() == 'true'
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    app.config['COMPRESS_GZIP_LEVEL'] = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    app.config['COMPRESS_BROTLI_QUALITY'] = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    if app.config['COMPRESS_ENABLED']:
+        from services.compression import CompressionMiddleware
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            min_size=app.config['COMPRESS_MIN_SIZE'],
+            gzip_level=app.config['COMPRESS_GZIP_LEVEL'],
+            brotli_quality=app.config['COMPRESS_BROTLI_QUALITY'],
+        )
     
     # Initialize extensions with app
     db.init_app(app)
+    DatabasePool.init_app(app)
+    ReadReplicas.init_app(app)
     login_manager.init_app(app)
-    mail.init_app(app)
+    # Flask-Mail is set up by EmailService.mail() on the first email
     
     # Login manager configuration
     login_manager.login_view = 'auth.login'
@@ -62,8 +161,30 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        from models import User
-        return User.query.get(int(user_id))
+        from services.identity_cache import IdentityCache
+        return IdentityCache.load_user(user_id)
+    
+    @app.errorhandler(413)
+    def upload_too_large(error):
+        from flask import flash, redirect, url_for
+        flash(error.description if error.description else 'Upload is too large.', 'error')
+        return redirect(request.referrer or url_for('public.index'))
+    
+    @app.template_filter('media_url')
+    def media_url_filter(url, provider=None):
+        from services.media_storage import MediaStorage
+        return MediaStorage.media_url(url, provider)
+    
+    from services.request_metrics import RequestMetrics
+    RequestMetrics.init_app(app)
+    from services.metrics import Metrics
+    Metrics.init_app(app)
+    from services.request_profiler import RequestProfiler
+    RequestProfiler.init_app(app)
+    
+    # Fingerprinted, precompressed static bundles (see build_assets.py)
+    from services.static_assets import StaticAssets
+    StaticAssets.init_app(app)
     
     # Add context processor for current year
     @app.context_processor
@@ -96,213 +217,11 @@ def create_app():
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(billing_bp, url_prefix='/billing')
     
-    # Create database tables
-    with app.app_context():
-        import models
-        db.create_all()
-        
-        # Create default admin settings
-        from models import AdminSettings, MPesaEnvironment
-        if not AdminSettings.query.first():
-            admin_settings = AdminSettings()
-            admin_settings.media_photos_enabled = True
-            admin_settings.media_videos_enabled = False
-            admin_settings.global_override_enabled = True  # Start with free access
-            admin_settings.mpesa_env = MPesaEnvironment.SANDBOX
-            admin_settings.mpesa_company_name = 'SkillBridge Africa'
-            db.session.add(admin_settings)
-            db.session.commit()
-            
-        # Create dummy profiles if none exist
-        from models import User, Profile
-        if Profile.query.count() == 0:
-            create_dummy_profiles()
+    # Schema changes and seed data are applied by `manage.py db upgrade` and
+    # `manage.py seed`, so building the app touches no database and is safe
+    # to run once in a preloading gunicorn master
     
     return app
 
-def create_dummy_profiles():
-    """Create 10 dummy placeholder profiles for demonstration"""
-    from models import User, Profile, UserRole, ProfileType, AvailabilityStatus, RateType, UrgencyLevel
-    import random
-    
-    # Sample data for dummy profiles
-    professional_data = [
-        {
-            "email": "demo.plumber@example.com",
-            "title": "Expert Plumber - Example Profile",
-            "category": "Plumbing",
-            "bio": "This is a demonstration profile. Professional plumbing services with 10+ years experience.",
-            "location_country": "Kenya",
-            "location_county": "Nairobi",
-            "location_town": "Westlands",
-            "tags": "plumbing,repairs,installation,emergency",
-            "years_experience": 10,
-            "rate_type": "hourly",
-            "rate_value": 1500
-        },
-        {
-            "email": "demo.electrician@example.com", 
-            "title": "Licensed Electrician - Example Profile",
-            "category": "Electrical",
-            "bio": "This is a demonstration profile. Certified electrical contractor for residential and commercial projects.",
-            "location_country": "Kenya",
-            "location_county": "Mombasa",
-            "location_town": "Nyali",
-            "tags": "electrical,wiring,installation,repair",
-            "years_experience": 8,
-            "rate_type": "daily",
-            "rate_value": 5000
-        },
-        {
-            "email": "demo.mason@example.com",
-            "title": "Master Mason - Example Profile", 
-            "category": "Masonry",
-            "bio": "This is a demonstration profile. Skilled in stonework, brickwork, and concrete construction.",
-            "location_country": "Kenya",
-            "location_county": "Kiambu",
-            "location_town": "Thika",
-            "tags": "masonry,construction,stonework,concrete",
-            "years_experience": 15,
-            "rate_type": "fixed",
-            "rate_value": 50000
-        },
-        {
-            "email": "demo.tutor@example.com",
-            "title": "Mathematics Tutor - Example Profile",
-            "category": "Education",
-            "bio": "This is a demonstration profile. Experienced mathematics teacher offering private tutoring.",
-            "location_country": "Kenya", 
-            "location_county": "Nakuru",
-            "location_town": "Nakuru Town",
-            "tags": "mathematics,tutoring,education,algebra",
-            "years_experience": 5,
-            "rate_type": "hourly",
-            "rate_value": 800
-        },
-        {
-            "email": "demo.photographer@example.com",
-            "title": "Event Photographer - Example Profile",
-            "category": "Photography",
-            "bio": "This is a demonstration profile. Professional event and portrait photographer.",
-            "location_country": "Kenya",
-            "location_county": "Nairobi",
-            "location_town": "Karen",
-            "tags": "photography,events,portraits,weddings",
-            "years_experience": 6,
-            "rate_type": "fixed",
-            "rate_value": 15000
-        }
-    ]
-    
-    client_data = [
-        {
-            "email": "demo.client1@example.com",
-            "title": "Home Renovation Project - Example Profile",
-            "bio": "This is a demonstration profile. Looking for skilled professionals for home renovation.",
-            "location_country": "Kenya",
-            "location_county": "Nairobi", 
-            "location_town": "Kilimani",
-            "what_looking_for": "Need plumber and electrician for bathroom renovation",
-            "urgency": "This month"
-        },
-        {
-            "email": "demo.client2@example.com",
-            "title": "Wedding Planning - Example Profile", 
-            "bio": "This is a demonstration profile. Planning a wedding and need various service providers.",
-            "location_country": "Kenya",
-            "location_county": "Kajiado",
-            "location_town": "Ngong",
-            "what_looking_for": "Photographer, caterer, and event coordinator needed",
-            "urgency": "Flexible"
-        },
-        {
-            "email": "demo.client3@example.com",
-            "title": "Student Tutoring - Example Profile",
-            "bio": "This is a demonstration profile. Parent seeking math tutor for high school student.",
-            "location_country": "Kenya",
-            "location_county": "Kiambu", 
-            "location_town": "Ruiru",
-            "what_looking_for": "Mathematics tutor for Form 3 student",
-            "urgency": "This week"
-        },
-        {
-            "email": "demo.client4@example.com",
-            "title": "Construction Project - Example Profile",
-            "bio": "This is a demonstration profile. Commercial construction project needs skilled workers.",
-            "location_country": "Kenya",
-            "location_county": "Machakos",
-            "location_town": "Machakos Town", 
-            "what_looking_for": "Masons and general construction workers",
-            "urgency": "Today"
-        },
-        {
-            "email": "demo.client5@example.com",
-            "title": "Corporate Event - Example Profile",
-            "bio": "This is a demonstration profile. Planning corporate event and need service providers.",
-            "location_country": "Kenya",
-            "location_county": "Nairobi",
-            "location_town": "Upper Hill",
-            "what_looking_for": "Event photographer and catering services",
-            "urgency": "This month"
-        }
-    ]
-    
-    # Create dummy users and profiles
-    for i, prof_data in enumerate(professional_data):
-        user = User()
-        user.email = prof_data["email"]
-        user.password_hash = generate_password_hash("demo123")
-        user.role = UserRole.USER
-        user.is_active = True
-        user.email_verified = True
-        db.session.add(user)
-        db.session.flush()  # Get user ID
-        
-        profile = Profile()
-        profile.user_id = user.id
-        profile.type = ProfileType.PROFESSIONAL
-        profile.title = prof_data["title"]
-        profile.bio = prof_data["bio"]
-        profile.location_country = prof_data["location_country"]
-        profile.location_county = prof_data["location_county"]
-        profile.location_town = prof_data["location_town"]
-        profile.tags = prof_data["tags"]
-        profile.category = prof_data["category"]
-        profile.years_experience = prof_data["years_experience"]
-        profile.rate_type = RateType(prof_data["rate_type"])
-        profile.rate_value = prof_data["rate_value"]
-        profile.availability = AvailabilityStatus.AVAILABLE
-        profile.is_listed = True
-        profile.is_new_user_flag = True
-        db.session.add(profile)
-    
-    for i, client_data_item in enumerate(client_data):
-        user = User()
-        user.email = client_data_item["email"]
-        user.password_hash = generate_password_hash("demo123")
-        user.role = UserRole.USER
-        user.is_active = True
-        user.email_verified = True
-        db.session.add(user)
-        db.session.flush()  # Get user ID
-        
-        profile = Profile()
-        profile.user_id = user.id
-        profile.type = ProfileType.CLIENT
-        profile.title = client_data_item["title"]
-        profile.bio = client_data_item["bio"]
-        profile.location_country = client_data_item["location_country"]
-        profile.location_county = client_data_item["location_county"]
-        profile.location_town = client_data_item["location_town"]
-        profile.what_looking_for = client_data_item["what_looking_for"]
-        profile.urgency = UrgencyLevel(client_data_item["urgency"])
-        profile.availability = AvailabilityStatus.AVAILABLE
-        profile.is_listed = True
-        profile.is_new_user_flag = True
-        db.session.add(profile)
-    
-    db.session.commit()
-    logging.info("Created 10 dummy placeholder profiles")
-
 # Create the app instance
 app = create_app()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Endpoint latency and query-count benchmark.
+
+Drives the app in-process (no network) against whatever DATABASE_URL points
+at, normally a database filled by generate_data.py, and reports p50/p95/p99
+latency and SQL query counts per endpoint:
+
+    python benchmark.py                                  # print a table
+    python benchmark.py --output bench-abc123.json       # also save JSON
+    python benchmark.py --compare bench-main.json        # show the change against an earlier run
+    python benchmark.py --cold --requests 50 browse inbox
+
+Each report also times cold worker starts (import, first request, peak RSS)
+in fresh interpreters; --startup-runs 0 skips that.
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import subprocess
+import time
+from datetime import datetime
+
+from generate_data import bench_email
+
+
+def browse_filtered(rng, profile_ids):
+    from blueprints.profiles import CATEGORIES, COUNTIES
+    return f"/browse?category={rng.choice(CATEGORIES)}&location={rng.choice(COUNTIES[:10])}"
+
+
+def profile_detail(rng, profile_ids):
+    return f"/profile/{rng.choice(profile_ids)}"
+
+
+# name -> (who is logged in, path or path factory)
+SCENARIOS = {
+    'index': ('anonymous', '/'),
+    'browse': ('anonymous', '/browse'),
+    'browse_page_50': ('anonymous', '/browse?page=50'),
+    'browse_filtered': ('anonymous', browse_filtered),
+    'browse_search': ('anonymous', '/browse?q=reliable'),
+    'profile_detail': ('anonymous', profile_detail),
+    'dashboard': ('user', '/dashboard'),
+    'inbox': ('user', '/messages/'),
+    'admin_dashboard': ('admin', '/admin/dashboard'),
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+# Runs in a fresh interpreter: one worker's import, first request and memory
+STARTUP_PROBE = """
+import json, sys, time, resource
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+def rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+rss_import = rss_mb()
+main.app.test_client().get('/').close()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'first_request_ms': (time.perf_counter() - imported) * 1000,
+                  'rss_import_mb': rss_import, 'rss_first_request_mb': rss_mb()}))
+"""
+
+
+def measure_startup(runs):
+    """Median cold-start import time, first-request time and peak RSS of a worker process"""
+    env = dict(os.environ, LOG_LEVEL='WARNING')
+    samples = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', STARTUP_PROBE], text=True, env=env,
+                                         cwd=os.path.dirname(os.path.abspath(__file__)))
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: round(sorted(sample[key] for sample in samples)[len(samples) // 2], 1)
+            for key in samples[0]}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_clients(app):
+    """Test clients for an anonymous visitor, the heavy bench user and an admin"""
+    from models import User
+    from services.admin_sessions import AdminSessions
+
+    clients = {'anonymous': app.test_client()}
+    user = User.query.filter_by(email=bench_email(0)).first() or User.query.order_by(User.id).first()
+    if user:
+        clients['user'] = app.test_client()
+        with clients['user'].session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+    clients['admin'] = app.test_client()
+    with app.test_request_context():
+        token = AdminSessions.issue()
+    with clients['admin'].session_transaction() as session:
+        session['admin_token'] = token
+    return clients, user.email if user else None
+
+
+def run_benchmark(names, requests, warmup, seed, cold, startup_runs):
+    """Time every scenario and return the JSON-ready report"""
+    # Before importing the app here, so the probes start from nothing
+    startup = measure_startup(startup_runs) if startup_runs else None
+
+    from app import app, db
+    from sqlalchemy import func
+    from models import Profile, Message, ProfileView, User
+
+    app.config['REQUEST_DEBUG_HEADERS'] = True
+    if cold:
+        app.config['PAGE_CACHE_ENABLED'] = False
+        app.config['FRAGMENT_CACHE_TTL'] = 0
+    rng = random.Random(seed)
+
+    with app.app_context():
+        clients, user_email = make_clients(app)
+        profile_ids = [row.id for row in Profile.query.with_entities(Profile.id)
+                       .filter_by(is_listed=True).order_by(Profile.id).limit(5000)]
+        dataset = {
+            'users': db.session.query(func.count(User.id)).scalar(),
+            'profiles': db.session.query(func.count(Profile.id)).scalar(),
+            'messages': db.session.query(func.count(Message.id)).scalar(),
+            'views': db.session.query(func.count(ProfileView.id)).scalar(),
+        }
+        database = db.engine.dialect.name
+        db.session.remove()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'database': database,
+        'dataset': dataset,
+        'settings': {'requests': requests, 'warmup': warmup, 'seed': seed, 'cold': cold},
+        'startup': startup,
+        'endpoints': {},
+    }
+
+    for name in names:
+        role, target = SCENARIOS[name]
+        client = clients.get(role)
+        if client is None:
+            print(f"⚠️  {name}: no {role} available, skipped")
+            continue
+        if role == 'user':
+            report['settings']['user'] = user_email
+
+        latencies, queries, db_times, statuses = [], [], [], {}
+        for i in range(warmup + requests):
+            path = target(rng, profile_ids) if callable(target) else target
+            started = time.perf_counter()
+            response = client.get(path)
+            elapsed = (time.perf_counter() - started) * 1000
+            response.close()
+            if i < warmup:
+                continue
+            latencies.append(elapsed)
+            queries.append(int(response.headers.get('X-DB-Queries', 0)))
+            db_times.append(float(response.headers.get('X-DB-Time', '0ms').rstrip('ms')))
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        latencies.sort()
+        report['endpoints'][name] = {
+            'path': target if isinstance(target, str) else f"<{target.__name__}>",
+            'requests': requests,
+            'status': {str(code): count for code, count in sorted(statuses.items())},
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'queries_mean': round(sum(queries) / len(queries), 1),
+            'queries_max': max(queries),
+            'db_ms_mean': round(sum(db_times) / len(db_times), 2),
+        }
+    return report
+
+
+def print_report(report, baseline=None):
+    header = f"{'endpoint':<18} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}"
+    print(f"\n📊 {report['commit'] or 'working tree'} on {report['database']} {report['dataset']}")
+    startup = report.get('startup')
+    if startup:
+        line = (f"🚀 cold start: import {startup['import_ms']:.0f}ms, first request {startup['first_request_ms']:.0f}ms, "
+                f"RSS {startup['rss_import_mb']:.0f}MB -> {startup['rss_first_request_mb']:.0f}MB")
+        before = (baseline or {}).get('startup')
+        if before:
+            line += (f"   (baseline import {before['import_ms']:.0f}ms, "
+                     f"RSS {before['rss_first_request_mb']:.0f}MB)")
+        print(line)
+    print(header + ('   vs baseline p50 / p95 / queries' if baseline else ''))
+    for name, result in report['endpoints'].items():
+        line = (f"{name:<18} {result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms "
+                f"{result['p99_ms']:>7.1f}ms {result['queries_mean']:>8.1f}")
+        before = (baseline or {}).get('endpoints', {}).get(name)
+        if before:
+            def change(key):
+                if not before[key]:
+                    return '     n/a'
+                return f"{(result[key] - before[key]) / before[key]:+8.1%}"
+            line += f"   {change('p50_ms')} {change('p95_ms')} {result['queries_mean'] - before['queries_mean']:+6.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure endpoint latency and query counts")
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--requests', type=int, default=200, help="measured requests per scenario (default: 200)")
+    parser.add_argument('--warmup', type=int, default=10, help="unmeasured requests first (default: 10)")
+    parser.add_argument('--seed', type=int, default=42, help="seed for picking profiles and filters")
+    parser.add_argument('--cold', action='store_true', help="disable the page and fragment caches")
+    parser.add_argument('--startup-runs', type=int, default=5,
+                        help="cold worker starts to time, 0 to skip (default: 5)")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    parser.add_argument('--compare', help="earlier JSON report to compare against")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    print("⏱️  Running benchmark...")
+    report = run_benchmark(args.scenarios or list(SCENARIOS), args.requests, args.warmup, args.seed, args.cold,
+                           args.startup_runs)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\n💾 Saved {args.output}")
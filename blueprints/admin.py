@@ -1,29 +1,24 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app
 from flask_login import current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
 from functools import wraps
 import os
-import uuid
-from datetime import datetime, timedelta
 from app import db
-from models import (AdminSettings, User, Profile, Message, AdminSession, 
+from models import (AdminSettings, User, Profile, Message, 
                    HomepagePhoto, UpdatePost, Review, Payment, Plan, Subscription)
-from services.email_service import EmailService
+from services.media_storage import MediaStorage
+from services.admin_sessions import AdminSessions
+from services.read_replicas import replica_reads
 
 admin_bp = Blueprint('admin', __name__)
 
 def is_admin_logged_in():
-    """Check if admin is logged in"""
+    """Check if admin is logged in (signature and revocation check, no DB query)"""
     admin_token = session.get('admin_token')
     if not admin_token:
         return False
     
-    admin_session = AdminSession.query.filter_by(session_token=admin_token).first()
-    if not admin_session or admin_session.expires_at < datetime.utcnow():
-        if admin_session:
-            db.session.delete(admin_session)
-            db.session.commit()
+    if not AdminSessions.verify(admin_token):
         session.pop('admin_token', None)
         return False
     
@@ -57,14 +52,7 @@ def login():
             if settings and settings.admin_password_hash:
                 if check_password_hash(settings.admin_password_hash, password):
                     # Create admin session
-                    token = str(uuid.uuid4())
-                    admin_session = AdminSession()
-                    admin_session.session_token = token
-                    admin_session.expires_at = datetime.utcnow() + timedelta(hours=2)  # Extended session
-                    db.session.add(admin_session)
-                    db.session.commit()
-                    
-                    session['admin_token'] = token
+                    session['admin_token'] = AdminSessions.issue()
                     session.permanent = True
                     flash('Admin login successful!', 'success')
                     return redirect(url_for('admin.dashboard'))
@@ -74,14 +62,7 @@ def login():
                 # Use default password
                 if password == 'SKILLBRIDGE':
                     # Create admin session
-                    token = str(uuid.uuid4())
-                    admin_session = AdminSession()
-                    admin_session.session_token = token
-                    admin_session.expires_at = datetime.utcnow() + timedelta(hours=2)
-                    db.session.add(admin_session)
-                    db.session.commit()
-                    
-                    session['admin_token'] = token
+                    session['admin_token'] = AdminSessions.issue()
                     session.permanent = True
                     flash('Admin login successful! Please change the default password.', 'warning')
                     return redirect(url_for('admin.dashboard'))
@@ -98,10 +79,7 @@ def login():
 def logout():
     admin_token = session.get('admin_token')
     if admin_token:
-        admin_session = AdminSession.query.filter_by(session_token=admin_token).first()
-        if admin_session:
-            db.session.delete(admin_session)
-            db.session.commit()
+        AdminSessions.revoke(admin_token)
         session.pop('admin_token', None)
     
     flash('Admin logged out successfully.', 'info')
@@ -109,6 +87,7 @@ def logout():
 
 @admin_bp.route('/dashboard')
 @admin_required
+@replica_reads
 def dashboard():
     # Get statistics
     stats = {
@@ -134,6 +113,7 @@ def dashboard():
 
 @admin_bp.route('/users')
 @admin_required
+@replica_reads
 def users():
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '')
@@ -221,20 +201,20 @@ def settings():
             settings.admin_password_hash = generate_password_hash(new_password)
         
         # Handle logo upload
+        old_logo_url = None
         if 'logo' in request.files:
             file = request.files['logo']
-            if file and file.filename:
-                filename = secure_filename(file.filename)
-                filename = f"logo_{filename}"
-                
-                upload_dir = os.path.join(current_app.root_path, 'uploads')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                file_path = os.path.join(upload_dir, filename)
-                file.save(file_path)
-                settings.logo_url = f"/uploads/{filename}"
+            stored = MediaStorage.save(file, kinds=('IMAGE',))
+            if stored:
+                if stored.url != settings.logo_url:
+                    old_logo_url = settings.logo_url
+                settings.logo_url = stored.url
+            elif file and file.filename:
+                flash('Logo must be a JPG, PNG, GIF or WebP image.', 'warning')
         
         db.session.commit()
+        if old_logo_url:
+            MediaStorage.release_url(old_logo_url)
         flash('Settings updated successfully!', 'success')
         
         return redirect(url_for('admin.settings'))
@@ -250,19 +230,11 @@ def homepage_photos():
         
         if 'photo' in request.files:
             file = request.files['photo']
-            if file and file.filename:
-                filename = secure_filename(file.filename)
-                filename = f"homepage_{filename}"
-                
-                upload_dir = os.path.join(current_app.root_path, 'uploads')
-                os.makedirs(upload_dir, exist_ok=True)
-                
-                file_path = os.path.join(upload_dir, filename)
-                file.save(file_path)
-                
+            stored = MediaStorage.save(file, kinds=('IMAGE',))
+            if stored:
                 photo = HomepagePhoto()
-                photo.url = f"/uploads/{filename}"
-                photo.filename = filename
+                photo.url = stored.url
+                photo.filename = stored.path
                 photo.description = description
                 photo.category = category
                 photo.display_order = HomepagePhoto.query.count()
@@ -271,6 +243,8 @@ def homepage_photos():
                 db.session.commit()
                 
                 flash('Photo uploaded successfully!', 'success')
+            elif file and file.filename:
+                flash('Homepage photos must be JPG, PNG, GIF or WebP images.', 'error')
         else:
             flash('Please select a photo to upload.', 'error')
         
@@ -283,15 +257,14 @@ def homepage_photos():
 @admin_required
 def delete_homepage_photo(photo_id):
     photo = HomepagePhoto.query.get_or_404(photo_id)
-    
-    # Delete file
-    file_path = os.path.join(current_app.root_path, 'uploads', photo.filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    filename = photo.filename
     
     db.session.delete(photo)
     db.session.commit()
     
+    # Delete the file unless another row still uses the same blob
+    MediaStorage.release(filename)
+    
     flash('Photo deleted successfully.', 'success')
     return redirect(url_for('admin.homepage_photos'))
 
@@ -319,6 +292,7 @@ def toggle_profile_new(profile_id):
 
 @admin_bp.route('/reviews')
 @admin_required
+@replica_reads
 def reviews():
     page = request.args.get('page', 1, type=int)
     reviews = Review.query.order_by(Review.created_at.desc()).paginate(
@@ -339,9 +313,37 @@ def toggle_review_approval(review_id):
 
 @admin_bp.route('/payments')
 @admin_required
+@replica_reads
 def payments():
     page = request.args.get('page', 1, type=int)
     payments = Payment.query.order_by(Payment.created_at.desc()).paginate(
         page=page, per_page=20, error_out=False
     )
     return render_template('admin/payments.html', payments=payments)
+
+@admin_bp.route('/profiler')
+@admin_required
+def profiler():
+    from services.request_profiler import RequestProfiler
+    captures = RequestProfiler.captures()
+    # 'view' rather than 'endpoint', which url_for() reserves
+    endpoint = request.args.get('view', '')
+    release = request.args.get('release', '')
+    selected = [c for c in captures
+                if (not endpoint or c['endpoint'] == endpoint) and (not release or c['release'] == release)]
+    stacks = RequestProfiler.merge(selected)
+    
+    if request.args.get('format') == 'collapsed':
+        return current_app.response_class(
+            RequestProfiler.collapsed_text(stacks), mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename="{endpoint or "all"}-{release or "all"}.collapsed.txt"'})
+    
+    return render_template('admin/profiler.html',
+                          captures=selected[:50], total_captures=len(captures),
+                          endpoints=sorted({c['endpoint'] for c in captures}),
+                          releases=sorted({c['release'] for c in captures}),
+                          endpoint=endpoint, release=release,
+                          flame=RequestProfiler.flame_tree(stacks),
+                          capture_token=RequestProfiler.issue_token(),
+                          header_name=RequestProfiler.HEADER,
+                          profiler_disabled=RequestProfiler.greenlet_threads())
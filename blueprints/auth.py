@@ -143,6 +143,8 @@ def login():
 @auth_bp.route('/logout')
 @login_required
 def logout():
+    from services.identity_cache import IdentityCache
+    IdentityCache.invalidate(current_user.id)
     logout_user()
     flash('You have been logged out successfully.', 'info')
     return redirect(url_for('public.index'))
@@ -4,7 +4,7 @@ from datetime import datetime
 import uuid
 from app import db
 from models import Plan, Payment, Subscription, Profile, PaymentStatus
-from services.mpesa_service import MPesaService
+from services.metrics import Metrics
 
 billing_bp = Blueprint('billing', __name__)
 
@@ -12,6 +12,7 @@ billing_bp = Blueprint('billing', __name__)
 @login_required
 def plans():
     from models import PlanAudience
+    from services.plan_catalogue import PlanCatalogue
     
     # Get current profile context if provided
     profile_id = request.args.get('profile_id')
@@ -27,13 +28,10 @@ def plans():
         else:
             audience = PlanAudience.PROFESSIONAL
             
-        plans = Plan.query.filter_by(
-            audience=audience,
-            is_active=True
-        ).order_by(Plan.price_kes.asc()).all()
+        plans = PlanCatalogue.for_audience(audience)
     else:
         # If no specific profile, show all active plans
-        plans = Plan.query.filter_by(is_active=True).order_by(Plan.audience, Plan.price_kes.asc()).all()
+        plans = PlanCatalogue.all_active()
     
     # Get user's profiles for plan selection
     user_profiles = current_user.profiles.all()
@@ -52,6 +50,10 @@ def plans():
 @billing_bp.route('/start-payment', methods=['POST'])
 @login_required
 def start_payment():
+    # The M-Pesa stack (requests, plan catalogue) loads with the first payment
+    from services.mpesa_service import MPesaService
+    from services.plan_catalogue import PlanCatalogue
+    
     profile_id = request.form.get('profile_id')
     plan_id = request.form.get('plan_id')
     mpesa_phone = request.form.get('mpesa_phone', '').strip()
@@ -67,9 +69,9 @@ def start_payment():
         flash('Invalid profile selected.', 'error')
         return redirect(url_for('billing.plans'))
     
-    # Validate plan
-    plan = Plan.query.get(plan_id)
-    if not plan or not plan.is_active:
+    # Validate plan (the catalogue only holds active plans)
+    plan = PlanCatalogue.get(plan_id)
+    if not plan:
         flash('Invalid plan selected.', 'error')
         return redirect(url_for('billing.plans'))
     
@@ -94,6 +96,7 @@ def start_payment():
     
     db.session.add(payment)
     db.session.commit()
+    Metrics.payment('initiated')
     
     # Initiate M-Pesa STK Push
     transaction_desc = f"SkillBridge {plan.name} Plan"
@@ -115,6 +118,7 @@ def start_payment():
         # Payment initiation failed
         payment.status = PaymentStatus.FAILED
         db.session.commit()
+        Metrics.payment('failed')
         
         error_msg = result.get('error', 'Payment initiation failed')
         flash(f'Payment failed: {error_msg}', 'error')
@@ -133,6 +137,8 @@ def payment_status(payment_id):
 @billing_bp.route('/callback/mpesa', methods=['POST'])
 def mpesa_callback():
     """M-Pesa callback endpoint"""
+    from services.mpesa_service import MPesaService
+    
     try:
         callback_data = request.get_json()
         
@@ -1,9 +1,11 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
 from app import db
 from models import Profile, ProfileType, User, MediaAsset, AdminSettings, AvailabilityStatus, UrgencyLevel, RateType
 from services.profanity_filter import ProfanityFilter
+from services.image_service import ImageService
+from services.media_storage import MediaStorage
+from services.metrics import Metrics
 import os
 from datetime import datetime
 
@@ -27,10 +29,6 @@ COUNTIES = [
     'Busia', 'Siaya', 'Kisumu', 'Homa Bay', 'Migori', 'Kisii', 'Nyamira'
 ]
 
-def allowed_file(filename):
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
 @profiles_bp.route('/my-profiles')
 @login_required
 def my_profiles():
@@ -41,7 +39,7 @@ def my_profiles():
 @login_required
 def create_profile():
     # Check profile limit
-    if current_user.profiles.count() >= 5:
+    if len(current_user.profile_ids) >= 5:
         flash('You have reached the maximum limit of 5 profiles per account.', 'error')
         return redirect(url_for('profiles.my_profiles'))
 
@@ -68,19 +66,15 @@ def create_profile():
 
         # Handle avatar upload (always allowed)
         avatar_url = None
+        avatar_path = None
         if 'avatar' in request.files:
             file = request.files['avatar']
-            if file and file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filename = f"{current_user.id}_{filename}"
-
-                # Ensure upload directory exists
-                upload_dir = os.path.join(current_app.root_path, 'uploads')
-                os.makedirs(upload_dir, exist_ok=True)
-
-                file_path = os.path.join(upload_dir, filename)
-                file.save(file_path)
-                avatar_url = f"/uploads/{filename}"
+            stored = MediaStorage.save(file, kinds=('IMAGE',))
+            if stored:
+                avatar_url = stored.url
+                avatar_path = stored.full_path
+            elif file and file.filename:
+                flash('Profile photo must be a JPG, PNG, GIF or WebP image.', 'warning')
 
         # Create profile
         profile = Profile()
@@ -138,54 +132,53 @@ def create_profile():
         db.session.add(profile)
         db.session.commit()
 
+        if avatar_path:
+            ImageService.enqueue_avatar(profile, avatar_path)
+
         # Handle additional media uploads (if enabled by admin)
+        new_images = []
         settings = AdminSettings.query.first()
         if settings and (settings.media_photos_enabled or settings.media_videos_enabled):
             # Handle multiple photo uploads
             if 'photos' in request.files:
                 photos = request.files.getlist('photos')
                 for photo in photos:
-                    if photo and photo.filename and allowed_file(photo.filename):
-                        filename = secure_filename(photo.filename)
-                        filename = f"{current_user.id}_{profile.id}_{filename}"
-
-                        file_path = os.path.join(upload_dir, filename)
-                        photo.save(file_path)
-
+                    stored = MediaStorage.save(photo, kinds=('IMAGE',))
+                    if stored:
                         media_asset = MediaAsset()
                         media_asset.user_id = current_user.id
                         media_asset.profile_id = profile.id
                         media_asset.type = 'IMAGE'
-                        media_asset.url = f"/uploads/{filename}"
-                        media_asset.filename = filename
+                        media_asset.url = stored.url
+                        media_asset.filename = stored.path
+                        media_asset.content_hash = stored.sha256
+                        media_asset.storage_provider = stored.provider
 
                         db.session.add(media_asset)
+                        new_images.append((media_asset, stored.full_path))
 
             # Handle video uploads
             if 'videos' in request.files and settings.media_videos_enabled:
                 videos = request.files.getlist('videos')
-                video_extensions = {'mp4', 'avi', 'mov', 'wmv', 'flv', 'webm'}
                 for video in videos:
-                    if video and video.filename:
-                        file_ext = video.filename.rsplit('.', 1)[1].lower()
-                        if file_ext in video_extensions:
-                            filename = secure_filename(video.filename)
-                            filename = f"{current_user.id}_{profile.id}_{filename}"
-
-                            file_path = os.path.join(upload_dir, filename)
-                            video.save(file_path)
-
-                            media_asset = MediaAsset()
-                            media_asset.user_id = current_user.id
-                            media_asset.profile_id = profile.id
-                            media_asset.type = 'VIDEO'
-                            media_asset.url = f"/uploads/{filename}"
-                            media_asset.filename = filename
+                    stored = MediaStorage.save(video, kinds=('VIDEO',))
+                    if stored:
+                        media_asset = MediaAsset()
+                        media_asset.user_id = current_user.id
+                        media_asset.profile_id = profile.id
+                        media_asset.type = 'VIDEO'
+                        media_asset.url = stored.url
+                        media_asset.filename = stored.path
+                        media_asset.content_hash = stored.sha256
+                        media_asset.storage_provider = stored.provider
 
-                            db.session.add(media_asset)
+                        db.session.add(media_asset)
 
             db.session.commit()
 
+            for media_asset, file_path in new_images:
+                ImageService.enqueue_media(media_asset, file_path)
+
         flash('Profile created successfully!', 'success')
         return redirect(url_for('profiles.my_profiles'))
 
@@ -226,51 +219,51 @@ def edit_profile(profile_id):
                                  profile=profile, categories=CATEGORIES, counties=COUNTIES)
 
         # Handle avatar upload
+        avatar_path = None
+        old_avatar_url = None
         if 'avatar' in request.files:
             avatar = request.files['avatar']
-            if avatar and avatar.filename:
-                filename = secure_filename(f"{profile.id}_{avatar.filename}")
-                file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                avatar.save(file_path)
-                profile.avatar_url = url_for('public.uploaded_file', filename=filename)
+            stored = MediaStorage.save(avatar, kinds=('IMAGE',))
+            if stored and stored.url != profile.avatar_url:
+                old_avatar_url = profile.avatar_url
+                profile.avatar_url = stored.url
+                profile.avatar_variants_json = None
+                avatar_path = stored.full_path
 
         # Handle media files upload
+        new_images = []
         if 'media_files' in request.files:
             media_files = request.files.getlist('media_files')
             for media_file in media_files:
                 if media_file and media_file.filename:
-                    # Check file size (50MB max)
-                    if len(media_file.read()) > 50 * 1024 * 1024:
-                        flash(f'File {media_file.filename} is too large. Maximum size is 50MB.', 'warning')
+                    # Size limits are enforced and the type sniffed while the upload streams in
+                    stored = MediaStorage.save(media_file)
+                    if not stored:
+                        flash(f'File {media_file.filename} is not a supported image or video.', 'warning')
                         continue
 
-                    media_file.seek(0)  # Reset file pointer
-
-                    # Generate unique filename
-                    filename = secure_filename(f"{profile.id}_media_{datetime.utcnow().timestamp()}_{media_file.filename}")
-                    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-                    media_file.save(file_path)
-
-                    # Determine media type
-                    if media_file.content_type.startswith('image/'):
-                        media_type = 'IMAGE'
-                    elif media_file.content_type.startswith('video/'):
-                        media_type = 'VIDEO'
-                    else:
-                        continue  # Skip unsupported files
-
                     # Create MediaAsset record
                     media_asset = MediaAsset(
                         user_id=current_user.id,
                         profile_id=profile.id,
-                        type=media_type,
-                        url=url_for('public.uploaded_file', filename=filename),
-                        filename=filename,
-                        storage_provider='LOCAL'
+                        type=stored.kind,
+                        url=stored.url,
+                        filename=stored.path,
+                        content_hash=stored.sha256,
+                        storage_provider=stored.provider
                     )
                     db.session.add(media_asset)
+                    new_images.append((media_asset, stored.full_path))
 
         db.session.commit()
+
+        if old_avatar_url:
+            MediaStorage.release_url(old_avatar_url)
+        if avatar_path:
+            ImageService.enqueue_avatar(profile, avatar_path)
+        for media_asset, file_path in new_images:
+            ImageService.enqueue_media(media_asset, file_path)
+
         flash('Profile updated successfully!', 'success')
         return redirect(url_for('profiles.my_profiles'))
 
@@ -287,17 +280,11 @@ def remove_media(asset_id):
     if asset.user_id != current_user.id:
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
 
-    # Delete file from disk
-    try:
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], asset.filename)
-        if os.path.exists(file_path):
-            os.remove(file_path)
-    except:
-        pass
-
-    # Delete from database
+    # Delete from database; the file goes once nothing shares it (see MediaStorage.release)
+    filename = asset.filename
     db.session.delete(asset)
     db.session.commit()
+    MediaStorage.release(filename)
 
     return jsonify({'success': True})
 
@@ -312,28 +299,18 @@ def delete_profile(profile_id):
         flash('You can only delete your own profiles.', 'error')
         return redirect(url_for('profiles.my_profiles'))
 
-    # Delete associated files
-    if profile.avatar_url:
-        try:
-            filename = profile.avatar_url.split('/')[-1]
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except:
-            pass
-
-    # Delete associated media files
-    for asset in profile.media_assets:
-        try:
-            file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], asset.filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except:
-            pass
+    # Remember associated files, delete the rows, then release files nobody else uses
+    avatar_url = profile.avatar_url
+    media_files = [asset.filename for asset in profile.media_assets]
 
     db.session.delete(profile)
     db.session.commit()
 
+    if avatar_url:
+        MediaStorage.release_url(avatar_url)
+    for filename in media_files:
+        MediaStorage.release(filename)
+
     flash('Profile deleted successfully.', 'success')
     return redirect(url_for('profiles.my_profiles'))
 
@@ -386,5 +363,6 @@ def public_view(profile_id):
 
             db.session.add(view)
             db.session.commit()
+        Metrics.profile_view(recorded=not existing_view)
 
     return render_template('public/profile_detail.html', profile=profile)
\ No newline at end of file
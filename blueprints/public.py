@@ -1,14 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_from_directory, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
 from flask_login import login_required, current_user
 from sqlalchemy import or_, and_
 from app import db
-from models import Profile, ProfileType, User, HomepagePhoto, UpdatePost, AdminSettings, Review, Message
+from models import Profile, ProfileType, User, HomepagePhoto, UpdatePost, AdminSettings, Review, Message, ProfileView
+from services.http_cache import ConditionalGet, conditional
+from services.fragment_cache import ProfileCards
+from services.page_cache import cached_page
+from services.read_replicas import ReadReplicas, replica_reads
 import os
 from datetime import datetime
 
 public_bp = Blueprint('public', __name__)
 
 @public_bp.route('/')
+@cached_page
 def index():
     """Homepage with hero banner and featured content"""
     # Get homepage photos
@@ -31,21 +36,28 @@ def index():
     return render_template('index.html', 
                           homepage_photos=homepage_photos,
                           featured_profiles=featured_profiles,
+                          profile_cards=ProfileCards.render_many(featured_profiles),
                           latest_updates=latest_updates,
                           settings=settings)
 
 @public_bp.route('/about')
+@replica_reads
+@cached_page
 def about():
     """About page with mission and how it works"""
     settings = AdminSettings.query.first()
     return render_template('about.html', settings=settings)
 
 @public_bp.route('/help-center')
+@replica_reads
+@cached_page
 def help_center():
     settings = AdminSettings.query.first()
     return render_template('help_center.html', settings=settings)
 
 @public_bp.route('/browse')
+@replica_reads
+@conditional(lambda: ConditionalGet.browse_validators())
 def browse():
     """Browse profiles with search and filters"""
     # Get filter parameters
@@ -105,6 +117,7 @@ def browse():
 
     return render_template('browse.html', 
                           profiles=profiles,
+                          profile_cards=ProfileCards.render_many(profiles.items),
                           categories=categories,
                           counties=counties,
                           current_filters={
@@ -117,6 +130,8 @@ def browse():
                           settings=settings)
 
 @public_bp.route('/profile/<int:profile_id>')
+@replica_reads
+@conditional(ConditionalGet.profile_validators)
 def profile_detail(profile_id):
     """View profile details"""
     profile = Profile.query.get_or_404(profile_id)
@@ -166,8 +181,8 @@ def dashboard():
     # Get user's profiles
     user_profiles = current_user.profiles.all()
 
-    # Calculate total views across all user profiles
-    total_views = sum(profile.total_views for profile in user_profiles)
+    # Calculate total views across all user profiles, in one query
+    total_views = ProfileView.query.filter(ProfileView.profile_id.in_(current_user.profile_ids)).count()
 
     # Get unread message count
     unread_count = Message.query.filter_by(
@@ -181,11 +196,12 @@ def dashboard():
         (Message.recipient_user_id == current_user.id)
     ).order_by(Message.created_at.desc()).limit(5).all()
 
-    # Get recent updates
-    recent_updates = UpdatePost.query.filter(
-        UpdatePost.start_at <= datetime.utcnow(),
-        (UpdatePost.end_at.is_(None)) | (UpdatePost.end_at > datetime.utcnow())
-    ).order_by(UpdatePost.created_at.desc()).limit(3).all()
+    # Get recent updates (site-wide announcements, fine to read from a replica)
+    with ReadReplicas.reading():
+        recent_updates = UpdatePost.query.filter(
+            UpdatePost.start_at <= datetime.utcnow(),
+            (UpdatePost.end_at.is_(None)) | (UpdatePost.end_at > datetime.utcnow())
+        ).order_by(UpdatePost.created_at.desc()).limit(3).all()
 
     settings = AdminSettings.query.first()
 
@@ -196,8 +212,18 @@ def dashboard():
                           recent_updates=recent_updates,
                           total_views=total_views)
 
-@public_bp.route('/uploads/<filename>')
+@public_bp.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    """Serve uploaded files"""
-    upload_dir = os.path.join(current_app.root_path, 'uploads')
-    return send_from_directory(upload_dir, filename)
\ No newline at end of file
+    """Serve uploaded files (flat legacy names and sharded content-addressed blobs).
+
+    Files that live on a remote storage backend are redirected to their
+    direct/presigned URL; local files can be offloaded to the front proxy
+    (see UploadDelivery).
+    """
+    from services.media_storage import MediaStorage
+    from services.upload_delivery import UploadDelivery
+    backend = MediaStorage.backend()
+    if not backend.is_local and '..' not in filename.split('/') \
+            and not os.path.exists(os.path.join(MediaStorage.root(), filename)):
+        return redirect(backend.url(filename))
+    return UploadDelivery.send(filename)
\ No newline at end of file
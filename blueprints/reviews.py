@@ -3,6 +3,7 @@ from flask_login import login_required, current_user
 from app import db
 from models import Review, User, Profile
 from services.profanity_filter import ProfanityFilter
+from services.read_replicas import replica_reads
 
 reviews_bp = Blueprint('reviews', __name__)
 
@@ -89,6 +90,7 @@ def write_review(user_id, profile_id):
     return render_template('reviews/write_review.html', user=user, profile=profile)
 
 @reviews_bp.route('/profile/<int:profile_id>')
+@replica_reads
 def profile_reviews(profile_id):
     """View all reviews for a profile"""
     profile = Profile.query.get_or_404(profile_id)
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Build fingerprinted static bundles.
+
+Minifies and bundles static/js and static/css into static/dist/ with
+content-hashed filenames, precompressed .gz/.br copies and a manifest.
+Run on every deploy, before starting the app:
+
+    python build_assets.py
+"""
+
+import os
+from services.static_assets import build
+
+
+def run_build():
+    """Build all bundles into static/dist/"""
+    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    try:
+        manifest = build(static_folder, log=lambda line: print(f"📦 {line}"))
+        print(f"✅ Built {len(manifest)} bundles into static/dist/")
+        return True
+    except Exception as e:
+        print(f"❌ Asset build failed: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🔨 Building static assets...")
+    success = run_build()
+    exit(0 if success else 1)
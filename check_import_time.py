@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for worker cold starts.
+
+Imports the WSGI entry point in fresh interpreters with `python -X importtime`,
+keeps the fastest of several runs per module and reports where boot time
+goes. Fails when the total exceeds the budget in import_budgets.json or
+when a module that should load on first use (requests, flask_mail, Pillow,
+the M-Pesa stack...) is imported at boot, naming the chain that pulled it in:
+
+    python check_import_time.py                 # exit 1 on regressions (for CI)
+    python check_import_time.py --top 40 --runs 9
+    python check_import_time.py --update        # store this machine's total (+50%) as the budget
+    python check_import_time.py --output importtime.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BUDGETS_FILE = os.path.join(ROOT, 'import_budgets.json')
+HEADROOM = 1.5
+
+
+def run_importtime(entry):
+    """[(name, self_us, cumulative_us, depth)] for one cold import of entry, in output order"""
+    env = dict(os.environ)
+    # Importing the app must not need a database; give it one it will never open
+    env.setdefault('DATABASE_URL', 'sqlite://')
+    env.setdefault('SESSION_SECRET', 'import-time-check')
+    env['LOG_LEVEL'] = 'WARNING'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {entry}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"❌ import {entry} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        head, cumulative_us, name = line.split('|')
+        # " main", "   app", "     flask": one space, then two more per level
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(head.split(':', 1)[1]), int(cumulative_us), depth))
+    return rows
+
+
+def entry_subtree(rows, entry):
+    """{module: (self_us, cumulative_us, parent)} for everything imported under entry
+
+    -X importtime prints children before their parent, so walking the output
+    backwards visits each parent before its children.
+    """
+    modules = {}
+    stack = []
+    inside = False
+    for name, self_us, cumulative_us, depth in reversed(rows):
+        if depth == 0:
+            inside = name == entry
+            stack = [(0, name)]
+            if inside:
+                modules[name] = (self_us, cumulative_us, None)
+            continue
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        if inside:
+            modules[name] = (self_us, cumulative_us, stack[-1][1] if stack else None)
+        stack.append((depth, name))
+    return modules
+
+
+def measure(entry, runs):
+    """Fastest self/cumulative time per module over several runs"""
+    best = {}
+    for _ in range(runs):
+        for name, (self_us, cumulative_us, parent) in entry_subtree(run_importtime(entry), entry).items():
+            if name not in best:
+                best[name] = [self_us, cumulative_us, parent]
+            else:
+                best[name][0] = min(best[name][0], self_us)
+                best[name][1] = min(best[name][1], cumulative_us)
+    return best
+
+
+def import_chain(modules, name):
+    chain = []
+    while name:
+        chain.append(name)
+        name = modules[name][2]
+    return ' <- '.join(chain)
+
+
+def run_check(runs, top, update, output):
+    with open(BUDGETS_FILE) as f:
+        config = json.load(f)
+    entry = config['entry']
+
+    modules = measure(entry, runs)
+    total_ms = modules[entry][1] / 1000
+    by_package = defaultdict(int)
+    for name, (self_us, _, _) in modules.items():
+        by_package[name.split('.')[0]] += self_us
+
+    print(f"\n📦 {len(modules)} modules imported by `import {entry}`, {total_ms:.0f}ms (best of {runs})")
+    print(f"{'package':<28} {'self':>9}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:<28} {self_us / 1000:>7.1f}ms")
+    print(f"\n{'module':<44} {'self':>9} {'cumulative':>11}")
+    for name, (self_us, cumulative_us, _) in sorted(modules.items(), key=lambda item: -item[1][1])[:top]:
+        print(f"{name:<44} {self_us / 1000:>7.1f}ms {cumulative_us / 1000:>9.1f}ms")
+
+    ok = True
+    for deferred, reason in sorted(config['deferred'].items()):
+        loaded = [name for name in modules if name == deferred or name.startswith(deferred + '.')]
+        if loaded:
+            ok = False
+            print(f"❌ {deferred} is imported at boot ({reason}): {import_chain(modules, min(loaded, key=len))}")
+    if total_ms > config['max_total_ms']:
+        ok = False
+        print(f"❌ import {entry} took {total_ms:.0f}ms > budget {config['max_total_ms']}ms")
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({
+                'entry': entry,
+                'runs': runs,
+                'total_ms': round(total_ms, 1),
+                'packages_ms': {package: round(us / 1000, 2) for package, us in by_package.items()},
+                'modules': {name: {'self_ms': round(s / 1000, 2), 'cumulative_ms': round(c / 1000, 2),
+                                   'imported_by': parent}
+                            for name, (s, c, parent) in modules.items()},
+            }, f, indent=2, sort_keys=True)
+        print(f"💾 Saved {output}")
+
+    if update:
+        config['max_total_ms'] = int(total_ms * HEADROOM)
+        with open(BUDGETS_FILE, 'w') as f:
+            json.dump(config, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 Budget set to {config['max_total_ms']}ms in {os.path.basename(BUDGETS_FILE)}")
+        return True
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when importing the app gets slower or loads deferred modules")
+    parser.add_argument('--runs', type=int, default=5, help="cold imports to take the best of (default: 5)")
+    parser.add_argument('--top', type=int, default=20, help="rows per table (default: 20)")
+    parser.add_argument('--update', action='store_true', help="store the measured total plus 50%% as the budget")
+    parser.add_argument('--output', help="write the per-module timings as JSON")
+    args = parser.parse_args()
+
+    print("⏱️  Measuring import time...")
+    success = run_check(args.runs, args.top, args.update, args.output)
+    print("✅ Import time within budget" if success else "❌ Import time budget exceeded")
+    sys.exit(0 if success else 1)
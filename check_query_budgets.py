@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Query-count regression check.
+
+Migrates and seeds a throwaway database with generate_data.py, renders every GET
+endpoint of the seven blueprints and compares the SQL statements and rows
+fetched per request with the budgets in query_budgets.json. Any endpoint
+over budget, or any new GET endpoint without a budget, fails the run and
+the report lists the statements it executed, repeated ones first (the
+usual sign of a per-row query in a template):
+
+    python check_query_budgets.py              # exit 1 on regressions (for CI)
+    python check_query_budgets.py --update     # rewrite budgets from this run
+    python check_query_budgets.py public.browse messaging.inbox
+
+Each endpoint is rendered twice and the second (warm) render is measured,
+with the page, fragment and user caches disabled.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import threading
+from collections import Counter
+
+BUDGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_budgets.json')
+
+# Rows per table in the seeded database; budgets are only valid for these
+SEED_COUNTS = dict(users=40, profiles=120, reviews=300, messages=600, views=400, payments=30)
+
+_counters = threading.local()
+
+
+def _count_rows(rows):
+    if getattr(_counters, 'active', False):
+        _counters.rows += rows
+
+
+def counting_cursor(base):
+    """Subclass of a DBAPI cursor class that counts the rows it returns"""
+    class CountingCursor(base):
+        def fetchone(self):
+            row = super().fetchone()
+            if row is not None:
+                _count_rows(1)
+            return row
+
+        def fetchmany(self, *args, **kwargs):
+            rows = super().fetchmany(*args, **kwargs)
+            _count_rows(len(rows))
+            return rows
+
+        def fetchall(self):
+            rows = super().fetchall()
+            _count_rows(len(rows))
+            return rows
+    return CountingCursor
+
+
+def install_row_counter(engine):
+    """Make new DBAPI connections of engine hand out row-counting cursors"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'do_connect')
+    def _counting_connect(dialect, conn_rec, cargs, cparams):
+        if dialect.driver == 'pysqlite':
+            import sqlite3
+            cursor_class = counting_cursor(sqlite3.Cursor)
+
+            class CountingConnection(sqlite3.Connection):
+                def cursor(self, factory=cursor_class):
+                    return super().cursor(factory)
+            cparams['factory'] = CountingConnection
+        elif dialect.driver == 'psycopg2':
+            import psycopg2.extensions
+            cparams['cursor_factory'] = counting_cursor(psycopg2.extensions.cursor)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _record_statement(conn, cursor, statement, parameters, context, executemany):
+        if getattr(_counters, 'active', False):
+            _counters.statements.append(statement)
+
+    engine.dispose()
+
+
+def media_fixtures(profile_id):
+    """MediaAsset columns for an image with variants, a legacy image and a video"""
+    stem = f"budget{profile_id:04d}"
+    variants = {name: {'width': width, 'webp': f"/uploads/bc/{stem}_{name}.webp",
+                       'jpeg': f"/uploads/bc/{stem}_{name}.jpg"}
+                for name, width in (('thumb', 160), ('card', 480), ('full', 1280))}
+    return [
+        dict(type='IMAGE', url=f"/uploads/bc/{stem}.jpg", filename=f"{stem}.jpg",
+             storage_provider='LOCAL', variants_json=json.dumps(variants)),
+        dict(type='IMAGE', url=f"/uploads/{stem}_legacy.png", filename=f"{stem}_legacy.png",
+             storage_provider='LOCAL'),
+        dict(type='VIDEO', url=f"/uploads/bc/{stem}.mp4", filename=f"{stem}.mp4",
+             storage_provider='LOCAL'),
+    ]
+
+
+def seed_fixtures(db):
+    """Generated data plus the rows the logged-in pages need; returns path placeholders"""
+    from generate_data import Generator, TABLES, ensure_plans, load, bench_email, BENCH_PASSWORD
+    from sqlalchemy import text
+    from werkzeug.security import generate_password_hash
+    from models import User, Profile, Payment, Review, PaymentStatus, MediaAsset
+
+    first_ids = {name: (db.session.execute(text(f"SELECT MAX(id) FROM {table}")).scalar() or 0) + 1
+                 for name, table, _ in TABLES}
+    generator = Generator(0, SEED_COUNTS, first_ids, ensure_plans(), generate_password_hash(BENCH_PASSWORD))
+    db.session.remove()
+    raw = db.engine.raw_connection()
+    try:
+        for name, table, columns in TABLES:
+            load(raw, table, columns, getattr(generator, name)(), db.engine.dialect.name == 'postgresql')
+    finally:
+        raw.close()
+
+    user = User.query.filter_by(email=bench_email(0)).one()
+    own_profile = Profile.query.filter_by(user_id=user.id).order_by(Profile.id).first()
+    other_profile = Profile.query.filter(Profile.user_id != user.id, Profile.is_listed == True) \
+        .order_by(Profile.id).first()
+    payment = Payment(user_id=user.id, profile_id=own_profile.id, plan_id=generator.plan_ids[0],
+                      mpesa_phone='254700000000', amount_kes=500, status=PaymentStatus.SUCCESS,
+                      account_reference='budget-check-payment')
+    review = Review(reviewer_user_id=user.id, reviewed_user_id=other_profile.user_id,
+                    reviewed_profile_id=other_profile.id, content='Budget check review',
+                    professionalism_rating=4, skill_rating=4, ease_of_work_rating=4, overall_rating=4.0)
+    db.session.add_all([payment, review])
+    # One asset of each kind, so every branch of the media galleries renders
+    for profile in (own_profile, other_profile):
+        db.session.add_all([MediaAsset(user_id=profile.user_id, profile_id=profile.id, **asset)
+                            for asset in media_fixtures(profile.id)])
+    db.session.commit()
+    return user.id, {
+        'own_profile_id': own_profile.id,
+        'profile_id': other_profile.id,
+        'other_user_id': other_profile.user_id,
+        'payment_id': payment.id,
+        'review_id': review.id,
+    }
+
+
+def make_client(app, role, user_id):
+    from services.admin_sessions import AdminSessions
+    client = app.test_client()
+    if role == 'user':
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    elif role == 'admin':
+        with app.test_request_context():
+            token = AdminSessions.issue()
+        with client.session_transaction() as session:
+            session['admin_token'] = token
+    return client
+
+
+def measure(client, path):
+    """(status, statements, rows) for the second of two GETs of path"""
+    client.get(path).close()
+    _counters.active, _counters.rows, _counters.statements = True, 0, []
+    try:
+        response = client.get(path)
+        response.close()
+    finally:
+        _counters.active = False
+    return response.status_code, list(_counters.statements), _counters.rows
+
+
+def report_statements(statements, limit=15):
+    for statement, count in Counter(' '.join(s.split()) for s in statements).most_common(limit):
+        print(f"      {count:>3}x  {statement[:200]}")
+
+
+def run_check(selected, update):
+    """Measure every budgeted endpoint; returns True when all are within budget"""
+    with open(BUDGETS_FILE) as f:
+        config = json.load(f)
+    budgets, skipped = config['endpoints'], config['skip']
+
+    database = tempfile.NamedTemporaryFile(prefix='query-budgets-', suffix='.db', delete=False)
+    database.close()
+    os.environ['DATABASE_URL'] = f"sqlite:///{database.name}"
+    os.environ.setdefault('SESSION_SECRET', 'query-budget-check')
+    from alembic import command
+    from app import app, db
+    from manage import alembic_config, seed_admin_settings, create_dummy_profiles
+
+    app.config.update(PAGE_CACHE_ENABLED=False, FRAGMENT_CACHE_TTL=0, USER_CACHE_TTL=0,
+                      REQUEST_DEBUG_HEADERS=False, SLOW_REQUEST_MS=0)
+    ok = True
+    try:
+        command.upgrade(alembic_config(), 'head')
+        with app.app_context():
+            seed_admin_settings()
+            create_dummy_profiles()
+            install_row_counter(db.engine)
+            user_id, placeholders = seed_fixtures(db)
+            db.session.remove()
+
+        # Every GET endpoint needs a budget or an explicit reason to skip it
+        for rule in app.url_map.iter_rules():
+            if 'GET' in rule.methods and rule.endpoint not in budgets and rule.endpoint not in skipped:
+                print(f"❌ {rule.endpoint} ({rule.rule}) has no budget in {os.path.basename(BUDGETS_FILE)}")
+                ok = False
+
+        clients = {}
+        for endpoint, budget in sorted(budgets.items()):
+            if selected and endpoint not in selected:
+                continue
+            role = budget.get('as', 'anonymous')
+            client = clients.get(role) or clients.setdefault(role, make_client(app, role, user_id))
+            path = budget['path'].format(**placeholders)
+            status, statements, rows = measure(client, path)
+
+            if update:
+                budget['max_queries'], budget['max_rows'] = len(statements), rows
+                print(f"📝 {endpoint:<36} {len(statements):>3} queries {rows:>5} rows  (HTTP {status})")
+                continue
+
+            over = []
+            if len(statements) > budget['max_queries']:
+                over.append(f"{len(statements)} queries > {budget['max_queries']}")
+            if rows > budget['max_rows']:
+                over.append(f"{rows} rows > {budget['max_rows']}")
+            if status >= 500:
+                over.append(f"HTTP {status}")
+            if over:
+                ok = False
+                print(f"❌ {endpoint} {path}: {', '.join(over)}")
+                report_statements(statements)
+            else:
+                print(f"✅ {endpoint:<36} {len(statements):>3}/{budget['max_queries']:<3} queries "
+                      f"{rows:>5}/{budget['max_rows']:<5} rows")
+    finally:
+        os.unlink(database.name)
+
+    if update:
+        with open(BUDGETS_FILE, 'w') as f:
+            json.dump(config, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 Updated {os.path.basename(BUDGETS_FILE)}")
+        return True
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail when endpoints exceed their SQL query budgets")
+    parser.add_argument('endpoints', nargs='*', help="only check these endpoints (default: all)")
+    parser.add_argument('--update', action='store_true', help="write the measured counts as the new budgets")
+    args = parser.parse_args()
+
+    print("🔎 Checking query budgets...")
+    success = run_check(set(args.endpoints), args.update)
+    print("✅ All endpoints within budget" if success else "❌ Query budget exceeded")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Garbage collector for orphaned uploads.
+
+Deletes files in uploads/ (and the remote storage backend, if configured)
+that no profile, media asset, homepage photo or logo refers to any more.
+
+    python cleanup_uploads.py --dry-run            # report only
+    python cleanup_uploads.py --grace-hours 48     # delete orphans older than 48h
+"""
+
+import argparse
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def run_cleanup(dry_run=False, grace_hours=24, deletes_per_second=20, scans_per_second=2000):
+    """Sweep orphaned uploads and print a report"""
+    from app import app
+    from services.upload_gc import UploadGarbageCollector
+
+    def report_orphan(backend, key, size, age):
+        prefix = "🔍 Orphaned" if dry_run else "🗑️  Deleting"
+        print(f"{prefix} [{backend}] {key} ({format_size(size)}, {age / 3600:.1f}h old)")
+
+    with app.app_context():
+        collector = UploadGarbageCollector(
+            grace_seconds=int(grace_hours * 3600),
+            dry_run=dry_run,
+            deletes_per_second=deletes_per_second,
+            scans_per_second=scans_per_second,
+        )
+        report = collector.run(on_orphan=report_orphan)
+
+    print(f"{'📋 Dry run: ' if dry_run else '✅ '}{report.summary()}")
+    return report.errors == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete uploads that nothing references")
+    parser.add_argument('--dry-run', action='store_true', help="report orphaned files without deleting them")
+    parser.add_argument('--grace-hours', type=float, default=24,
+                        help="keep files modified within this many hours (default: 24)")
+    parser.add_argument('--deletes-per-second', type=float, default=20,
+                        help="maximum deletions per second (default: 20)")
+    parser.add_argument('--scans-per-second', type=float, default=2000,
+                        help="maximum files inspected per second (default: 2000)")
+    args = parser.parse_args()
+
+    print("🧹 Cleaning up orphaned uploads...")
+    success = run_cleanup(args.dry_run, args.grace_hours, args.deletes_per_second, args.scans_per_second)
+    exit(0 if success else 1)
@@ -15,7 +15,7 @@ class Config:
     
     # File upload settings
     UPLOAD_FOLDER = 'uploads'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    MAX_CONTENT_LENGTH = 64 * 1024 * 1024  # 64MB per request; per-file limits in UPLOAD_LIMITS
     
     # Admin settings
     SUPERPASSWORD = os.environ.get('SUPERPASSWORD', 'SKILLBRIDGE')
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic data for benchmarks.
+
+Bulk-loads users, profiles, reviews, messages, profile views and payments
+with PostgreSQL COPY. The same --seed on the same starting database always
+produces the same rows, so benchmark runs on different commits compare
+like with like. The schema must exist first (python manage.py db upgrade):
+
+    python generate_data.py --scale small
+    python generate_data.py --scale production            # 500k profiles, 5M messages, 10M views
+    python generate_data.py --scale medium --messages 2000000
+
+Generated users are bench0000000@example.test, bench0000001@... with the
+password 'benchmark'. The first one takes part in ~2% of all messages so
+benchmark.py has a heavy inbox to measure.
+"""
+
+import io
+import csv
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+SCALES = {
+    'small': dict(users=1_000, profiles=2_000, reviews=5_000, messages=20_000, views=50_000, payments=1_000),
+    'medium': dict(users=20_000, profiles=50_000, reviews=100_000, messages=500_000, views=1_000_000, payments=20_000),
+    'production': dict(users=200_000, profiles=500_000, reviews=1_000_000, messages=5_000_000,
+                       views=10_000_000, payments=200_000),
+}
+
+BENCH_PASSWORD = 'benchmark'
+HEAVY_USER_SHARE = 0.02
+CHUNK_ROWS = 50_000
+
+# Fixed clock so reruns produce identical timestamps
+EPOCH = datetime(2025, 1, 1)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+WORDS = ('reliable experienced certified affordable professional quality trusted local fast '
+         'friendly skilled licensed insured available flexible modern careful detailed honest').split()
+TOWNS = ('Town Centre', 'Market', 'Estate', 'Junction', 'Heights', 'Stage')
+TAGS = ('repairs installation maintenance emergency residential commercial consultation '
+        'design training delivery weekend bulk').split()
+
+
+def bench_email(n):
+    return f"bench{n:07d}@example.test"
+
+
+class Generator:
+    """Produces the rows for every table from one seeded RNG"""
+
+    def __init__(self, seed, counts, first_ids, plan_ids, password_hash):
+        from blueprints.profiles import CATEGORIES, COUNTIES
+        self.categories = CATEGORIES
+        self.counties = COUNTIES
+        self.seed = seed
+        self.counts = counts
+        self.first = first_ids
+        self.plan_ids = plan_ids
+        self.password_hash = password_hash
+
+    def rng(self, table):
+        # One stream per table, so changing one count leaves the others' rows unchanged
+        return random.Random(f"{self.seed}:{table}")
+
+    @staticmethod
+    def timestamp(rng):
+        return EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+    @staticmethod
+    def skewed(rng, count):
+        """Index in [0, count) biased towards low values (a few hot users/profiles)"""
+        return int(count * rng.random() ** 3)
+
+    def user_id(self, n):
+        return self.first['users'] + n
+
+    def profile_owner(self, n):
+        return self.user_id(n % self.counts['users'])
+
+    def sentence(self, rng, words):
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+    def users(self):
+        rng = self.rng('users')
+        for n in range(self.counts['users']):
+            created = self.timestamp(rng)
+            yield (self.user_id(n), bench_email(n), self.password_hash, 'USER', True, True, created, created)
+
+    def profiles(self):
+        rng = self.rng('profiles')
+        for n in range(self.counts['profiles']):
+            created = self.timestamp(rng)
+            county = self.counties[self.skewed(rng, len(self.counties))]
+            professional = rng.random() < 0.8
+            category = rng.choice(self.categories) if professional else None
+            yield (
+                self.first['profiles'] + n, self.profile_owner(n),
+                'PROFESSIONAL' if professional else 'CLIENT',
+                f"{rng.choice(WORDS).capitalize()} {category or 'Client'} in {county}",
+                'Kenya', county, f"{county} {rng.choice(TOWNS)}",
+                ' '.join(self.sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(1, 4))),
+                ','.join(rng.sample(TAGS, rng.randint(1, 5))),
+                rng.choice(('AVAILABLE', 'AVAILABLE', 'BUSY', 'ON_VACATION')),
+                category,
+                rng.choice(('HOURLY', 'DAILY', 'FIXED', 'NEGOTIABLE')) if professional else None,
+                rng.randint(5, 500) * 100 if professional else None,
+                rng.randint(0, 30) if professional else None,
+                None if professional else self.sentence(rng, 12),
+                rng.random() < 0.95, rng.random() < 0.02, rng.random() < 0.01, False, rng.random() < 0.1,
+                created, created + timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+            )
+
+    def reviews(self):
+        rng = self.rng('reviews')
+        for n in range(self.counts['reviews']):
+            profile = self.skewed(rng, self.counts['profiles'])
+            ratings = [rng.randint(1, 5) for _ in range(3)]
+            created = self.timestamp(rng)
+            yield (
+                self.first['reviews'] + n,
+                self.user_id(rng.randrange(self.counts['users'])), self.profile_owner(profile),
+                self.first['profiles'] + profile, self.sentence(rng, rng.randint(5, 30)),
+                *ratings, round(sum(ratings) / 3, 2), rng.random() < 0.97, created, created,
+            )
+
+    def messages(self):
+        rng = self.rng('messages')
+        users = self.counts['users']
+        for n in range(self.counts['messages']):
+            sender = self.skewed(rng, users)
+            recipient = self.skewed(rng, users)
+            if rng.random() < HEAVY_USER_SHARE:
+                sender, recipient = (0, recipient) if rng.random() < 0.5 else (sender, 0)
+            if sender == recipient:
+                recipient = (recipient + 1) % users
+            yield (
+                self.first['messages'] + n, self.user_id(sender), self.user_id(recipient), None,
+                self.sentence(rng, rng.randint(3, 40)), rng.random() < 0.8, False, self.timestamp(rng),
+            )
+
+    def views(self):
+        rng = self.rng('views')
+        for n in range(self.counts['views']):
+            anonymous = rng.random() < 0.6
+            yield (
+                self.first['views'] + n, self.first['profiles'] + self.skewed(rng, self.counts['profiles']),
+                None if anonymous else self.user_id(rng.randrange(self.counts['users'])),
+                f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" if anonymous else None,
+                self.timestamp(rng),
+            )
+
+    def payments(self):
+        rng = self.rng('payments')
+        for n in range(self.counts['payments']):
+            payment_id = self.first['payments'] + n
+            profile = rng.randrange(self.counts['profiles'])
+            status = rng.choices(('SUCCESS', 'FAILED', 'PENDING'), weights=(70, 20, 10))[0]
+            yield (
+                payment_id, self.profile_owner(profile), self.first['profiles'] + profile,
+                rng.choice(self.plan_ids), f"2547{rng.randrange(10**8):08d}", rng.choice((100, 250, 500, 1000)),
+                status, f"BENCH{payment_id}" if status == 'SUCCESS' else None,
+                f"bench-{self.seed}-{payment_id}", self.timestamp(rng),
+            )
+
+
+TABLES = (
+    ('users', 'users', ('id', 'email', 'password_hash', 'role', 'active', 'email_verified',
+                        'created_at', 'updated_at')),
+    ('profiles', 'profiles', ('id', 'user_id', 'type', 'title', 'location_country', 'location_county',
+                              'location_town', 'bio', 'tags', 'availability', 'category', 'rate_type',
+                              'rate_value', 'years_experience', 'what_looking_for', 'is_listed',
+                              'is_new_user_flag', 'is_featured', 'is_boosted', 'is_verified',
+                              'created_at', 'updated_at')),
+    ('reviews', 'reviews', ('id', 'reviewer_user_id', 'reviewed_user_id', 'reviewed_profile_id', 'content',
+                            'professionalism_rating', 'skill_rating', 'ease_of_work_rating', 'overall_rating',
+                            'is_approved', 'created_at', 'updated_at')),
+    ('messages', 'messages', ('id', 'sender_user_id', 'recipient_user_id', 'profile_context_id', 'content',
+                              'is_read', 'is_admin_message', 'created_at')),
+    ('views', 'profile_views', ('id', 'profile_id', 'viewer_user_id', 'viewer_ip', 'created_at')),
+    ('payments', 'payments', ('id', 'user_id', 'profile_id', 'plan_id', 'mpesa_phone', 'amount_kes', 'status',
+                              'provider_ref', 'account_reference', 'created_at')),
+)
+
+
+def chunks(rows, size=CHUNK_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load(raw, table, columns, rows, postgres):
+    """COPY rows into table (executemany on non-PostgreSQL databases)"""
+    cur = raw.cursor()
+    loaded = 0
+    for batch in chunks(rows):
+        if postgres:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                writer.writerow('' if value is None else value for value in row)
+            buffer.seek(0)
+            cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        else:
+            placeholders = ', '.join('?' for _ in columns)
+            cur.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", batch)
+        raw.commit()
+        loaded += len(batch)
+        print(f"   {table}: {loaded:,} rows", end='\r', flush=True)
+    print()
+    return loaded
+
+
+def ensure_plans():
+    """Active plan ids, creating two benchmark plans if there are none"""
+    from app import db
+    from models import Plan, PlanAudience
+    plans = [plan.id for plan in Plan.query.filter_by(is_active=True).order_by(Plan.id).all()]
+    if plans:
+        return plans
+    for audience, price in ((PlanAudience.PROFESSIONAL, 500), (PlanAudience.CLIENT, 250)):
+        db.session.add(Plan(name=f"Benchmark {audience.value.title()}", audience=audience, price_kes=price,
+                            duration_days=30, features_json='{}', is_active=True))
+    db.session.commit()
+    return [plan.id for plan in Plan.query.filter_by(is_active=True).order_by(Plan.id).all()]
+
+
+def run_generate(seed, counts):
+    """Generate and load every table; returns True on success"""
+    from app import app, db
+    from sqlalchemy import text
+    from werkzeug.security import generate_password_hash
+
+    with app.app_context():
+        postgres = db.engine.dialect.name == 'postgresql'
+        print(f"🎯 Target: {db.engine.url.render_as_string(hide_password=True)}")
+        if not postgres:
+            print("⚠️  Not PostgreSQL: falling back to batched INSERTs (no COPY)")
+
+        first_ids = {}
+        for name, table, _ in TABLES:
+            first_ids[name] = (db.session.execute(text(f"SELECT MAX(id) FROM {table}")).scalar() or 0) + 1
+        generator = Generator(seed, counts, first_ids, ensure_plans(),
+                              generate_password_hash(BENCH_PASSWORD))
+        db.session.remove()
+
+        raw = db.engine.raw_connection()
+        try:
+            for name, table, columns in TABLES:
+                if not counts[name]:
+                    continue
+                started = time.perf_counter()
+                print(f"📥 Loading {counts[name]:,} {name}...")
+                load(raw, table, columns, getattr(generator, name)(), postgres)
+                print(f"   done in {time.perf_counter() - started:.1f}s")
+            # COPY bypasses the ORM listeners that keep /browse ETags current
+            raw.cursor().execute("UPDATE content_versions SET version = version + 1 WHERE name = 'browse'")
+            raw.commit()
+            if postgres:
+                cur = raw.cursor()
+                for _, table, _ in TABLES:
+                    cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                                f"(SELECT COALESCE(MAX(id), 1) FROM {table}))")
+                    cur.execute(f"ANALYZE {table}")
+                raw.commit()
+        except Exception as e:
+            raw.rollback()
+            print(f"❌ Load failed: {e}")
+            return False
+        finally:
+            raw.close()
+
+    print(f"✅ Generated data with seed {seed}; log in as {bench_email(0)} / {BENCH_PASSWORD}")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load deterministic benchmark data")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help="row count preset (default: small)")
+    parser.add_argument('--seed', type=int, default=42, help="random seed (default: 42)")
+    for name in SCALES['small']:
+        parser.add_argument(f'--{name}', type=int, help=f"override the number of {name}")
+    args = parser.parse_args()
+
+    counts = dict(SCALES[args.scale])
+    counts.update({name: getattr(args, name) for name in counts if getattr(args, name) is not None})
+    if counts['users'] < 2 or counts['profiles'] < 1:
+        parser.error("need at least 2 users and 1 profile")
+
+    print("🏗️  Generating benchmark data...")
+    success = run_generate(args.seed, counts)
+    exit(0 if success else 1)
@@ -0,0 +1,124 @@
+"""
+Gunicorn settings, read automatically from the working directory
+(`gunicorn main:app`) or with `gunicorn -c gunicorn.conf.py main:app`.
+
+GUNICORN_PROFILE picks the worker model, sized from the CPU count:
+
+    gthread  (default) CPU+1 processes x GUNICORN_THREADS (4) threads. A thread
+             waiting on Postgres, SMTP or Daraja releases the GIL, so a slow
+             STK push or OTP email ties up one thread, not a whole process.
+    sync     2xCPU+1 single-threaded processes. Simplest, but every outbound
+             call holds a process for its full duration.
+    gevent   CPU processes x GUNICORN_WORKER_CONNECTIONS (1000) greenlets.
+             Needs the gevent extra (gevent + psycogreen, so psycopg2 yields
+             to other greenlets while it waits on Postgres).
+
+WEB_CONCURRENCY overrides the process count. The app is preloaded in the
+master (GUNICORN_PRELOAD=false for --reload during development), workers
+are recycled after GUNICORN_MAX_REQUESTS requests plus jitter so memory
+growth stays bounded, and each worker gets a fresh connection pool after
+the fork.
+
+Indicative numbers only, not sizing guidance: one loadtest.py run on a
+single CPU against SQLite, 20 users with no think time, Daraja answering
+in 500ms and SMTP in 300ms (so the CPU is saturated). Production runs on
+Postgres, usually behind PgBouncer, on more cores, where database round
+trips release the GIL and the gaps between the models will differ;
+re-run loadtest.py there before switching profiles.
+
+    profile   processes x concurrency   req/s   errors   p95 browse   p95 start_payment   p95 signup
+    sync      3 x 1                      35.2     0.0%        997ms               2.06s        1.69s
+    gthread   2 x 4                      38.5     0.0%        910ms               2.34s        2.21s
+    gevent    1 x 1000                   39.5     0.0%        860ms               3.97s        5.06s
+
+In that run threads and greenlets gained ~10% by overlapping the outbound
+waits. gevent's tails were worst because password hashing at signup and
+login is CPU-bound and stalls every greenlet in the process. That last
+effect does not depend on the database, and it is why gthread is the
+default.
+"""
+
+import os
+import multiprocessing
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    return default if value is None else value.lower() in ('1', 'true', 'yes', 'on')
+
+
+CPUS = multiprocessing.cpu_count()
+PROFILE = os.environ.get('GUNICORN_PROFILE', 'gthread').lower()
+
+PROFILES = {
+    'sync': dict(worker_class='sync', workers=2 * CPUS + 1, threads=1),
+    'gthread': dict(worker_class='gthread', workers=CPUS + 1, threads=_env_int('GUNICORN_THREADS', 4)),
+    'gevent': dict(worker_class='gevent', workers=CPUS, threads=1),
+}
+if PROFILE not in PROFILES:
+    raise RuntimeError(f"GUNICORN_PROFILE must be one of {', '.join(PROFILES)}, not {PROFILE!r}")
+
+if PROFILE == 'gevent':
+    # Patch before the preloaded app creates its locks, sockets and pools
+    from gevent import monkey
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:  # psycopg2 would block the whole worker while it waits on Postgres
+        pass
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+worker_class = PROFILES[PROFILE]['worker_class']
+workers = _env_int('WEB_CONCURRENCY', PROFILES[PROFILE]['workers'])
+threads = PROFILES[PROFILE]['threads']
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+preload_app = _env_bool('GUNICORN_PRELOAD', True)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+
+# Requests running longer than this get the worker killed and restarted;
+# on SIGTERM in-flight requests get graceful_timeout to finish
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Heartbeat files on tmpfs, so a slow container disk can't stall workers
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+
+
+def on_starting(server):
+    from services.metrics import Metrics
+    Metrics.reset_multiprocess_dir()
+    server.log.info(f"Profile {PROFILE}: {workers} x {worker_class} workers"
+                    + (f", {threads} threads each" if threads > 1 else "")
+                    + (", app preloaded" if preload_app else ""))
+
+
+def post_fork(server, worker):
+    """Give the worker its own connection pools instead of the ones created in the master"""
+    from app import app, db
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: leave the parent's sockets alone, just stop sharing them
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from services.metrics import Metrics
+    Metrics.worker_exit(worker.pid)
+
+
+def worker_abort(worker):
+    """Log where a worker was stuck when it hit the timeout"""
+    import sys
+    import traceback
+    for thread_id, frame in sys._current_frames().items():
+        worker.log.error(f"Thread {thread_id} at timeout:\n{''.join(traceback.format_stack(frame))}")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Load test with weighted user journeys, fully offline.
+
+Virtual users run the journeys below against a running server. M-Pesa
+and email go to the local fakes in loadtest_fakes.py, so signup -> OTP ->
+create profile -> browse -> message -> pay, including the M-Pesa callback,
+works without Safaricom or a mail account:
+
+    python loadtest.py env                  # environment the server needs
+    python loadtest.py configure            # point AdminSettings at the fake Daraja
+    <start the server with that environment, e.g. gunicorn main:app>
+    python loadtest.py run --target http://127.0.0.1:5000 --users 20 --duration 60
+
+Returning-user journeys log in as the generate_data.py bench users.
+The report gives the throughput, error rate and p50/p95/p99 latency
+of every step.
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from collections import defaultdict
+
+import requests
+
+from generate_data import bench_email, BENCH_PASSWORD
+from loadtest_fakes import FakeDaraja, FakeSMTP
+
+DARAJA_PORT = 8081
+SMTP_PORT = 8025
+SENDER = 'noreply@loadtest.local'
+PHONE = '0712345678'
+
+# journey -> weight
+JOURNEYS = {
+    'browse': 60,
+    'returning_user': 25,
+    'signup_funnel': 10,
+    'payer': 5,
+}
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Stats:
+    """Latencies and failures per step, shared by all virtual users"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+        self.journeys = defaultdict(lambda: {'completed': 0, 'failed': 0})
+
+    def record(self, step, seconds, error=None):
+        with self.lock:
+            self.latencies[step].append(seconds * 1000)
+            if error:
+                self.errors[step] += 1
+                self.error_samples.setdefault(step, str(error)[:200])
+
+    def journey(self, name, ok):
+        with self.lock:
+            self.journeys[name]['completed' if ok else 'failed'] += 1
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class VirtualUser:
+    """One browser session running journeys back to back"""
+
+    def __init__(self, number, target, stats, smtp, rng, bench_users, payment_timeout):
+        self.number = number
+        self.target = target.rstrip('/')
+        self.stats = stats
+        self.smtp = smtp
+        self.rng = rng
+        self.bench_users = bench_users
+        self.payment_timeout = payment_timeout
+        self.http = requests.Session()
+
+    def step(self, name, method, path, expect=(200,), redirect_to=None, **kwargs):
+        """Send one request, record it as step `name` and return the response"""
+        started = time.perf_counter()
+        error = None
+        response = None
+        try:
+            response = self.http.request(method, self.target + path, allow_redirects=False, timeout=30, **kwargs)
+            if response.status_code not in expect:
+                error = StepFailed(f"{name}: HTTP {response.status_code} for {path}")
+            elif redirect_to and redirect_to not in response.headers.get('Location', ''):
+                error = StepFailed(f"{name}: redirected to {response.headers.get('Location')} "
+                                   f"instead of {redirect_to}")
+        except requests.RequestException as e:
+            error = StepFailed(f"{name}: {e}")
+        self.stats.record(name, time.perf_counter() - started, error)
+        if error:
+            raise error
+        return response
+
+    def find(self, pattern, response, what):
+        match = re.search(pattern, response.text)
+        if not match:
+            raise StepFailed(f"no {what} on {response.url}")
+        return int(match.group(1))
+
+    # Journeys
+
+    def browse(self):
+        self.step('home', 'GET', '/')
+        page = self.step('browse', 'GET', '/browse')
+        self.step('browse_filtered', 'GET', '/browse', params={'type': 'PROFESSIONAL', 'page': self.rng.randint(1, 5)})
+        profile_id = self.find(r'/profile/(\d+)', page, 'profile link')
+        return self.step('profile_detail', 'GET', f'/profile/{profile_id}')
+
+    def login(self):
+        email = bench_email(self.rng.randrange(self.bench_users))
+        response = self.step('login', 'POST', '/auth/login', expect=(200, 302),
+                             data={'email': email, 'password': BENCH_PASSWORD})
+        if response.status_code != 302:
+            raise StepFailed(f"login as {email} was refused")
+
+    def message(self, detail_page):
+        recipient = self.find(r'/messages/start/(\d+)', detail_page, 'message link')
+        self.step('start_conversation', 'GET', f'/messages/start/{recipient}', expect=(200, 302))
+        self.step('send_message', 'POST', '/messages/send', expect=(302,), redirect_to='/messages/conversation/',
+                  data={'recipient_id': recipient, 'content': f"Hello from load test user {self.number}"})
+        self.step('conversation', 'GET', f'/messages/conversation/{recipient}')
+
+    def pay(self, profile_id):
+        plans = self.step('plans', 'GET', '/billing/', params={'profile_id': profile_id})
+        plan_id = self.find(r'openPaymentModal\((\d+)', plans, 'plan')
+        started = time.perf_counter()
+        response = self.step('start_payment', 'POST', '/billing/start-payment', expect=(302,),
+                             redirect_to='/billing/payment-status/',
+                             data={'profile_id': profile_id, 'plan_id': plan_id, 'mpesa_phone': PHONE})
+        payment_id = int(response.headers['Location'].rstrip('/').rsplit('/', 1)[1])
+
+        # The fake Daraja calls /billing/callback/mpesa after its delay
+        deadline = time.monotonic() + self.payment_timeout
+        while time.monotonic() < deadline:
+            status = self.step('payment_status', 'GET', f'/billing/check-payment-status/{payment_id}').json()['status']
+            if status != 'PENDING':
+                # The fake declines (1 - success rate) of payments on purpose
+                self.stats.record('payment_confirmed' if status == 'SUCCESS' else 'payment_declined',
+                                  time.perf_counter() - started)
+                return
+            time.sleep(0.5)
+        self.stats.record('payment_confirmed', time.perf_counter() - started,
+                          StepFailed(f"payment {payment_id} still pending"))
+        raise StepFailed(f"payment {payment_id} still pending after {self.payment_timeout}s")
+
+    def returning_user(self):
+        self.login()
+        self.step('inbox', 'GET', '/messages/')
+        detail = self.browse()
+        self.message(detail)
+
+    def payer(self):
+        self.login()
+        profiles = self.step('my_profiles', 'GET', '/profiles/my-profiles')
+        self.pay(self.find(r'/profiles/edit/(\d+)', profiles, 'own profile'))
+
+    def signup_funnel(self):
+        email = f"load-{self.number}-{int(time.time() * 1000)}-{self.rng.randrange(10**6)}@loadtest.local"
+        self.step('signup_form', 'GET', '/auth/signup')
+        self.step('signup', 'POST', '/auth/signup', expect=(302,), redirect_to='/auth/verify-otp',
+                  data={'email': email, 'password': 'loadtest', 'confirm_password': 'loadtest'})
+        mail = self.smtp.last_message(email)
+        if not mail:
+            raise StepFailed(f"no OTP email for {email}")
+        otp = re.search(r'\b(\d{6})\b', mail[1])
+        if not otp:
+            raise StepFailed("OTP email has no code")
+        self.step('verify_otp', 'POST', '/auth/verify-otp', expect=(302,), redirect_to='/profiles/my-profiles',
+                  data={'otp': otp.group(1)})
+        self.step('create_profile', 'POST', '/profiles/create', expect=(302,), data={
+            'type': 'PROFESSIONAL', 'title': f"Load test plumber {self.number}", 'bio': 'Reliable and quick.',
+            'location_country': 'Kenya', 'location_county': 'Nairobi', 'location_town': 'Westlands',
+            'category': 'Plumbing', 'rate_type': 'hourly', 'rate_value': '1500', 'tags': 'repairs,installation',
+        })
+        profiles = self.step('my_profiles', 'GET', '/profiles/my-profiles')
+        profile_id = self.find(r'/profiles/edit/(\d+)', profiles, 'new profile')
+        self.message(self.browse())
+        self.pay(profile_id)
+
+    def run(self, deadline, think):
+        names, weights = zip(*JOURNEYS.items())
+        while time.monotonic() < deadline:
+            journey = self.rng.choices(names, weights)[0]
+            self.http.cookies.clear()
+            try:
+                getattr(self, journey)()
+                self.stats.journey(journey, True)
+            except StepFailed:
+                self.stats.journey(journey, False)
+            if think:
+                time.sleep(self.rng.uniform(0, 2 * think))
+
+
+def run_load(args):
+    stats = Stats()
+    daraja = FakeDaraja(args.daraja_port, args.callback_delay, args.success_rate, args.seed,
+                        args.daraja_latency).start()
+    smtp = FakeSMTP(args.smtp_port, args.smtp_latency).start()
+    print(f"🎭 Fake Daraja on {daraja.base_url}, fake SMTP on 127.0.0.1:{args.smtp_port}")
+    print(f"🚀 {args.users} virtual users against {args.target} for {args.duration}s...")
+
+    deadline = time.monotonic() + args.duration
+    started = time.perf_counter()
+    threads = []
+    for number in range(args.users):
+        user = VirtualUser(number, args.target, stats, smtp, random.Random(f"{args.seed}:{number}"),
+                           args.bench_users, args.payment_timeout)
+        thread = threading.Thread(target=user.run, args=(deadline, args.think), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    # Let callbacks already scheduled by the fake finish
+    time.sleep(min(args.callback_delay, 5))
+
+    report = {
+        'target': args.target,
+        'users': args.users,
+        'duration_s': round(elapsed, 1),
+        'journeys': dict(stats.journeys),
+        'daraja': {'stk_pushes': daraja.pushes, 'callbacks_sent': daraja.callbacks_sent,
+                   'callback_errors': daraja.callback_errors},
+        'emails_received': smtp.received,
+        'steps': {},
+    }
+    total = sum(len(values) for values in stats.latencies.values())
+    print(f"\n📊 {total:,} requests in {elapsed:.1f}s = {total / elapsed:.1f} req/s")
+    print(f"{'step':<20} {'count':>7} {'req/s':>7} {'errors':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for step, values in stats.latencies.items():
+        values.sort()
+        errors = stats.errors.get(step, 0)
+        result = {
+            'count': len(values),
+            'throughput_rps': round(len(values) / elapsed, 2),
+            'errors': errors,
+            'error_rate': round(errors / len(values), 4),
+            'p50_ms': round(percentile(values, 0.50), 1),
+            'p95_ms': round(percentile(values, 0.95), 1),
+            'p99_ms': round(percentile(values, 0.99), 1),
+        }
+        if step in stats.error_samples:
+            result['first_error'] = stats.error_samples[step]
+        report['steps'][step] = result
+        print(f"{step:<20} {result['count']:>7} {result['throughput_rps']:>7.1f} {result['error_rate']:>7.1%} "
+              f"{result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms {result['p99_ms']:>7.1f}ms")
+    for step, sample in stats.error_samples.items():
+        print(f"⚠️  {step}: {sample}")
+    print(f"🧭 Journeys: {json.dumps(report['journeys'])}")
+    print(f"💳 Daraja: {json.dumps(report['daraja'])}   📧 emails: {smtp.received}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"💾 Saved {args.output}")
+    return all(not count for count in stats.errors.values())
+
+
+def server_environment(daraja_port, smtp_port):
+    return {
+        'MPESA_API_BASE_URL': f"http://127.0.0.1:{daraja_port}",
+        'MPESA_CONSUMER_KEY': 'loadtest',
+        'MPESA_CONSUMER_SECRET': 'loadtest',
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': str(smtp_port),
+        'MAIL_USE_TLS': 'false',
+        'EMAIL': SENDER,
+        'PAGE_CACHE_ENABLED': 'true',
+    }
+
+
+def configure(target):
+    """Point AdminSettings' M-Pesa details and callback URL at the fakes and the target"""
+    from app import app, db
+    from models import AdminSettings, MPesaEnvironment
+    from generate_data import ensure_plans
+
+    with app.app_context():
+        settings = AdminSettings.query.first()
+        settings.mpesa_env = MPesaEnvironment.SANDBOX
+        settings.mpesa_shortcode = settings.mpesa_shortcode or '174379'
+        settings.mpesa_passkey = settings.mpesa_passkey or 'loadtest-passkey'
+        settings.callback_base_url = target.rstrip('/')
+        settings.global_override_enabled = True
+        if settings.email_username:
+            print("⚠️  AdminSettings has SMTP credentials; OTP mail will bypass the fake SMTP server")
+        db.session.commit()
+        ensure_plans()
+    print(f"✅ M-Pesa callbacks will go to {target.rstrip('/')}/billing/callback/mpesa")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test with weighted user journeys")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    env = commands.add_parser('env', help="print the environment the server under test needs")
+    setup = commands.add_parser('configure', help="store fake M-Pesa settings and the callback URL")
+    run = commands.add_parser('run', help="run the load test")
+    for sub in (env, run):
+        sub.add_argument('--daraja-port', type=int, default=DARAJA_PORT)
+        sub.add_argument('--smtp-port', type=int, default=SMTP_PORT)
+    for sub in (setup, run):
+        sub.add_argument('--target', default='http://127.0.0.1:5000', help="base URL of the server under test")
+    run.add_argument('--users', type=int, default=10, help="concurrent virtual users (default: 10)")
+    run.add_argument('--duration', type=float, default=60, help="seconds to run (default: 60)")
+    run.add_argument('--think', type=float, default=0.0, help="mean pause between journeys in seconds")
+    run.add_argument('--bench-users', type=int, default=100,
+                     help="log in as the first N generate_data.py users (default: 100)")
+    run.add_argument('--callback-delay', type=float, default=2.0, help="seconds before the M-Pesa callback")
+    run.add_argument('--daraja-latency', type=float, default=0.0, help="seconds the fake Daraja takes to answer")
+    run.add_argument('--smtp-latency', type=float, default=0.0, help="seconds the fake SMTP takes per message")
+    run.add_argument('--success-rate', type=float, default=0.9, help="share of payments that succeed")
+    run.add_argument('--payment-timeout', type=float, default=30, help="seconds to wait for a payment result")
+    run.add_argument('--seed', type=int, default=42)
+    run.add_argument('--output', help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.command == 'env':
+        for name, value in server_environment(args.daraja_port, args.smtp_port).items():
+            print(f"export {name}={value}")
+    elif args.command == 'configure':
+        configure(args.target)
+    else:
+        exit(0 if run_load(args) else 1)
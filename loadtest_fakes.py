@@ -0,0 +1,193 @@
+"""
+Local stand-ins for Safaricom Daraja and an SMTP server, used by loadtest.py.
+
+FakeDaraja answers the OAuth and STK push calls MPesaService makes and,
+after a configurable delay, POSTs the payment result to the CallBackURL
+from the push, the way Safaricom does. FakeSMTP accepts every message and
+keeps the latest one per recipient so a load test can read OTP codes.
+Both run in background threads and only listen on localhost.
+"""
+
+import json
+import time
+import random
+import threading
+import socketserver
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+
+class FakeDaraja(ThreadingHTTPServer):
+    """Minimal Daraja API: /oauth/v1/generate and /mpesa/stkpush/v1/processrequest"""
+    daemon_threads = True
+
+    def __init__(self, port=8081, callback_delay=2.0, success_rate=0.9, seed=None, latency=0.0):
+        super().__init__(('127.0.0.1', port), _DarajaHandler)
+        self.latency = latency  # seconds before answering, like the real API
+        self.callback_delay = callback_delay
+        self.success_rate = success_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.pushes = 0
+        self.callbacks_sent = 0
+        self.callback_errors = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='fake-daraja', daemon=True).start()
+        return self
+
+    def accept_push(self, payload):
+        with self.lock:
+            self.pushes += 1
+            checkout_id = f"ws_CO_{int(time.time())}_{self.pushes:08d}"
+            succeeded = self.rng.random() < self.success_rate
+        timer = threading.Timer(self.callback_delay, self._send_callback, (payload, checkout_id, succeeded))
+        timer.daemon = True
+        timer.start()
+        return {
+            'MerchantRequestID': f"fake-{self.pushes}",
+            'CheckoutRequestID': checkout_id,
+            'ResponseCode': '0',
+            'ResponseDescription': 'Success. Request accepted for processing',
+            'CustomerMessage': 'Success. Request accepted for processing',
+        }
+
+    def _send_callback(self, payload, checkout_id, succeeded):
+        callback = {'MerchantRequestID': f"fake-{checkout_id}", 'CheckoutRequestID': checkout_id}
+        if succeeded:
+            callback.update(ResultCode=0, ResultDesc='The service request is processed successfully.',
+                            CallbackMetadata={'Item': [
+                                {'Name': 'Amount', 'Value': payload.get('Amount')},
+                                {'Name': 'MpesaReceiptNumber', 'Value': f"FAKE{checkout_id[-8:]}"},
+                                {'Name': 'PhoneNumber', 'Value': payload.get('PhoneNumber')},
+                            ]})
+        else:
+            callback.update(ResultCode=1032, ResultDesc='Request cancelled by user')
+        try:
+            response = requests.post(payload['CallBackURL'], json={'Body': {'stkCallback': callback}}, timeout=30)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        with self.lock:
+            if ok:
+                self.callbacks_sent += 1
+            else:
+                self.callback_errors += 1
+
+
+class _DarajaHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        if self.path.startswith('/oauth/v1/generate'):
+            if not self.headers.get('Authorization', '').startswith('Basic '):
+                return self._reply(401, {'errorMessage': 'Invalid Authentication passed'})
+            return self._reply(200, {'access_token': 'fake-access-token', 'expires_in': '3599'})
+        self._reply(404, {'errorMessage': 'Not found'})
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        if self.path != '/mpesa/stkpush/v1/processrequest':
+            return self._reply(404, {'errorMessage': 'Not found'})
+        if self.headers.get('Authorization') != 'Bearer fake-access-token':
+            return self._reply(401, {'errorMessage': 'Invalid Access Token'})
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except ValueError:
+            return self._reply(400, {'errorMessage': 'Bad Request - Invalid JSON'})
+        if not payload.get('CallBackURL'):
+            return self._reply(400, {'errorMessage': 'Bad Request - Invalid CallBackURL'})
+        self._reply(200, self.server.accept_push(payload))
+
+
+class FakeSMTP(socketserver.ThreadingTCPServer):
+    """Accepts any mail without authentication and keeps the last message per recipient"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=8025, latency=0.0):
+        super().__init__(('127.0.0.1', port), _SMTPHandler)
+        self.latency = latency  # seconds before accepting a message
+        self.lock = threading.Lock()
+        self.mailboxes = {}
+        self.received = 0
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name='fake-smtp', daemon=True).start()
+        return self
+
+    def deliver(self, recipients, data):
+        message = message_from_bytes(data)
+        body = message.get_payload(decode=True) if not message.is_multipart() else \
+            message.get_payload(0).get_payload(decode=True)
+        text = (body or b'').decode('utf-8', 'replace')
+        with self.lock:
+            self.received += 1
+            for recipient in recipients:
+                self.mailboxes[recipient.lower()] = (message.get('Subject', ''), text)
+
+    def last_message(self, recipient):
+        """(subject, body) of the newest mail to recipient, or None"""
+        with self.lock:
+            return self.mailboxes.get(recipient.lower())
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode('ascii'))
+
+    def handle(self):
+        self.reply('220 fake-smtp ESMTP ready')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250-fake-smtp' if verb == 'EHLO' else '250 fake-smtp')
+                if verb == 'EHLO':
+                    self.reply('250 8BITMIME')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip().strip('<>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(data[1:] if data.startswith(b'..') else data)
+                self.server.deliver(recipients, b''.join(lines))
+                time.sleep(self.server.latency)
+                self.reply('250 OK: queued')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            elif verb in ('RSET', 'NOOP'):
+                recipients = [] if verb == 'RSET' else recipients
+                self.reply('250 OK')
+            else:
+                self.reply('502 Command not implemented')
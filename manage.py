@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Database schema and seed data commands.
+
+The app no longer creates tables or seeds rows when it is imported, so a
+deploy runs these once before starting the workers:
+
+    python manage.py db upgrade             # apply Alembic migrations (adopts pre-Alembic databases)
+    python manage.py seed                   # default admin settings, demo profiles on an empty site
+    python manage.py seed --no-demo
+    python manage.py db revision -m "add foo to bar" --autogenerate
+    python manage.py db downgrade 0006
+    python manage.py db current | history | check | stamp <revision>
+"""
+
+import os
+import logging
+import argparse
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic.ini')
+
+# The schema db.create_all() used to build, before any migrate_*.py script
+BASELINE_REVISION = '0001'
+
+
+def alembic_config():
+    from alembic.config import Config
+    config = Config(ALEMBIC_INI)
+    config.set_main_option('script_location', os.path.join(os.path.dirname(ALEMBIC_INI), 'migrations'))
+    return config
+
+
+def adopt_existing_database(config):
+    """Stamp a database created by the old import-time create_all() at the baseline
+
+    Revisions after the baseline check what already exists, so it does not
+    matter which migrate_*.py scripts were run against it.
+    """
+    from alembic import command
+    from sqlalchemy import inspect
+    from app import app, db
+
+    with app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+        db.engine.dispose()
+    if 'users' in tables and 'alembic_version' not in tables:
+        print(f"📌 Existing database without migration history, stamping revision {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+
+
+def run_db_command(args):
+    from alembic import command
+    config = alembic_config()
+    if args.action == 'upgrade':
+        adopt_existing_database(config)
+        command.upgrade(config, args.revision or 'head')
+        print("✅ Database is up to date")
+    elif args.action == 'downgrade':
+        if not args.revision:
+            raise SystemExit("❌ downgrade needs a target revision, e.g. 0006 or -1")
+        command.downgrade(config, args.revision)
+    elif args.action == 'revision':
+        if not args.message:
+            raise SystemExit("❌ revision needs -m/--message")
+        command.revision(config, message=args.message, autogenerate=args.autogenerate)
+    elif args.action == 'stamp':
+        command.stamp(config, args.revision or 'head')
+    elif args.action == 'current':
+        command.current(config, verbose=True)
+    elif args.action == 'history':
+        command.history(config)
+    elif args.action == 'check':
+        command.check(config)
+        print("✅ Models match the migrations")
+
+
+def seed_admin_settings():
+    """Create the single AdminSettings row if it does not exist; returns True if created"""
+    from app import db
+    from models import AdminSettings, MPesaEnvironment
+    if AdminSettings.query.first():
+        return False
+    admin_settings = AdminSettings()
+    admin_settings.media_photos_enabled = True
+    admin_settings.media_videos_enabled = False
+    admin_settings.global_override_enabled = True  # Start with free access
+    admin_settings.mpesa_env = MPesaEnvironment.SANDBOX
+    admin_settings.mpesa_company_name = 'SkillBridge Africa'
+    db.session.add(admin_settings)
+    db.session.commit()
+    return True
+
+
+def create_dummy_profiles():
+    """Create 10 dummy placeholder profiles for demonstration"""
+    from models import User, Profile, UserRole, ProfileType, AvailabilityStatus, RateType, UrgencyLevel
+    from app import db
+    from werkzeug.security import generate_password_hash
+    
+    # Sample data for dummy profiles
+    professional_data = [
+        {
+            "email": "demo.plumber@example.com",
+            "title": "Expert Plumber - Example Profile",
+            "category": "Plumbing",
+            "bio": "This is a demonstration profile. Professional plumbing services with 10+ years experience.",
+            "location_country": "Kenya",
+            "location_county": "Nairobi",
+            "location_town": "Westlands",
+            "tags": "plumbing,repairs,installation,emergency",
+            "years_experience": 10,
+            "rate_type": "hourly",
+            "rate_value": 1500
+        },
+        {
+            "email": "demo.electrician@example.com", 
+            "title": "Licensed Electrician - Example Profile",
+            "category": "Electrical",
+            "bio": "This is a demonstration profile. Certified electrical contractor for residential and commercial projects.",
+            "location_country": "Kenya",
+            "location_county": "Mombasa",
+            "location_town": "Nyali",
+            "tags": "electrical,wiring,installation,repair",
+            "years_experience": 8,
+            "rate_type": "daily",
+            "rate_value": 5000
+        },
+        {
+            "email": "demo.mason@example.com",
+            "title": "Master Mason - Example Profile", 
+            "category": "Masonry",
+            "bio": "This is a demonstration profile. Skilled in stonework, brickwork, and concrete construction.",
+            "location_country": "Kenya",
+            "location_county": "Kiambu",
+            "location_town": "Thika",
+            "tags": "masonry,construction,stonework,concrete",
+            "years_experience": 15,
+            "rate_type": "fixed",
+            "rate_value": 50000
+        },
+        {
+            "email": "demo.tutor@example.com",
+            "title": "Mathematics Tutor - Example Profile",
+            "category": "Education",
+            "bio": "This is a demonstration profile. Experienced mathematics teacher offering private tutoring.",
+            "location_country": "Kenya", 
+            "location_county": "Nakuru",
+            "location_town": "Nakuru Town",
+            "tags": "mathematics,tutoring,education,algebra",
+            "years_experience": 5,
+            "rate_type": "hourly",
+            "rate_value": 800
+        },
+        {
+            "email": "demo.photographer@example.com",
+            "title": "Event Photographer - Example Profile",
+            "category": "Photography",
+            "bio": "This is a demonstration profile. Professional event and portrait photographer.",
+            "location_country": "Kenya",
+            "location_county": "Nairobi",
+            "location_town": "Karen",
+            "tags": "photography,events,portraits,weddings",
+            "years_experience": 6,
+            "rate_type": "fixed",
+            "rate_value": 15000
+        }
+    ]
+    
+    client_data = [
+        {
+            "email": "demo.client1@example.com",
+            "title": "Home Renovation Project - Example Profile",
+            "bio": "This is a demonstration profile. Looking for skilled professionals for home renovation.",
+            "location_country": "Kenya",
+            "location_county": "Nairobi", 
+            "location_town": "Kilimani",
+            "what_looking_for": "Need plumber and electrician for bathroom renovation",
+            "urgency": "This month"
+        },
+        {
+            "email": "demo.client2@example.com",
+            "title": "Wedding Planning - Example Profile", 
+            "bio": "This is a demonstration profile. Planning a wedding and need various service providers.",
+            "location_country": "Kenya",
+            "location_county": "Kajiado",
+            "location_town": "Ngong",
+            "what_looking_for": "Photographer, caterer, and event coordinator needed",
+            "urgency": "Flexible"
+        },
+        {
+            "email": "demo.client3@example.com",
+            "title": "Student Tutoring - Example Profile",
+            "bio": "This is a demonstration profile. Parent seeking math tutor for high school student.",
+            "location_country": "Kenya",
+            "location_county": "Kiambu", 
+            "location_town": "Ruiru",
+            "what_looking_for": "Mathematics tutor for Form 3 student",
+            "urgency": "This week"
+        },
+        {
+            "email": "demo.client4@example.com",
+            "title": "Construction Project - Example Profile",
+            "bio": "This is a demonstration profile. Commercial construction project needs skilled workers.",
+            "location_country": "Kenya",
+            "location_county": "Machakos",
+            "location_town": "Machakos Town", 
+            "what_looking_for": "Masons and general construction workers",
+            "urgency": "Today"
+        },
+        {
+            "email": "demo.client5@example.com",
+            "title": "Corporate Event - Example Profile",
+            "bio": "This is a demonstration profile. Planning corporate event and need service providers.",
+            "location_country": "Kenya",
+            "location_county": "Nairobi",
+            "location_town": "Upper Hill",
+            "what_looking_for": "Event photographer and catering services",
+            "urgency": "This month"
+        }
+    ]
+    
+    # Create dummy users and profiles
+    for i, prof_data in enumerate(professional_data):
+        user = User()
+        user.email = prof_data["email"]
+        user.password_hash = generate_password_hash("demo123")
+        user.role = UserRole.USER
+        user.is_active = True
+        user.email_verified = True
+        db.session.add(user)
+        db.session.flush()  # Get user ID
+        
+        profile = Profile()
+        profile.user_id = user.id
+        profile.type = ProfileType.PROFESSIONAL
+        profile.title = prof_data["title"]
+        profile.bio = prof_data["bio"]
+        profile.location_country = prof_data["location_country"]
+        profile.location_county = prof_data["location_county"]
+        profile.location_town = prof_data["location_town"]
+        profile.tags = prof_data["tags"]
+        profile.category = prof_data["category"]
+        profile.years_experience = prof_data["years_experience"]
+        profile.rate_type = RateType(prof_data["rate_type"])
+        profile.rate_value = prof_data["rate_value"]
+        profile.availability = AvailabilityStatus.AVAILABLE
+        profile.is_listed = True
+        profile.is_new_user_flag = True
+        db.session.add(profile)
+    
+    for i, client_data_item in enumerate(client_data):
+        user = User()
+        user.email = client_data_item["email"]
+        user.password_hash = generate_password_hash("demo123")
+        user.role = UserRole.USER
+        user.is_active = True
+        user.email_verified = True
+        db.session.add(user)
+        db.session.flush()  # Get user ID
+        
+        profile = Profile()
+        profile.user_id = user.id
+        profile.type = ProfileType.CLIENT
+        profile.title = client_data_item["title"]
+        profile.bio = client_data_item["bio"]
+        profile.location_country = client_data_item["location_country"]
+        profile.location_county = client_data_item["location_county"]
+        profile.location_town = client_data_item["location_town"]
+        profile.what_looking_for = client_data_item["what_looking_for"]
+        profile.urgency = UrgencyLevel(client_data_item["urgency"])
+        profile.availability = AvailabilityStatus.AVAILABLE
+        profile.is_listed = True
+        profile.is_new_user_flag = True
+        db.session.add(profile)
+    
+    db.session.commit()
+    logging.info("Created 10 dummy placeholder profiles")
+
+
+def run_seed(demo):
+    from app import app
+    from models import Profile
+    with app.app_context():
+        if seed_admin_settings():
+            print("✓ Created default admin settings")
+        else:
+            print("Admin settings already exist, skipping")
+        if not demo:
+            return
+        if Profile.query.count() == 0:
+            create_dummy_profiles()
+            print("✓ Created 10 demo profiles")
+        else:
+            print("Profiles already exist, skipping demo profiles")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the SkillBridge database")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    db_parser = commands.add_parser('db', help="Alembic schema migrations")
+    db_parser.add_argument('action', choices=['upgrade', 'downgrade', 'revision', 'stamp', 'current', 'history',
+                                              'check'])
+    db_parser.add_argument('revision', nargs='?', help="target revision (upgrade/stamp default: head)")
+    db_parser.add_argument('-m', '--message', help="message for a new revision")
+    db_parser.add_argument('--autogenerate', action='store_true', help="diff the models against the database")
+
+    seed_parser = commands.add_parser('seed', help="create default admin settings and demo profiles")
+    seed_parser.add_argument('--no-demo', action='store_true', help="only create the admin settings row")
+    args = parser.parse_args()
+
+    if args.command == 'db':
+        print(f"🔄 Running db {args.action}...")
+        run_db_command(args)
+    else:
+        print("🌱 Seeding database...")
+        run_seed(not args.no_demo)
+        print("✅ Seeding completed")
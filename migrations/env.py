@@ -0,0 +1,49 @@
+"""
+Alembic environment: runs migrations against the app's engine and models.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app import app, db
+import models  # noqa: F401  registers every table on db.metadata
+
+config = context.config
+if config.config_file_name is not None and not config.attributes.get('configured_logging'):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = db.metadata
+
+
+def run_migrations_offline():
+    """Emit SQL instead of executing it (alembic --sql)"""
+    context.configure(
+        url=app.config['SQLALCHEMY_DATABASE_URI'],
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+        compare_type=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with app.app_context():
+        with db.engine.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                compare_type=True,
+                # SQLite can only ALTER columns by copying the table
+                render_as_batch=connection.dialect.name == 'sqlite',
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
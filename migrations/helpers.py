@@ -0,0 +1,31 @@
+"""
+Existence checks for revisions that must also apply cleanly to databases
+where the old migrate_*.py scripts already made some of the same changes.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def has_table(table_name):
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def has_column(table_name, column_name):
+    return any(column['name'] == column_name for column in sa.inspect(op.get_bind()).get_columns(table_name))
+
+
+def has_index(table_name, index_name):
+    return any(index['name'] == index_name for index in sa.inspect(op.get_bind()).get_indexes(table_name))
+
+
+def add_column_if_missing(table_name, column):
+    if has_column(table_name, column.name):
+        print(f"Column {table_name}.{column.name} already exists, skipping")
+        return
+    op.add_column(table_name, column)
+
+
+def create_index_if_missing(index_name, table_name, columns):
+    if not has_index(table_name, index_name):
+        op.create_index(index_name, table_name, columns, unique=False)
@@ -0,0 +1,282 @@
+"""Initial schema
+
+The tables as they were before the migrate_*.py scripts; revisions 0002-0007
+are those scripts. Databases created by the old db.create_all() at import
+are adopted by `manage.py db upgrade`, which stamps them at this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = ('userrole', 'profiletype', 'availabilitystatus', 'ratetype', 'urgencylevel',
+         'subscriptionstatus', 'paymentstatus', 'planaudience', 'mpesaenvironment')
+
+
+def upgrade():
+    op.create_table('admin_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_token', sa.String(length=100), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_token')
+    )
+    op.create_table('admin_settings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('media_photos_enabled', sa.Boolean(), nullable=True),
+    sa.Column('media_videos_enabled', sa.Boolean(), nullable=True),
+    sa.Column('global_override_enabled', sa.Boolean(), nullable=True),
+    sa.Column('mpesa_shortcode', sa.String(length=20), nullable=True),
+    sa.Column('mpesa_passkey', sa.String(length=500), nullable=True),
+    sa.Column('mpesa_company_name', sa.String(length=200), nullable=True),
+    sa.Column('mpesa_env', sa.Enum('SANDBOX', 'LIVE', name='mpesaenvironment'), nullable=True),
+    sa.Column('callback_base_url', sa.String(length=500), nullable=True),
+    sa.Column('admin_password_hash', sa.String(length=256), nullable=True),
+    sa.Column('email_server', sa.String(length=200), nullable=True),
+    sa.Column('email_port', sa.Integer(), nullable=True),
+    sa.Column('email_username', sa.String(length=200), nullable=True),
+    sa.Column('email_password', sa.String(length=200), nullable=True),
+    sa.Column('logo_url', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('banners',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=300), nullable=False),
+    sa.Column('body_html', sa.Text(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('cta_text', sa.String(length=100), nullable=True),
+    sa.Column('cta_href', sa.String(length=500), nullable=True),
+    sa.Column('target_rule_json', sa.Text(), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=True),
+    sa.Column('end_at', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('feature_flags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('value_json', sa.Text(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    op.create_table('homepage_photos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('filename', sa.String(length=300), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('audience', sa.Enum('CLIENT', 'PROFESSIONAL', name='planaudience'), nullable=False),
+    sa.Column('price_kes', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('duration_days', sa.Integer(), nullable=False),
+    sa.Column('features_json', sa.Text(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('update_posts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=300), nullable=False),
+    sa.Column('body_html', sa.Text(), nullable=False),
+    sa.Column('banner_image_url', sa.String(length=500), nullable=True),
+    sa.Column('is_pinned', sa.Boolean(), nullable=True),
+    sa.Column('audience', sa.String(length=50), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=True),
+    sa.Column('end_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('password_hash', sa.String(length=256), nullable=False),
+    sa.Column('role', sa.Enum('USER', 'ADMIN', name='userrole'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('email_verified', sa.Boolean(), nullable=False),
+    sa.Column('otp_code', sa.String(length=6), nullable=True),
+    sa.Column('otp_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_table('profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.Enum('CLIENT', 'PROFESSIONAL', name='profiletype'), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('location_country', sa.String(length=100), nullable=False),
+    sa.Column('location_county', sa.String(length=100), nullable=False),
+    sa.Column('location_sub_county', sa.String(length=100), nullable=True),
+    sa.Column('location_town', sa.String(length=100), nullable=False),
+    sa.Column('bio', sa.Text(), nullable=False),
+    sa.Column('tags', sa.Text(), nullable=True),
+    sa.Column('availability', sa.Enum('AVAILABLE', 'BUSY', 'ON_VACATION', name='availabilitystatus'), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('rate_type', sa.Enum('HOURLY', 'DAILY', 'FIXED', 'NEGOTIABLE', name='ratetype'), nullable=True),
+    sa.Column('rate_value', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('certifications', sa.Text(), nullable=True),
+    sa.Column('team_name', sa.String(length=200), nullable=True),
+    sa.Column('years_experience', sa.Integer(), nullable=True),
+    sa.Column('is_group', sa.Boolean(), nullable=True),
+    sa.Column('what_looking_for', sa.Text(), nullable=True),
+    sa.Column('urgency', sa.Enum('TODAY', 'THIS_WEEK', 'THIS_MONTH', 'FLEXIBLE', name='urgencylevel'), nullable=True),
+    sa.Column('is_listed', sa.Boolean(), nullable=False),
+    sa.Column('is_new_user_flag', sa.Boolean(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('is_boosted', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_profile_type_category_location', 'profiles', ['type', 'category', 'location_country', 'location_county'], unique=False)
+    op.create_index(op.f('ix_profiles_category'), 'profiles', ['category'], unique=False)
+    op.create_index(op.f('ix_profiles_location_country'), 'profiles', ['location_country'], unique=False)
+    op.create_index(op.f('ix_profiles_location_county'), 'profiles', ['location_county'], unique=False)
+    op.create_index(op.f('ix_profiles_type'), 'profiles', ['type'], unique=False)
+    op.create_index(op.f('ix_profiles_user_id'), 'profiles', ['user_id'], unique=False)
+    op.create_table('media_assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('profile_id', sa.Integer(), nullable=True),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('storage_provider', sa.String(length=50), nullable=True),
+    sa.Column('filename', sa.String(length=300), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('is_homepage_photo', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sender_user_id', sa.Integer(), nullable=False),
+    sa.Column('recipient_user_id', sa.Integer(), nullable=False),
+    sa.Column('profile_context_id', sa.Integer(), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('is_admin_message', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_context_id'], ['profiles.id'], ),
+    sa.ForeignKeyConstraint(['recipient_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['sender_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_message_recipient_created', 'messages', ['recipient_user_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_messages_created_at'), 'messages', ['created_at'], unique=False)
+    op.create_index(op.f('ix_messages_recipient_user_id'), 'messages', ['recipient_user_id'], unique=False)
+    op.create_index(op.f('ix_messages_sender_user_id'), 'messages', ['sender_user_id'], unique=False)
+    op.create_table('payments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('mpesa_phone', sa.String(length=15), nullable=False),
+    sa.Column('amount_kes', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SUCCESS', 'FAILED', name='paymentstatus'), nullable=True),
+    sa.Column('provider_ref', sa.String(length=200), nullable=True),
+    sa.Column('account_reference', sa.String(length=200), nullable=False),
+    sa.Column('raw_callback_json', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['plan_id'], ['plans.id'], ),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('account_reference')
+    )
+    op.create_index('idx_payment_status_created', 'payments', ['status', 'created_at'], unique=False)
+    op.create_index(op.f('ix_payments_created_at'), 'payments', ['created_at'], unique=False)
+    op.create_table('reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('reviewer_user_id', sa.Integer(), nullable=False),
+    sa.Column('reviewed_user_id', sa.Integer(), nullable=False),
+    sa.Column('reviewed_profile_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('professionalism_rating', sa.Integer(), nullable=False),
+    sa.Column('skill_rating', sa.Integer(), nullable=False),
+    sa.Column('ease_of_work_rating', sa.Integer(), nullable=False),
+    sa.Column('overall_rating', sa.Float(), nullable=False),
+    sa.Column('is_approved', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['reviewed_profile_id'], ['profiles.id'], ),
+    sa.ForeignKeyConstraint(['reviewed_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['reviewer_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('subscriptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('ACTIVE', 'EXPIRED', 'PENDING', name='subscriptionstatus'), nullable=True),
+    sa.Column('start_at', sa.DateTime(), nullable=True),
+    sa.Column('end_at', sa.DateTime(), nullable=False),
+    sa.Column('metadata_json', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['plan_id'], ['plans.id'], ),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_subscription_user_profile_status', 'subscriptions', ['user_id', 'profile_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_subscription_user_profile_status', table_name='subscriptions')
+    op.drop_table('subscriptions')
+    op.drop_table('reviews')
+    op.drop_index(op.f('ix_payments_created_at'), table_name='payments')
+    op.drop_index('idx_payment_status_created', table_name='payments')
+    op.drop_table('payments')
+    op.drop_index(op.f('ix_messages_sender_user_id'), table_name='messages')
+    op.drop_index(op.f('ix_messages_recipient_user_id'), table_name='messages')
+    op.drop_index(op.f('ix_messages_created_at'), table_name='messages')
+    op.drop_index('idx_message_recipient_created', table_name='messages')
+    op.drop_table('messages')
+    op.drop_table('media_assets')
+    op.drop_index(op.f('ix_profiles_user_id'), table_name='profiles')
+    op.drop_index(op.f('ix_profiles_type'), table_name='profiles')
+    op.drop_index(op.f('ix_profiles_location_county'), table_name='profiles')
+    op.drop_index(op.f('ix_profiles_location_country'), table_name='profiles')
+    op.drop_index(op.f('ix_profiles_category'), table_name='profiles')
+    op.drop_index('idx_profile_type_category_location', table_name='profiles')
+    op.drop_table('profiles')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_table('update_posts')
+    op.drop_table('plans')
+    op.drop_table('homepage_photos')
+    op.drop_table('feature_flags')
+    op.drop_table('banners')
+    op.drop_table('admin_settings')
+    op.drop_table('admin_sessions')
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in ENUMS:
+            op.execute(f"DROP TYPE IF EXISTS {name}")
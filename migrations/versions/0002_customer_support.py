@@ -0,0 +1,32 @@
+"""Customer support contact columns on admin_settings
+
+Replaces migrate_customer_support.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('admin_settings', sa.Column('support_whatsapp', sa.String(length=20), nullable=True))
+    add_column_if_missing('admin_settings', sa.Column('support_phone', sa.String(length=20), nullable=True))
+    add_column_if_missing('admin_settings', sa.Column('support_email', sa.String(length=200), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('admin_settings') as batch_op:
+        batch_op.drop_column('support_email')
+        batch_op.drop_column('support_phone')
+        batch_op.drop_column('support_whatsapp')
@@ -0,0 +1,41 @@
+"""profile_views table
+
+Replaces migrate_profile_views.py.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if has_table('profile_views'):
+        print("Table profile_views already exists, skipping")
+        return
+    op.create_table('profile_views',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('profile_id', sa.Integer(), nullable=False),
+    sa.Column('viewer_user_id', sa.Integer(), nullable=True),
+    sa.Column('viewer_ip', sa.String(length=45), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['profile_id'], ['profiles.id'], ),
+    sa.ForeignKeyConstraint(['viewer_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_profile_views_profile_date', 'profile_views', ['profile_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_profile_views_profile_date', table_name='profile_views')
+    op.drop_table('profile_views')
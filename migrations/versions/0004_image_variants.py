@@ -0,0 +1,31 @@
+"""Image variant columns on profiles and media_assets
+
+Replaces migrate_image_variants.py.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('profiles', sa.Column('avatar_variants_json', sa.Text(), nullable=True))
+    add_column_if_missing('media_assets', sa.Column('variants_json', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('media_assets') as batch_op:
+        batch_op.drop_column('variants_json')
+    with op.batch_alter_table('profiles') as batch_op:
+        batch_op.drop_column('avatar_variants_json')
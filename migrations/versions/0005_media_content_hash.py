@@ -0,0 +1,30 @@
+"""Content hash column on media_assets
+
+Replaces migrate_media_content_hash.py.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, create_index_if_missing
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('media_assets', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    create_index_if_missing('ix_media_assets_content_hash', 'media_assets', ['content_hash'])
+
+
+def downgrade():
+    op.drop_index('ix_media_assets_content_hash', table_name='media_assets')
+    with op.batch_alter_table('media_assets') as batch_op:
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,31 @@
+"""updated_at on reviews, backfilled, and an index on reviewed_profile_id
+
+Replaces migrate_review_updated_at.py.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 09:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, create_index_if_missing
+
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('reviews', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE reviews SET updated_at = created_at WHERE updated_at IS NULL")
+    create_index_if_missing('ix_reviews_reviewed_profile_id', 'reviews', ['reviewed_profile_id'])
+
+
+def downgrade():
+    op.drop_index('ix_reviews_reviewed_profile_id', table_name='reviews')
+    with op.batch_alter_table('reviews') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,34 @@
+"""revoked_at on admin_sessions, an index on expires_at, and a purge of expired rows
+
+Replaces migrate_admin_session_revocation.py.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 09:00:00
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column_if_missing, create_index_if_missing
+
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column_if_missing('admin_sessions', sa.Column('revoked_at', sa.DateTime(), nullable=True))
+    create_index_if_missing('ix_admin_sessions_expires_at', 'admin_sessions', ['expires_at'])
+    op.get_bind().execute(sa.text("DELETE FROM admin_sessions WHERE expires_at < :now"),
+                          {'now': datetime.utcnow()})
+
+
+def downgrade():
+    op.drop_index('ix_admin_sessions_expires_at', table_name='admin_sessions')
+    with op.batch_alter_table('admin_sessions') as batch_op:
+        batch_op.drop_column('revoked_at')
@@ -0,0 +1,38 @@
+"""content_versions: one-row change counters for conditional GETs of /browse
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 15:00:00
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not has_table('content_versions'):
+        op.create_table(
+            'content_versions',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('name'),
+        )
+    bind = op.get_bind()
+    if not bind.execute(sa.text("SELECT 1 FROM content_versions WHERE name = 'browse'")).first():
+        bind.execute(sa.text("INSERT INTO content_versions (name, version, updated_at) VALUES ('browse', 0, :now)"),
+                     {'now': datetime.utcnow()})
+
+
+def downgrade():
+    op.drop_table('content_versions')
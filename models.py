@@ -3,6 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from app import db
 import enum
+import json
 
 class UserRole(enum.Enum):
     USER = "user"
@@ -75,6 +76,14 @@ class User(UserMixin, db.Model):
     @is_active.setter
     def is_active(self, value):
         self.active = value
+    
+    @property
+    def profile_ids(self):
+        """Ids of the user's profiles (filled in by IdentityCache, otherwise one query)"""
+        if self.__dict__.get('_profile_ids') is None:
+            self._profile_ids = [profile_id for (profile_id,) in
+                                 db.session.query(Profile.id).filter_by(user_id=self.id).order_by(Profile.id)]
+        return self._profile_ids
 
 class Profile(db.Model):
     __tablename__ = 'profiles'
@@ -84,6 +93,7 @@ class Profile(db.Model):
     type = db.Column(db.Enum(ProfileType), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
     avatar_url = db.Column(db.String(500), nullable=True)
+    avatar_variants_json = db.Column(db.Text, nullable=True)  # Resized WebP/JPEG variants
     location_country = db.Column(db.String(100), nullable=False, index=True)
     location_county = db.Column(db.String(100), nullable=False, index=True)
     location_sub_county = db.Column(db.String(100), nullable=True)
@@ -124,6 +134,10 @@ class Profile(db.Model):
     def total_views(self):
         return self.views.count()
     
+    @property
+    def avatar_variants(self):
+        return json.loads(self.avatar_variants_json) if self.avatar_variants_json else {}
+    
     __table_args__ = (
         db.Index('idx_profile_type_category_location', 'type', 'category', 'location_country', 'location_county'),
     )
@@ -150,7 +164,7 @@ class Review(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     reviewer_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     reviewed_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    reviewed_profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False)
+    reviewed_profile_id = db.Column(db.Integer, db.ForeignKey('profiles.id'), nullable=False, index=True)
     content = db.Column(db.Text, nullable=False)
     
     # Star ratings (1-5)
@@ -161,6 +175,7 @@ class Review(db.Model):
     
     is_approved = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class UpdatePost(db.Model):
     __tablename__ = 'update_posts'
@@ -293,9 +308,15 @@ class MediaAsset(db.Model):
     url = db.Column(db.String(500), nullable=False)
     storage_provider = db.Column(db.String(50), default='LOCAL')  # LOCAL, S3, CLOUDINARY
     filename = db.Column(db.String(300), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # SHA-256 of the stored blob
     description = db.Column(db.String(500), nullable=True)
     is_homepage_photo = db.Column(db.Boolean, default=False)
+    variants_json = db.Column(db.Text, nullable=True)  # Resized WebP/JPEG variants
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    @property
+    def variants(self):
+        return json.loads(self.variants_json) if self.variants_json else {}
 
 class FeatureFlag(db.Model):
     __tablename__ = 'feature_flags'
@@ -336,5 +357,14 @@ class AdminSession(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     session_token = db.Column(db.String(100), unique=True, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=True)  # Set on logout; see AdminSessions
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+class ContentVersion(db.Model):
+    """One row per public listing; writes that change it bump the version (see ConditionalGet)"""
+    __tablename__ = 'content_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,116 @@
+import time
+import uuid
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from app import db
+from models import AdminSession
+
+
+class AdminSessions:
+    """Signed, expiring admin session tokens.
+
+    The token carries the AdminSession id and its issue time, signed with
+    the app secret, so verify() needs no database access. Logged-out
+    sessions are recorded in admin_sessions.revoked_at; each worker keeps
+    the unexpired revoked ids in memory and refreshes that list every
+    ADMIN_REVOCATION_REFRESH seconds. Expired rows are deleted in bulk at
+    most every ADMIN_SESSION_PURGE_INTERVAL seconds. Both run on their own
+    primary connection and transaction, never in the request's session, so
+    they cannot commit a view's pending changes.
+    """
+    SALT = 'admin-session'
+
+    _lock = threading.Lock()
+    _revoked = set()
+    _refreshed_at = None
+    _purged_at = None
+
+    @staticmethod
+    def _serializer():
+        return URLSafeTimedSerializer(current_app.secret_key, salt=AdminSessions.SALT)
+
+    @staticmethod
+    def _lifetime():
+        return timedelta(hours=current_app.config.get('ADMIN_SESSION_HOURS', 2))
+
+    @staticmethod
+    def issue():
+        """Create an AdminSession row and return its signed token"""
+        session_id = uuid.uuid4().hex
+        admin_session = AdminSession()
+        admin_session.session_token = session_id
+        admin_session.expires_at = datetime.utcnow() + AdminSessions._lifetime()
+        db.session.add(admin_session)
+        db.session.commit()
+        return AdminSessions._serializer().dumps(session_id)
+
+    @staticmethod
+    def session_id(token):
+        """The session id in a valid, unexpired token, else None"""
+        if not token:
+            return None
+        try:
+            return AdminSessions._serializer().loads(
+                token, max_age=int(AdminSessions._lifetime().total_seconds()))
+        except (BadSignature, SignatureExpired):
+            return None
+
+    @staticmethod
+    def verify(token):
+        session_id = AdminSessions.session_id(token)
+        if session_id is None:
+            return False
+        AdminSessions._refresh()
+        return session_id not in AdminSessions._revoked
+
+    @staticmethod
+    def revoke(token):
+        session_id = AdminSessions.session_id(token)
+        if session_id is None:
+            return
+        AdminSession.query.filter_by(session_token=session_id).update(
+            {'revoked_at': datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+        # After the commit, so a concurrent refresh cannot drop it again
+        with AdminSessions._lock:
+            AdminSessions._revoked.add(session_id)
+
+    @staticmethod
+    def _refresh():
+        config = current_app.config
+        interval = config.get('ADMIN_REVOCATION_REFRESH', 30)
+
+        def due(last, every):
+            return last is None or time.monotonic() - last >= every
+
+        if not due(AdminSessions._refreshed_at, interval):
+            return
+        with AdminSessions._lock:
+            if not due(AdminSessions._refreshed_at, interval):
+                return
+            AdminSessions._refreshed_at = time.monotonic()
+            table = AdminSession.__table__
+            with db.engine.begin() as connection:
+                if due(AdminSessions._purged_at, config.get('ADMIN_SESSION_PURGE_INTERVAL', 3600)):
+                    AdminSessions._purged_at = time.monotonic()
+                    AdminSessions.purge_expired(connection)
+                rows = connection.execute(select(table.c.session_token).where(
+                    table.c.revoked_at.isnot(None),
+                    table.c.expires_at > datetime.utcnow()
+                )).all()
+            AdminSessions._revoked = {token for (token,) in rows}
+
+    @staticmethod
+    def purge_expired(connection=None):
+        """Delete every expired admin_sessions row in one statement, outside the request's session"""
+        if connection is None:
+            with db.engine.begin() as connection:
+                return AdminSessions.purge_expired(connection)
+        table = AdminSession.__table__
+        deleted = connection.execute(table.delete().where(table.c.expires_at < datetime.utcnow())).rowcount
+        if deleted:
+            current_app.logger.info(f"Purged {deleted} expired admin sessions")
+        return deleted
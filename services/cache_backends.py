@@ -0,0 +1,140 @@
+import time
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # shared cache disabled; each worker keeps its own LRU
+    redis = None
+
+
+class LRUCache:
+    """Thread-safe in-process cache with LRU eviction and per-entry TTL"""
+
+    def __init__(self, max_entries=1000, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_many(self, keys):
+        return {key: value for key in keys if (value := self.get(key)) is not None}
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (ttl or self.ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """Cache shared by all workers, stored in Redis under a key prefix"""
+
+    def __init__(self, url, prefix, ttl=300):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        values = self.client.mget([self.prefix + key for key in keys])
+        return {key: value.decode('utf-8') for key, value in zip(keys, values) if value is not None}
+
+    def set(self, key, value, ttl=None):
+        self.client.setex(self.prefix + key, ttl or self.ttl, value)
+
+
+class TieredCache:
+    """Local LRU in front of an optional shared Redis cache.
+
+    Redis errors are logged and treated as misses, so an unavailable cache
+    server slows pages down instead of breaking them.
+    """
+
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+
+    def get_many(self, keys):
+        found = self.local.get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing and self.shared:
+            try:
+                remote = self.shared.get_many(missing)
+            except Exception as e:
+                current_app.logger.warning(f"Shared cache read failed: {e}")
+                remote = {}
+            for key, value in remote.items():
+                self.local.set(key, value)
+            found.update(remote)
+        return found
+
+    def get(self, key):
+        return self.get_many([key]).get(key)
+
+    def set(self, key, value, ttl=None):
+        self.local.set(key, value, ttl)
+        if self.shared:
+            try:
+                self.shared.set(key, value, ttl)
+            except Exception as e:
+                current_app.logger.warning(f"Shared cache write failed: {e}")
+
+    def delete_prefix(self, prefix):
+        # Shared entries are keyed by version and simply age out
+        self.local.delete_prefix(prefix)
+
+
+class CacheBackends:
+    """Builds and caches one TieredCache per name"""
+    _instances = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def get(name, max_entries=1000, ttl=300):
+        if name not in CacheBackends._instances:
+            with CacheBackends._lock:
+                if name not in CacheBackends._instances:
+                    shared = None
+                    url = current_app.config.get('CACHE_REDIS_URL')
+                    if url:
+                        if redis is None:
+                            current_app.logger.warning("CACHE_REDIS_URL is set but the redis package is missing")
+                        else:
+                            shared = RedisCache(url, prefix=f"skillbridge:{name}:", ttl=ttl)
+                    CacheBackends._instances[name] = TieredCache(LRUCache(max_entries, ttl), shared)
+        return CacheBackends._instances[name]
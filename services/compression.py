@@ -0,0 +1,238 @@
+import time
+import zlib
+import threading
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/rss+xml',
+    'image/svg+xml',
+)
+
+
+class _GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        # wbits 16+MAX_WBITS writes a gzip header and trailer
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._z.compress(data)
+
+    def flush(self):
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, quality):
+        self._c = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+
+    def compress(self, data):
+        return self._c.process(data)
+
+    def flush(self):
+        return self._c.flush()
+
+    def finish(self):
+        return self._c.finish()
+
+
+class CompressionStats:
+    """Running totals of bytes saved and CPU spent compressing"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        self.by_encoding = {}
+
+    def record(self, encoding, bytes_in, bytes_out, cpu_seconds):
+        with self._lock:
+            self.responses += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+            self.by_encoding[encoding] = self.by_encoding.get(encoding, 0) + 1
+
+    @property
+    def ratio(self):
+        return self.bytes_out / self.bytes_in if self.bytes_in else 1.0
+
+
+class CompressionMiddleware:
+    """WSGI middleware that gzip/brotli-encodes text responses.
+
+    A response is compressed when the client accepts an encoding, the
+    Content-Type is textual (HTML, JSON, JS, CSS, XML, SVG) and the body is
+    at least min_size bytes. Responses that already carry a Content-Encoding
+    (e.g. precompressed static bundles), media such as mp4/jpg, partial
+    content and `Cache-Control: no-transform` pass through untouched.
+
+    Bodies are compressed chunk by chunk and flushed after each chunk, so
+    streamed responses keep streaming. Only the first min_size bytes are
+    buffered to decide whether compression is worth it.
+    """
+
+    def __init__(self, app, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.stats = CompressionStats()
+
+    def _choose_encoding(self, environ):
+        accepted = parse_accept_header(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def _encoder(self, encoding):
+        if encoding == 'br':
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    @staticmethod
+    def _header(headers, name):
+        name = name.lower()
+        for key, value in headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    @staticmethod
+    def _is_eligible(status, headers):
+        code = int(status.split(' ', 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        get = lambda name: CompressionMiddleware._header(headers, name)
+        if get('Content-Encoding') or get('Content-Range'):
+            return False
+        if 'no-transform' in (get('Cache-Control') or ''):
+            return False
+        content_type = (get('Content-Type') or '').lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _add_vary(headers):
+        vary = CompressionMiddleware._header(headers, 'Vary')
+        if vary is None:
+            headers.append(('Vary', 'Accept-Encoding'))
+        elif 'accept-encoding' not in vary.lower() and vary.strip() != '*':
+            headers[:] = [(k, v) for k, v in headers if k.lower() != 'vary']
+            headers.append(('Vary', f"{vary}, Accept-Encoding"))
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+        encoding = self._choose_encoding(environ)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            if exc_info and captured.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            captured['status'], captured['headers'] = status, list(headers)
+            captured['exc_info'] = exc_info
+            return captured.setdefault('body', []).append
+
+        app_iter = self.app(environ, capture)
+        return self._respond(app_iter, captured, encoding, start_response)
+
+    def _respond(self, app_iter, captured, encoding, start_response):
+        try:
+            iterator = iter(app_iter)
+            buffered = list(captured.get('body', []))  # legacy write() calls
+            size = sum(len(chunk) for chunk in buffered)
+            exhausted = False
+
+            status, headers = captured['status'], captured['headers']
+            eligible = self._is_eligible(status, headers)
+
+            # Buffer just enough of the body to apply the size threshold
+            if eligible and encoding:
+                length = self._header(headers, 'Content-Length')
+                if length is not None and int(length) < self.min_size:
+                    eligible = False
+                else:
+                    while size < self.min_size:
+                        try:
+                            chunk = next(iterator)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        if chunk:
+                            buffered.append(chunk)
+                            size += len(chunk)
+                    if size < self.min_size:
+                        eligible = False
+                    # The app may call start_response again while streaming
+                    status, headers = captured['status'], captured['headers']
+
+            if eligible:
+                self._add_vary(headers)
+
+            if not (eligible and encoding):
+                captured['sent'] = True
+                start_response(status, headers, captured.get('exc_info'))
+                yield from buffered
+                if not exhausted:
+                    yield from iterator
+                return
+
+            headers = [(k, v) for k, v in headers if k.lower() != 'content-length']
+            headers.append(('Content-Encoding', encoding))
+            etag = self._header(headers, 'ETag')
+            if etag and not etag.startswith('W/'):
+                # The encoded body is a different representation of the resource
+                headers = [(k, v) for k, v in headers if k.lower() != 'etag']
+                headers.append(('ETag', f"W/{etag}"))
+
+            captured['sent'] = True
+            start_response(status, headers, captured.get('exc_info'))
+
+            encoder = self._encoder(encoding)
+            bytes_in = bytes_out = 0
+            cpu = 0.0
+
+            def encode(chunk, last=False):
+                nonlocal bytes_in, bytes_out, cpu
+                started = time.thread_time()
+                data = encoder.compress(chunk) if chunk else b''
+                data += encoder.finish() if last else encoder.flush()
+                cpu += time.thread_time() - started
+                bytes_in += len(chunk)
+                bytes_out += len(data)
+                return data
+
+            # The buffered head goes out as one block
+            head = b''.join(buffered)
+            if exhausted:
+                yield encode(head, last=True)
+            else:
+                yield encode(head)
+                for chunk in iterator:
+                    if chunk:
+                        yield encode(chunk)
+                yield encode(b'', last=True)
+            self.stats.record(encoding, bytes_in, bytes_out, cpu)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
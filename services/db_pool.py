@@ -0,0 +1,141 @@
+import os
+import time
+import logging
+from flask import current_app, request, g, has_request_context
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, NullPool
+
+logger = logging.getLogger(__name__)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            DatabasePool.record_wait(time.perf_counter() - started, timed_out)
+
+
+class TimedNullPool(NullPool):
+    """NullPool (a new connection per checkout, for PgBouncer) with the same timing"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DatabasePool.record_wait(time.perf_counter() - started, False)
+
+
+class DatabasePool:
+    """SQLAlchemy engine options and connection handling per worker.
+
+    DB_POOL_MODE=DIRECT (Postgres itself) keeps a LIFO QueuePool per worker,
+    sized for the gunicorn profile unless DB_POOL_SIZE / DB_MAX_OVERFLOW are
+    set: sync workers need 2 connections (request + background thread),
+    gthread workers GUNICORN_THREADS + 1, gevent workers 10. LIFO hands out
+    the most recently used connection, so idle ones age out through
+    pool_recycle instead of being kept warm by round-robin checkouts.
+
+    DB_POOL_MODE=PGBOUNCER is for PgBouncer in transaction pooling mode:
+    a NullPool (PgBouncer does the pooling; DB_PGBOUNCER_NULLPOOL=false
+    keeps a small local pool) and no server-side prepared statements.
+
+    pool_pre_ping is off: instead of a round-trip on every checkout, a
+    dropped connection fails the statement, SQLAlchemy invalidates the
+    pool, and a GET/HEAD request that has not committed anything is run
+    once more on a fresh connection (or on the primary, when a read
+    replica failed; see ReadReplicas).
+    """
+
+    @staticmethod
+    def default_sizes():
+        """(pool_size, max_overflow) for the gunicorn profile this worker runs under"""
+        profile = os.environ.get('GUNICORN_PROFILE', 'gthread').lower()
+        if profile == 'gevent':
+            return 10, 10
+        if profile == 'sync':
+            return 2, 1
+        return int(os.environ.get('GUNICORN_THREADS') or 4) + 1, 2
+
+    @staticmethod
+    def engine_options(config):
+        """SQLALCHEMY_ENGINE_OPTIONS for the configured database and DB_POOL_MODE"""
+        url = config['SQLALCHEMY_DATABASE_URI']
+        if url.startswith('sqlite'):
+            return {}  # SQLite picks its own pool (one connection per thread for :memory:)
+
+        options = {
+            'pool_pre_ping': config.get('DB_POOL_PRE_PING', False),
+        }
+        if config.get('DB_POOL_MODE', 'DIRECT') == 'PGBOUNCER':
+            if url.startswith('postgresql+psycopg:'):
+                # psycopg 3 prepares repeated statements server-side; a prepared
+                # statement lives on one server connection, which PgBouncer swaps
+                options['connect_args'] = {'prepare_threshold': None}
+            if config.get('DB_PGBOUNCER_NULLPOOL', True):
+                options['poolclass'] = TimedNullPool
+                return options
+            pool_size, max_overflow = 2, 2
+        else:
+            pool_size, max_overflow = DatabasePool.default_sizes()
+
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=config.get('DB_POOL_SIZE') or pool_size,
+            max_overflow=config['DB_MAX_OVERFLOW'] if config.get('DB_MAX_OVERFLOW') is not None else max_overflow,
+            pool_timeout=config.get('DB_POOL_TIMEOUT', 10),
+            pool_recycle=config.get('DB_POOL_RECYCLE', 300),
+            pool_use_lifo=True,
+        )
+        return options
+
+    @staticmethod
+    def init_app(app):
+        if not event.contains(Engine, 'handle_error', _handle_error):
+            event.listen(Engine, 'handle_error', _handle_error)
+            event.listen(Session, 'after_commit', _mark_committed)
+        app.register_error_handler(exc.DBAPIError, DatabasePool._retry_after_disconnect)
+
+    @staticmethod
+    def record_wait(seconds, timed_out):
+        from services.metrics import Metrics
+        from services.request_metrics import RequestMetrics
+        Metrics.pool_wait(seconds, timed_out)
+        stats = RequestMetrics.current()
+        if stats is not None:
+            stats.pool_wait_seconds += seconds
+
+    @staticmethod
+    def _retry_after_disconnect(error):
+        """Run an idempotent request again after the database dropped its connection"""
+        from app import db
+        lost = error.connection_invalidated or g.get('_db_replica_failed')
+        if not (lost and request.method in ('GET', 'HEAD')
+                and not g.get('_db_committed') and not g.get('_db_retried')):
+            raise error
+        g._db_retried = True
+        db.session.rollback()
+        current_app.logger.warning(f"Database connection lost during {request.path}, retrying once")
+        return current_app.dispatch_request()
+
+
+def _handle_error(context):
+    if context.is_disconnect:
+        from services.metrics import Metrics
+        Metrics.db_disconnect()
+        logger.warning(f"Database disconnect: {context.original_exception}")
+
+
+def _mark_committed(session):
+    if has_request_context():
+        g._db_committed = True
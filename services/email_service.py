@@ -3,11 +3,23 @@ import random
 import string
 from datetime import datetime, timedelta
 from flask import current_app
-from flask_mail import Message, Mail
-from app import mail, db
+from app import db
 from models import User, AdminSettings
+from services.metrics import Metrics
 
 class EmailService:
+    _mail = None
+
+    @staticmethod
+    def mail():
+        """Flask-Mail, imported and bound to the app by the first email rather than at boot"""
+        from flask_mail import Mail
+        if EmailService._mail is None:
+            EmailService._mail = Mail()
+        if 'mail' not in current_app.extensions:
+            EmailService._mail.init_app(current_app)
+        return EmailService._mail
+    
     @staticmethod
     def generate_otp():
         """Generate a 6-digit OTP"""
@@ -36,13 +48,16 @@ class EmailService:
             SkillBridge Africa Team
             """
             
+            from flask_mail import Message
+            mailer = EmailService.mail()  # Message() reads the default sender from it
             msg = Message(
                 subject=subject,
                 recipients=[email],
                 body=body
             )
             
-            mail.send(msg)
+            with Metrics.email_send('otp'):
+                mailer.send(msg)
             current_app.logger.info(f"OTP email sent successfully to {email}")
             return True
         except Exception as e:
@@ -71,13 +86,16 @@ class EmailService:
             SkillBridge Africa Team
             """
             
+            from flask_mail import Message
+            mailer = EmailService.mail()  # Message() reads the default sender from it
             msg = Message(
                 subject=subject,
                 recipients=[email],
                 body=body
             )
             
-            mail.send(msg)
+            with Metrics.email_send('welcome'):
+                mailer.send(msg)
             return True
         except Exception as e:
             current_app.logger.error(f"Failed to send welcome email: {e}")
@@ -129,7 +147,7 @@ class EmailService:
                 current_app.config['MAIL_DEFAULT_SENDER'] = settings.email_username
                 
                 # Reinitialize mail with new settings
-                mail.init_app(current_app)
+                EmailService.mail().init_app(current_app)
                 return True
             elif current_app.config.get('MAIL_USERNAME'):
                 return True  # Environment variables are already configured
@@ -144,13 +162,16 @@ class EmailService:
     def send_notification(email, subject, message):
         """Send general notification email"""
         try:
+            from flask_mail import Message
+            mailer = EmailService.mail()  # Message() reads the default sender from it
             msg = Message(
                 subject=f"SkillBridge Africa - {subject}",
                 recipients=[email],
                 body=message
             )
             
-            mail.send(msg)
+            with Metrics.email_send('notification'):
+                mailer.send(msg)
             return True
         except Exception as e:
             current_app.logger.error(f"Failed to send notification email: {e}")
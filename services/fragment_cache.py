@@ -0,0 +1,122 @@
+from flask import current_app, render_template
+from flask_login import current_user
+from markupsafe import Markup
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+from app import db
+from models import Profile, Review
+from services.cache_backends import CacheBackends
+
+
+class CardRating:
+    """Approved review count and average overall rating for a profile card"""
+    __slots__ = ('count', 'average')
+
+    def __init__(self, count=0, average=0.0):
+        self.count = count
+        self.average = average
+
+    @property
+    def version(self):
+        return f"{self.count}:{self.average:.3f}"
+
+
+class ProfileCards:
+    """Fragment cache for components/profile_card.html.
+
+    Cards are keyed by (profile id, updated_at, rating version, viewer
+    state), so any profile edit or review change produces a new key and the
+    stale card is never served. Ratings for a whole page are fetched in one
+    grouped query instead of two queries per card.
+    """
+    TEMPLATE = 'components/profile_card.html'
+
+    @staticmethod
+    def _cache():
+        config = current_app.config
+        return CacheBackends.get('profile_cards',
+                                 max_entries=config.get('FRAGMENT_CACHE_SIZE', 2000),
+                                 ttl=config.get('FRAGMENT_CACHE_TTL', 300))
+
+    @staticmethod
+    def ratings(profile_ids):
+        """{profile_id: CardRating} for approved reviews, in one query"""
+        ratings = {profile_id: CardRating() for profile_id in profile_ids}
+        if not profile_ids:
+            return ratings
+        rows = db.session.query(
+            Review.reviewed_profile_id, func.count(Review.id), func.avg(Review.overall_rating)
+        ).filter(
+            Review.reviewed_profile_id.in_(profile_ids),
+            Review.is_approved == True
+        ).group_by(Review.reviewed_profile_id).all()
+        for profile_id, count, average in rows:
+            ratings[profile_id] = CardRating(count, float(average or 0))
+        return ratings
+
+    @staticmethod
+    def _viewer_state(profile):
+        if not current_user.is_authenticated:
+            return 'anon'
+        return 'owner' if current_user.id == profile.user_id else 'user'
+
+    @staticmethod
+    def _key(profile, rating):
+        updated = profile.updated_at.isoformat() if profile.updated_at else ''
+        return f"{profile.id}:{updated}:{rating.version}:{ProfileCards._viewer_state(profile)}"
+
+    @staticmethod
+    def render_many(profiles):
+        """Return {profile_id: Markup} for the given profiles, rendering only cache misses"""
+        profiles = list(profiles)
+        ratings = ProfileCards.ratings([p.id for p in profiles])
+        keys = {p.id: ProfileCards._key(p, ratings[p.id]) for p in profiles}
+
+        cache = ProfileCards._cache()
+        cached = cache.get_many(list(keys.values()))
+
+        cards = {}
+        for profile in profiles:
+            key = keys[profile.id]
+            html = cached.get(key)
+            if html is None:
+                html = render_template(ProfileCards.TEMPLATE, profile=profile, rating=ratings[profile.id])
+                cache.set(key, html)
+            cards[profile.id] = Markup(html)
+        return cards
+
+    @staticmethod
+    def invalidate(profile_id):
+        """Drop this worker's cached cards for a profile"""
+        ProfileCards._cache().delete_prefix(f"{profile_id}:")
+
+
+@event.listens_for(Profile, 'after_update')
+@event.listens_for(Profile, 'after_delete')
+def _mark_profile_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_profile_cards', set()).add(target.id)
+
+
+@event.listens_for(Review, 'after_insert')
+@event.listens_for(Review, 'after_update')
+@event.listens_for(Review, 'after_delete')
+def _mark_review_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.reviewed_profile_id:
+        session.info.setdefault('changed_profile_cards', set()).add(target.reviewed_profile_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_cards_after_commit(session):
+    for profile_id in session.info.pop('changed_profile_cards', ()):
+        try:
+            ProfileCards.invalidate(profile_id)
+        except RuntimeError:  # committed outside an app context (scripts)
+            pass
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_cards_after_rollback(session):
+    session.info.pop('changed_profile_cards', None)
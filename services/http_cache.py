@@ -0,0 +1,166 @@
+import hashlib
+from datetime import datetime
+from functools import wraps
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, object_session
+from app import db
+from models import Profile, Review, AdminSettings, MediaAsset, ContentVersion
+
+BROWSE_VERSION = 'browse'
+
+
+def _version(*parts):
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode()).hexdigest()[:20]
+
+
+def _latest(*timestamps):
+    timestamps = [t for t in timestamps if t]
+    return max(timestamps).replace(microsecond=0) if timestamps else None
+
+
+class ConditionalGet:
+    """ETag / Last-Modified validators for public pages.
+
+    Only anonymous GETs without pending flash messages take part: their HTML
+    depends on nothing but the data the validators are built from, so a
+    matching If-None-Match / If-Modified-Since is answered with 304 before
+    the view runs, and a CDN or nginx micro-cache may share the response.
+    Logged-in pages show per-user data (unread counts) and are left alone.
+    """
+
+    @staticmethod
+    def is_cacheable_request():
+        return (request.method in ('GET', 'HEAD')
+                and not current_user.is_authenticated
+                and not session.get('_flashes'))
+
+    @staticmethod
+    def settings_version():
+        updated_at, count = db.session.query(
+            func.max(AdminSettings.updated_at), func.count(AdminSettings.id)).one()
+        return updated_at, count
+
+    @staticmethod
+    def review_version(profile_id=None):
+        """(count, last change) over reviews, for one profile or all of them"""
+        query = db.session.query(
+            func.count(Review.id), func.max(func.coalesce(Review.updated_at, Review.created_at)))
+        if profile_id is not None:
+            query = query.filter(Review.reviewed_profile_id == profile_id)
+        return query.one()
+
+    @staticmethod
+    def profile_validators(profile_id):
+        """Validators for public.profile_detail, or None to render normally"""
+        profile = db.session.get(Profile, profile_id)
+        if profile is None or not profile.is_listed:
+            return None
+        review_count, reviews_changed = ConditionalGet.review_version(profile_id)
+        settings_changed, settings_count = ConditionalGet.settings_version()
+        etag = _version('profile', profile.id, profile.updated_at, review_count, reviews_changed,
+                        settings_changed, settings_count)
+        return etag, _latest(profile.updated_at, reviews_changed, settings_changed)
+
+    @staticmethod
+    def browse_validators():
+        """Validators for public.browse; the query string is part of the URL, not the ETag.
+
+        Built from the content_versions row that profile, review, media and
+        settings writes bump, so a request costs one primary-key lookup
+        rather than aggregates over every listed profile and review.
+        """
+        row = db.session.query(ContentVersion.version, ContentVersion.updated_at).filter(
+            ContentVersion.name == BROWSE_VERSION).first()
+        if row is None:  # migration 0008 not applied yet
+            return None
+        version, updated_at = row
+        return _version('browse', version), _latest(updated_at)
+
+    @staticmethod
+    def _is_fresh(etag, last_modified):
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(etag)
+        if request.if_modified_since and last_modified:
+            return last_modified <= request.if_modified_since.replace(tzinfo=None)
+        return False
+
+    @staticmethod
+    def _apply(response, etag, last_modified):
+        response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = 0
+        response.cache_control.s_maxage = current_app.config.get('HTTP_SHARED_CACHE_SECONDS', 60)
+        response.cache_control.must_revalidate = True
+        return response
+
+
+def conditional(validators):
+    """Answer conditional GETs for anonymous users from validators(**view_args).
+
+    validators returns (etag, last_modified) or None to skip caching.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not ConditionalGet.is_cacheable_request():
+                return view(*args, **kwargs)
+            result = validators(**kwargs)
+            if not result:
+                return view(*args, **kwargs)
+
+            etag, last_modified = result
+            if ConditionalGet._is_fresh(etag, last_modified):
+                return ConditionalGet._apply(make_response('', 304), etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                ConditionalGet._apply(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
+
+
+@event.listens_for(MediaAsset, 'after_insert')
+@event.listens_for(MediaAsset, 'after_update')
+@event.listens_for(MediaAsset, 'after_delete')
+def _touch_profile(mapper, connection, target):
+    """Portfolio changes are part of the profile page, so they bump Profile.updated_at"""
+    if target.profile_id:
+        connection.execute(Profile.__table__.update()
+                           .where(Profile.__table__.c.id == target.profile_id)
+                           .values(updated_at=datetime.utcnow()))
+
+
+@event.listens_for(Profile, 'after_insert')
+@event.listens_for(Profile, 'after_update')
+@event.listens_for(Profile, 'after_delete')
+@event.listens_for(Review, 'after_insert')
+@event.listens_for(Review, 'after_update')
+@event.listens_for(Review, 'after_delete')
+@event.listens_for(MediaAsset, 'after_insert')
+@event.listens_for(MediaAsset, 'after_update')
+@event.listens_for(MediaAsset, 'after_delete')
+@event.listens_for(AdminSettings, 'after_insert')
+@event.listens_for(AdminSettings, 'after_update')
+@event.listens_for(AdminSettings, 'after_delete')
+def _bump_browse_version(mapper, connection, target):
+    """Bump the browse version in the writing transaction, once per transaction"""
+    session = object_session(target)
+    if session is not None:
+        if session.info.get('browse_bumped'):
+            return
+        session.info['browse_bumped'] = True
+    table = ContentVersion.__table__
+    connection.execute(table.update()
+                       .where(table.c.name == BROWSE_VERSION)
+                       .values(version=table.c.version + 1, updated_at=datetime.utcnow()))
+
+
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _reset_browse_bump(session):
+    session.info.pop('browse_bumped', None)
@@ -0,0 +1,93 @@
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session, make_transient_to_detached
+from app import db
+from models import User, Profile
+from services.cache_backends import LRUCache
+
+
+class IdentityCache:
+    """Short-lived per-worker cache behind Flask-Login's user_loader.
+
+    Every authenticated request used to start with a SELECT on users. The
+    fields that auth and navigation need (SNAPSHOT_FIELDS plus the user's
+    profile ids) are now kept for USER_CACHE_TTL seconds and the User is
+    re-attached to the session without a query, so relationships such as
+    current_user.profiles still work. Secrets (password_hash, otp_code) are
+    never cached; touching them loads them from the database.
+
+    Commits that update or delete a user (deactivation, password changes),
+    create or delete one of their profiles, and logouts drop the entry in
+    this worker; other workers see the change within the TTL.
+    """
+    SNAPSHOT_FIELDS = ('id', 'email', 'role', 'active', 'email_verified')
+    _cache = None
+
+    @staticmethod
+    def _store():
+        if IdentityCache._cache is None:
+            config = current_app.config
+            IdentityCache._cache = LRUCache(max_entries=config.get('USER_CACHE_SIZE', 5000),
+                                            ttl=config.get('USER_CACHE_TTL', 30))
+        return IdentityCache._cache
+
+    @staticmethod
+    def _snapshot(user):
+        snapshot = {field: getattr(user, field) for field in IdentityCache.SNAPSHOT_FIELDS}
+        snapshot['profile_ids'] = tuple(user.profile_ids)
+        return snapshot
+
+    @staticmethod
+    def load_user(user_id):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        if current_app.config.get('USER_CACHE_TTL', 30) <= 0:
+            return db.session.get(User, user_id)
+
+        store = IdentityCache._store()
+        snapshot = store.get(user_id)
+        if snapshot is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                store.set(user_id, IdentityCache._snapshot(user))
+            return user
+
+        user = User(**{field: snapshot[field] for field in IdentityCache.SNAPSHOT_FIELDS})
+        make_transient_to_detached(user)
+        user = db.session.merge(user, load=False)
+        user._profile_ids = list(snapshot['profile_ids'])
+        return user
+
+    @staticmethod
+    def invalidate(user_id):
+        if IdentityCache._cache is not None:
+            IdentityCache._cache.delete(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _mark_user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_users', set()).add(target.id)
+
+
+@event.listens_for(Profile, 'after_insert')
+@event.listens_for(Profile, 'after_delete')
+def _mark_profiles_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None and target.user_id:
+        session.info.setdefault('changed_users', set()).add(target.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_users_after_commit(session):
+    for user_id in session.info.pop('changed_users', ()):
+        IdentityCache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_users_after_rollback(session):
+    session.info.pop('changed_users', None)
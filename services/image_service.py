@@ -0,0 +1,217 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+# Pillow is imported on the first upload rather than at worker boot
+Image = None
+ImageOps = None
+_pillow_checked = False
+
+
+def _load_pillow():
+    global Image, ImageOps, _pillow_checked
+    if not _pillow_checked:
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:  # Pillow missing: uploads are served at original size
+            pass
+        _pillow_checked = True
+    return Image is not None
+
+
+class ImageService:
+    """Builds resized, EXIF-free WebP/JPEG variants of uploaded images.
+
+    Variants are written next to the original in the uploads folder and
+    recorded as JSON on Profile.avatar_variants_json / MediaAsset.variants_json:
+
+        {"thumb": {"width": 160, "webp": "/uploads/..", "jpeg": "/uploads/.."}, ...}
+    """
+    VARIANTS = (
+        ('thumb', 160),
+        ('card', 480),
+        ('full', 1280),
+    )
+    FORMATS = (
+        ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+        ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    )
+    EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    @staticmethod
+    def is_available():
+        return _load_pillow()
+
+    @staticmethod
+    def _get_executor():
+        if ImageService._executor is None:
+            with ImageService._executor_lock:
+                if ImageService._executor is None:
+                    workers = current_app.config.get('IMAGE_WORKERS', 2)
+                    ImageService._executor = ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix='image-variants')
+        return ImageService._executor
+
+    @staticmethod
+    def _prepare(img):
+        """Apply EXIF orientation and flatten to RGB so metadata is dropped on save"""
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            return background
+        if img.mode != 'RGB':
+            return img.convert('RGB')
+        return img
+
+    @staticmethod
+    def _manifest_path(directory, stem):
+        return os.path.join(directory, f"{stem}_variants.json")
+
+    @staticmethod
+    def _existing_variants(directory, stem):
+        """Variants already generated for this file (e.g. a deduplicated blob), or None"""
+        from services.storage_backends import StorageBackends
+
+        manifest_path = ImageService._manifest_path(directory, stem)
+        try:
+            with open(manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        backend = StorageBackends.get()
+        if backend.is_local:
+            return None
+        key = os.path.relpath(manifest_path, StorageBackends.local().root).replace(os.sep, '/')
+        data = backend.read(key)
+        try:
+            return json.loads(data) if data else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def variant_paths(source_path):
+        """Local paths of every file generate_variants writes for source_path"""
+        directory = os.path.dirname(source_path)
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        paths = [os.path.join(directory, f"{stem}_{name}.{ext}")
+                 for name, _ in ImageService.VARIANTS
+                 for ext in ImageService.EXTENSIONS.values()]
+        return paths + [ImageService._manifest_path(directory, stem)]
+
+    @staticmethod
+    def variant_keys(relative_path):
+        """Storage keys of every variant file derived from a blob key"""
+        stem = os.path.splitext(relative_path)[0]
+        keys = [f"{stem}_{name}.{ext}"
+                for name, _ in ImageService.VARIANTS
+                for ext in ImageService.EXTENSIONS.values()]
+        return keys + [f"{stem}_variants.json"]
+
+    @staticmethod
+    def generate_variants(source_path, source_url):
+        """Write all size/format variants for source_path and return their URLs"""
+        if not ImageService.is_available():
+            return {}
+
+        directory = os.path.dirname(source_path)
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        url_prefix = source_url.rsplit('/', 1)[0]
+
+        existing = ImageService._existing_variants(directory, stem)
+        if existing:
+            return existing
+
+        if not os.path.exists(source_path):
+            return {}
+
+        with Image.open(source_path) as original:
+            img = ImageService._prepare(original)
+
+        variants = {}
+        previous_width = previous_name = None
+        for name, width in ImageService.VARIANTS:
+            if img.width > width:
+                height = max(1, round(img.height * width / img.width))
+                resized = img.resize((width, height), Image.LANCZOS)
+            else:
+                resized = img
+
+            # Small originals would produce identical larger variants
+            if resized.width == previous_width:
+                variants[name] = variants[previous_name]
+                continue
+
+            entry = {'width': resized.width}
+            for key, pil_format, options in ImageService.FORMATS:
+                filename = f"{stem}_{name}.{ImageService.EXTENSIONS[key]}"
+                # Write then rename, so concurrent jobs for a shared blob never serve a torn file
+                path = os.path.join(directory, filename)
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                resized.save(temp_path, pil_format, **options)
+                os.replace(temp_path, path)
+                entry[key] = f"{url_prefix}/{filename}"
+            variants[name] = entry
+            previous_width, previous_name = resized.width, name
+
+        # Written last, so a partially generated set is never reused
+        with open(ImageService._manifest_path(directory, stem), 'w') as f:
+            json.dump(variants, f)
+
+        return variants
+
+    @staticmethod
+    def _process(app, model_name, record_id, source_path, source_url, attribute):
+        with app.app_context():
+            from app import db
+            import models
+            from services.media_storage import MediaStorage
+
+            try:
+                variants = ImageService.generate_variants(source_path, source_url)
+                # With a remote backend, push the variants and drop the staged original
+                MediaStorage.publish(ImageService.variant_paths(source_path))
+                MediaStorage.drop_local_copy(source_path)
+            except Exception as e:
+                app.logger.error(f"Image variant generation failed for {source_path}: {e}")
+                return
+
+            if not variants:
+                return
+
+            record = db.session.get(getattr(models, model_name), record_id)
+            if record is None:
+                return
+            setattr(record, attribute, json.dumps(variants))
+            db.session.commit()
+
+    @staticmethod
+    def enqueue(model_name, record_id, source_path, source_url, attribute):
+        """Generate variants in the background worker pool and store them on the record"""
+        from services.storage_backends import StorageBackends
+
+        if not ImageService.is_available():
+            return None
+        # A deduplicated blob on a remote backend has no local copy, only a manifest
+        if not os.path.exists(source_path) and StorageBackends.get().is_local:
+            return None
+        app = current_app._get_current_object()
+        return ImageService._get_executor().submit(
+            ImageService._process, app, model_name, record_id, source_path, source_url, attribute)
+
+    @staticmethod
+    def enqueue_avatar(profile, source_path):
+        return ImageService.enqueue('Profile', profile.id, source_path, profile.avatar_url, 'avatar_variants_json')
+
+    @staticmethod
+    def enqueue_media(asset, source_path):
+        if asset.type != 'IMAGE':
+            return None
+        return ImageService.enqueue('MediaAsset', asset.id, source_path, asset.url, 'variants_json')
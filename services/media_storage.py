@@ -0,0 +1,233 @@
+import os
+import re
+import glob
+from collections import namedtuple
+from flask import current_app
+from app import db
+from models import MediaAsset, Profile, HomepagePhoto, AdminSettings
+from services.upload_service import UploadService
+from services.image_service import ImageService
+from services.storage_backends import StorageBackends
+
+StoredUpload = namedtuple('StoredUpload', 'path url full_path sha256 kind provider deduplicated')
+
+BLOB_KEY = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})[._]')
+
+
+class MediaStorage:
+    """Content-addressed storage for uploaded files.
+
+    Blobs are named by the SHA-256 of their content and sharded two levels
+    deep (uploads/ab/cd/abcd....jpg), so identical uploads are stored once and
+    no two users can overwrite each other's files. A blob stays stored while
+    any MediaAsset (by content_hash) or avatar/homepage/logo URL refers to it.
+    Unreferenced blobs are only ever deleted by the upload garbage collector
+    (cleanup_uploads.py): an upload that reuses an existing blob just bumps
+    its modification time, and its row may not be committed yet when another
+    request drops the last old reference, so the GC's grace period is what
+    keeps the blob alive in between.
+
+    Blobs are written to the backend named by STORAGE_BACKEND. The local
+    uploads folder doubles as a staging area: with a remote backend, images
+    stay there only until their variants have been generated and published.
+    Stored URLs are always /uploads/<key>; media_url() turns them into direct
+    backend URLs at render time.
+    """
+    URL_PREFIX = '/uploads/'
+
+    @staticmethod
+    def root():
+        return StorageBackends.local().root
+
+    @staticmethod
+    def backend(provider=None):
+        return StorageBackends.get(provider)
+
+    @staticmethod
+    def blob_path(sha256, extension):
+        """Relative path of a blob inside the uploads folder"""
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+    @staticmethod
+    def url(relative_path):
+        return f"{MediaStorage.URL_PREFIX}{relative_path}"
+
+    @staticmethod
+    def relative_path_from_url(url):
+        if url and url.startswith(MediaStorage.URL_PREFIX):
+            return url[len(MediaStorage.URL_PREFIX):]
+        return None
+
+    @staticmethod
+    def hash_from_path(relative_path):
+        """SHA-256 for sharded blob paths, None for legacy flat filenames"""
+        match = BLOB_KEY.match(relative_path or '')
+        return match.group(1) if match else None
+
+    @staticmethod
+    def media_url(url, provider=None):
+        """Browser-facing URL for a stored /uploads/ URL.
+
+        Files still present in the local uploads folder (legacy uploads and
+        LOCAL storage) keep their /uploads/ URL; anything else is resolved to
+        a direct or presigned URL on the remote backend.
+        """
+        relative_path = MediaStorage.relative_path_from_url(url)
+        if not relative_path:
+            return url
+        backend = MediaStorage.backend(provider)
+        if backend.is_local or os.path.exists(os.path.join(MediaStorage.root(), relative_path)):
+            return url
+        return backend.url(relative_path)
+
+    @staticmethod
+    def store(upload, keep_local=False):
+        """Store an accepted IngestStream and return (relative_path, deduplicated).
+
+        With a remote backend the local copy is removed after upload unless
+        keep_local is set (images waiting for variant generation).
+        """
+        relative_path = MediaStorage.blob_path(upload.sha256, upload.extension)
+        full_path = os.path.join(MediaStorage.root(), relative_path)
+        backend = MediaStorage.backend()
+
+        if backend.exists(relative_path):
+            upload.close()
+            MediaStorage._touch(relative_path)  # restart the garbage collector's grace period
+            return relative_path, True
+
+        upload.move_to(full_path)
+        if not backend.is_local:
+            backend.save(full_path, relative_path, upload.mime)
+            if not keep_local:
+                os.remove(full_path)
+        return relative_path, False
+
+    @staticmethod
+    def save(file_storage, kinds=('IMAGE', 'VIDEO')):
+        """Validate and store an uploaded file; returns a StoredUpload or None"""
+        upload = UploadService.accept(file_storage, kinds=kinds)
+        if not upload:
+            return None
+        sha256, kind = upload.sha256, upload.kind
+        keep_local = kind == 'IMAGE' and ImageService.is_available()
+        relative_path, deduplicated = MediaStorage.store(upload, keep_local=keep_local)
+        return StoredUpload(
+            path=relative_path,
+            url=MediaStorage.url(relative_path),
+            full_path=os.path.join(MediaStorage.root(), relative_path),
+            sha256=sha256,
+            kind=kind,
+            provider=MediaStorage.backend().name,
+            deduplicated=deduplicated,
+        )
+
+    @staticmethod
+    def publish(paths):
+        """Upload locally generated files (image variants) to a remote backend
+        and drop the local copies; a no-op for LOCAL storage"""
+        backend = MediaStorage.backend()
+        if backend.is_local:
+            return
+        root = MediaStorage.root()
+        for path in paths:
+            if os.path.exists(path):
+                backend.save(path, os.path.relpath(path, root).replace(os.sep, '/'))
+                os.remove(path)
+
+    @staticmethod
+    def drop_local_copy(path):
+        """Remove a staged local file once it lives on a remote backend"""
+        if not MediaStorage.backend().is_local and os.path.exists(path):
+            os.remove(path)
+
+    @staticmethod
+    def reference_count(relative_path):
+        """Number of rows that still point at a stored file"""
+        url = MediaStorage.url(relative_path)
+        sha256 = MediaStorage.hash_from_path(relative_path)
+
+        if sha256:
+            count = MediaAsset.query.filter_by(content_hash=sha256).count()
+        else:
+            count = MediaAsset.query.filter_by(filename=relative_path).count()
+        count += Profile.query.filter_by(avatar_url=url).count()
+        count += HomepagePhoto.query.filter_by(url=url).count()
+        count += AdminSettings.query.filter_by(logo_url=url).count()
+        return count
+
+    @staticmethod
+    def _touch(relative_path):
+        """Bump the modification time of a blob and its image variants"""
+        backend = MediaStorage.backend()
+        for key in [relative_path] + ImageService.variant_keys(relative_path):
+            try:
+                backend.touch(key)
+            except Exception as e:
+                current_app.logger.warning(f"Could not touch {key} on {backend.name}: {e}")
+
+    @staticmethod
+    def _remove_files(relative_path):
+        """Delete a legacy file and its variants from the uploads folder"""
+        removed = 0
+        full_path = os.path.join(MediaStorage.root(), relative_path)
+        stem = os.path.splitext(full_path)[0]
+        for path in set([full_path] + glob.glob(f"{glob.escape(stem)}_*")):
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                current_app.logger.warning(f"Could not delete upload {path}: {e}")
+        return removed
+
+    @staticmethod
+    def release(relative_path):
+        """Delete a legacy flat-named file (and its image variants) once nothing references it.
+
+        Content-addressed blobs are left to the garbage collector: a concurrent
+        upload of the same content may be about to reference the blob again.
+        Call after the referencing row has been deleted or changed and committed.
+        """
+        if not relative_path or '..' in relative_path.split('/'):
+            return False
+        if MediaStorage.hash_from_path(relative_path):
+            return False
+        if MediaStorage.reference_count(relative_path) > 0:
+            return False
+        return MediaStorage._remove_files(relative_path) > 0
+
+    @staticmethod
+    def release_url(url):
+        return MediaStorage.release(MediaStorage.relative_path_from_url(url))
+
+    @staticmethod
+    def referenced_files():
+        """Return (hashes, paths) of every upload still referenced by a row.
+
+        hashes covers content-addressed blobs (and so their variants); paths
+        covers legacy flat filenames. Rows are streamed in batches.
+        """
+        hashes, paths = set(), set()
+
+        def add(relative_path):
+            if not relative_path:
+                return
+            sha256 = MediaStorage.hash_from_path(relative_path)
+            if sha256:
+                hashes.add(sha256)
+            else:
+                paths.add(relative_path)
+
+        media = db.session.query(MediaAsset.content_hash, MediaAsset.filename, MediaAsset.url)
+        for content_hash, filename, url in media.yield_per(1000):
+            if content_hash:
+                hashes.add(content_hash)
+            add(filename)
+            add(MediaStorage.relative_path_from_url(url))
+
+        for column in (Profile.avatar_url, HomepagePhoto.url, AdminSettings.logo_url):
+            for (url,) in db.session.query(column).filter(column.isnot(None)).yield_per(1000):
+                add(MediaStorage.relative_path_from_url(url))
+        return hashes, paths
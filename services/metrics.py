@@ -0,0 +1,184 @@
+import os
+import time
+import ipaddress
+from contextlib import contextmanager
+from flask import current_app, request, session, abort, Response
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # metrics are not collected and /metrics answers 501
+    prometheus_client = None
+
+# Request latency buckets in seconds (matches request_metrics.LATENCY_BUCKETS_MS)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EMAIL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Waits for a pooled connection; anything past a few ms means the pool is too small
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = prometheus_client.Histogram(
+        'skillbridge_request_duration_seconds', 'Request latency by endpoint',
+        ['endpoint', 'method'], buckets=LATENCY_BUCKETS)
+    DB_POOL_CHECKED_OUT = prometheus_client.Gauge(
+        'skillbridge_db_pool_checked_out', 'Connections checked out of the SQLAlchemy pool',
+        multiprocess_mode='livesum')
+    DB_POOL_OVERFLOW = prometheus_client.Gauge(
+        'skillbridge_db_pool_overflow', 'Connections open beyond pool_size',
+        multiprocess_mode='livesum')
+    DB_POOL_SIZE = prometheus_client.Gauge(
+        'skillbridge_db_pool_size', 'Configured pool_size per worker',
+        multiprocess_mode='livesum')
+    DB_POOL_WAIT = prometheus_client.Histogram(
+        'skillbridge_db_pool_wait_seconds', 'Time spent waiting to check out a connection',
+        buckets=POOL_WAIT_BUCKETS)
+    DB_POOL_TIMEOUTS = prometheus_client.Counter(
+        'skillbridge_db_pool_timeouts_total', 'Checkouts that gave up after DB_POOL_TIMEOUT')
+    DB_DISCONNECTS = prometheus_client.Counter(
+        'skillbridge_db_disconnects_total', 'Statements that failed because the connection was dropped')
+    DB_READ_ROUTING = prometheus_client.Counter(
+        'skillbridge_db_read_routing_total', 'Replica-marked requests by where their reads went', ['target'])
+    PAYMENTS = prometheus_client.Counter(
+        'skillbridge_payments_total', 'M-Pesa payments by outcome', ['status'])
+    EMAIL_LATENCY = prometheus_client.Histogram(
+        'skillbridge_email_send_seconds', 'Time spent handing an email to SMTP',
+        ['kind', 'outcome'], buckets=EMAIL_BUCKETS)
+    PROFANITY_CHECKS = prometheus_client.Counter(
+        'skillbridge_profanity_checks_total', 'Profanity filter checks by result', ['result'])
+    PROFILE_VIEWS = prometheus_client.Counter(
+        'skillbridge_profile_views_total', 'Public profile views by tracking result', ['result'])
+
+
+class Metrics:
+    """Prometheus metrics, served at /metrics.
+
+    Under gunicorn set PROMETHEUS_MULTIPROC_DIR to an empty directory
+    before the workers start: every worker then writes its samples there
+    and a scrape of any worker returns the totals for all of them. Without
+    it each worker only reports its own samples.
+
+    /metrics is open to admins and to clients in METRICS_ALLOWED_NETWORKS,
+    which is empty by default. The check uses request.remote_addr, and
+    ProxyFix does not trust X-Forwarded-For, so behind a proxy only list
+    networks the scraper reaches the workers from directly, never the
+    proxy's own address.
+    """
+
+    @staticmethod
+    def enabled():
+        return prometheus_client is not None
+
+    @staticmethod
+    def init_app(app):
+        app.add_url_rule('/metrics', 'metrics', Metrics.export)
+        app.teardown_request(Metrics._sample_pool)
+
+    @staticmethod
+    def _allowed():
+        from services.admin_sessions import AdminSessions
+        if AdminSessions.verify(session.get('admin_token')):
+            return True
+        try:
+            client = ipaddress.ip_address(request.remote_addr or '')
+        except ValueError:
+            return False
+        for network in current_app.config.get('METRICS_ALLOWED_NETWORKS', ()):
+            if client in ipaddress.ip_network(network, strict=False):
+                return True
+        return False
+
+    @staticmethod
+    def export():
+        if not Metrics._allowed():
+            abort(404)
+        if not Metrics.enabled():
+            return Response("prometheus_client is not installed\n", status=501, mimetype='text/plain')
+        Metrics._sample_pool()
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return Response(prometheus_client.generate_latest(registry),
+                        mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+    @staticmethod
+    def reset_multiprocess_dir():
+        """Empty PROMETHEUS_MULTIPROC_DIR before the workers start (gunicorn on_starting)"""
+        directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith('.db'):
+                os.remove(os.path.join(directory, name))
+
+    @staticmethod
+    def worker_exit(pid):
+        """Drop a dead worker's live gauges from the totals (gunicorn child_exit)"""
+        if Metrics.enabled() and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            multiprocess.mark_process_dead(pid)
+
+    @staticmethod
+    def _sample_pool(exc=None):
+        """Record this worker's pool usage (each worker reports its own, summed on scrape)"""
+        if not Metrics.enabled():
+            return
+        from app import db
+        pool = db.engine.pool
+        if hasattr(pool, 'checkedout'):
+            DB_POOL_CHECKED_OUT.set(pool.checkedout())
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+            DB_POOL_SIZE.set(pool.size())
+
+    @staticmethod
+    def pool_wait(seconds, timed_out):
+        if Metrics.enabled():
+            DB_POOL_WAIT.observe(seconds)
+            if timed_out:
+                DB_POOL_TIMEOUTS.inc()
+
+    @staticmethod
+    def db_disconnect():
+        if Metrics.enabled():
+            DB_DISCONNECTS.inc()
+
+    @staticmethod
+    def read_routed(target):
+        """Count a replica-marked request served by 'replica', 'primary_sticky' or 'primary_fallback'"""
+        if Metrics.enabled():
+            DB_READ_ROUTING.labels(target).inc()
+
+    @staticmethod
+    def observe_request(endpoint, method, seconds):
+        if Metrics.enabled():
+            REQUEST_LATENCY.labels(endpoint, method).observe(seconds)
+
+    @staticmethod
+    def payment(status):
+        """Count a payment 'initiated', 'succeeded' or 'failed'"""
+        if Metrics.enabled():
+            PAYMENTS.labels(status).inc()
+
+    @staticmethod
+    @contextmanager
+    def email_send(kind):
+        """Time the mail.send() inside the block"""
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'sent'
+        finally:
+            if Metrics.enabled():
+                EMAIL_LATENCY.labels(kind, outcome).observe(time.perf_counter() - started)
+
+    @staticmethod
+    def profanity_checked(flagged):
+        if Metrics.enabled():
+            PROFANITY_CHECKS.labels('flagged' if flagged else 'clean').inc()
+
+    @staticmethod
+    def profile_view(recorded):
+        if Metrics.enabled():
+            PROFILE_VIEWS.labels('recorded' if recorded else 'duplicate').inc()
@@ -1,13 +1,24 @@
 import os
 import json
 import base64
-import requests
 from datetime import datetime, timedelta
 from flask import current_app
 from app import db
 from models import AdminSettings, Payment, Subscription, Plan, PaymentStatus, SubscriptionStatus
+from services.plan_catalogue import PlanCatalogue
+from services.metrics import Metrics
 
 class MPesaService:
+    @staticmethod
+    def api_base(settings):
+        """Daraja base URL for the configured environment (MPESA_API_BASE_URL overrides it)"""
+        override = current_app.config.get('MPESA_API_BASE_URL')
+        if override:
+            return override.rstrip('/')
+        if settings.mpesa_env.value == "LIVE":
+            return "https://api.safaricom.co.ke"
+        return "https://sandbox.safaricom.co.ke"
+    
     @staticmethod
     def get_access_token():
         """Get M-Pesa access token"""
@@ -23,9 +34,7 @@ class MPesaService:
             return None
         
         # Encode credentials
-        api_url = "https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials"
-        if settings.mpesa_env.value == "LIVE":
-            api_url = "https://api.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials"
+        api_url = f"{MPesaService.api_base(settings)}/oauth/v1/generate?grant_type=client_credentials"
         
         credentials = base64.b64encode(f"{consumer_key}:{consumer_secret}".encode()).decode()
         
@@ -34,6 +43,7 @@ class MPesaService:
         }
         
         try:
+            import requests  # loaded with the first payment, not at worker boot
             response = requests.get(api_url, headers=headers)
             response.raise_for_status()
             return response.json().get('access_token')
@@ -72,9 +82,7 @@ class MPesaService:
         password, timestamp = password_data
         
         # API URL
-        api_url = "https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/processrequest"
-        if settings.mpesa_env.value == "LIVE":
-            api_url = "https://api.safaricom.co.ke/mpesa/stkpush/v1/processrequest"
+        api_url = f"{MPesaService.api_base(settings)}/mpesa/stkpush/v1/processrequest"
         
         # Format phone number
         if phone_number.startswith('0'):
@@ -106,6 +114,7 @@ class MPesaService:
         }
         
         try:
+            import requests
             response = requests.post(api_url, json=payload, headers=headers)
             response.raise_for_status()
             
@@ -161,7 +170,7 @@ class MPesaService:
                 payment.provider_ref = transaction_id
                 
                 # Create or extend subscription
-                plan = Plan.query.get(payment.plan_id)
+                plan = PlanCatalogue.get(payment.plan_id) or Plan.query.get(payment.plan_id)
                 if plan:
                     # Check if user already has an active subscription for this profile
                     existing_sub = Subscription.query.filter_by(
@@ -210,6 +219,7 @@ class MPesaService:
                     db.session.add(failure_message)
             
             db.session.commit()
+            Metrics.payment('succeeded' if result_code == 0 else 'failed')
             return True
             
         except Exception as e:
@@ -0,0 +1,234 @@
+import json
+import time
+import hashlib
+import threading
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, request, session, make_response, copy_current_request_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from models import Profile, HomepagePhoto, UpdatePost, AdminSettings, Banner
+from services.cache_backends import CacheBackends
+from services.http_cache import ConditionalGet
+
+# Profile columns that decide what the homepage shows
+HOMEPAGE_PROFILE_FLAGS = ('is_featured', 'is_new_user_flag', 'is_listed')
+
+
+class PageCache:
+    """Full-page cache for anonymous GETs of mostly static public pages.
+
+    Entries are keyed by path, site version and the query args the view
+    declares (none by default), so arbitrary query strings such as tracking
+    parameters share one entry instead of each filling the cache. The
+    version is bumped when homepage photos, update posts, banners, admin
+    settings or homepage profile flags change; with CACHE_REDIS_URL it is
+    shared by all workers, otherwise other workers pick changes up after
+    PAGE_CACHE_TTL.
+
+    A page is fresh for PAGE_CACHE_TTL seconds and may then be served stale
+    for PAGE_CACHE_STALE seconds while a background thread regenerates it. Misses
+    are single-flight: concurrent requests for a cold page wait for the
+    first one to render it instead of all hitting the database.
+    """
+    _version = 0
+    _version_lock = threading.Lock()
+    _inflight = {}
+    _inflight_lock = threading.Lock()
+
+    @staticmethod
+    def _ttl():
+        return current_app.config.get('PAGE_CACHE_TTL', 60)
+
+    @staticmethod
+    def _stale():
+        return current_app.config.get('PAGE_CACHE_STALE', 300)
+
+    @staticmethod
+    def _cache():
+        return CacheBackends.get('pages', max_entries=200, ttl=PageCache._ttl() + PageCache._stale())
+
+    @staticmethod
+    def _shared():
+        return PageCache._cache().shared
+
+    @staticmethod
+    def version():
+        shared = PageCache._shared()
+        if shared:
+            try:
+                return int(shared.client.get(f"{shared.prefix}version") or 0)
+            except Exception as e:
+                current_app.logger.warning(f"Page cache version read failed: {e}")
+        return PageCache._version
+
+    @staticmethod
+    def bump_version():
+        """Invalidate every cached page"""
+        with PageCache._version_lock:
+            PageCache._version += 1
+        shared = PageCache._shared()
+        if shared:
+            try:
+                shared.client.incr(f"{shared.prefix}version")
+            except Exception as e:
+                current_app.logger.warning(f"Page cache version bump failed: {e}")
+
+    @staticmethod
+    def _key(query_args=()):
+        query = urlencode([(name, value) for name in sorted(query_args)
+                           for value in request.args.getlist(name)])
+        return f"{PageCache.version()}:{request.path}?{query}"
+
+    @staticmethod
+    def _load(key):
+        raw = PageCache._cache().get(key)
+        return json.loads(raw) if raw else None
+
+    @staticmethod
+    def _render(view, args, kwargs, key):
+        response = make_response(view(*args, **kwargs))
+        # Pages that touched the session (e.g. consumed a flash) are user-specific
+        if response.status_code == 200 and not session.modified:
+            body = response.get_data(as_text=True)
+            entry = {
+                'body': body,
+                'mimetype': response.mimetype,
+                'etag': hashlib.sha1(body.encode('utf-8')).hexdigest()[:20],
+                'created': time.time(),
+            }
+            PageCache._cache().set(key, json.dumps(entry))
+            return entry, response
+        return None, response
+
+    @staticmethod
+    def _claim(key):
+        """Return (event, owner): owner renders, everyone else waits on event"""
+        with PageCache._inflight_lock:
+            event_ = PageCache._inflight.get(key)
+            if event_ is not None:
+                return event_, False
+            event_ = PageCache._inflight[key] = threading.Event()
+            return event_, True
+
+    @staticmethod
+    def _release(key, event_):
+        with PageCache._inflight_lock:
+            PageCache._inflight.pop(key, None)
+        event_.set()
+
+    @staticmethod
+    def _respond(entry, state):
+        response = make_response(entry['body'])
+        response.mimetype = entry['mimetype']
+        response.set_etag(entry['etag'])
+        response.cache_control.public = True
+        response.cache_control.max_age = 0
+        response.cache_control.s_maxage = PageCache._ttl()
+        response.cache_control.stale_while_revalidate = PageCache._stale()
+        response.headers['X-Page-Cache'] = state
+        return response.make_conditional(request)
+
+    @staticmethod
+    def serve(view, args, kwargs, query_args=()):
+        key = PageCache._key(query_args)
+        entry = PageCache._load(key)
+        age = time.time() - entry['created'] if entry else None
+
+        if entry and age < PageCache._ttl():
+            return PageCache._respond(entry, 'HIT')
+
+        event_, owner = PageCache._claim(key)
+        if not owner:
+            if entry:
+                return PageCache._respond(entry, 'STALE')
+            # Cold page: wait for the request that is rendering it
+            event_.wait(timeout=10)
+            entry = PageCache._load(key)
+            if entry:
+                return PageCache._respond(entry, 'HIT')
+            return view(*args, **kwargs)
+
+        if entry:
+            # Serve the stale copy now and refresh it off the request path
+            @copy_current_request_context
+            def regenerate():
+                try:
+                    PageCache._render(view, args, kwargs, key)
+                except Exception as e:
+                    current_app.logger.error(f"Page cache refresh of {key} failed: {e}")
+                finally:
+                    PageCache._release(key, event_)
+            threading.Thread(target=regenerate, name='page-cache-refresh', daemon=True).start()
+            return PageCache._respond(entry, 'STALE')
+
+        try:
+            fresh, response = PageCache._render(view, args, kwargs, key)
+        finally:
+            PageCache._release(key, event_)
+        if fresh:
+            return PageCache._respond(fresh, 'MISS')
+        return response
+
+
+def cached_page(view=None, query_args=()):
+    """Serve the view from PageCache for anonymous users.
+
+    Only the query args listed in query_args are part of the cache key, e.g.
+    @cached_page(query_args=('page',)); any others are ignored.
+    """
+    if view is None:
+        return lambda view: cached_page(view, query_args)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ConditionalGet.is_cacheable_request() or not current_app.config.get('PAGE_CACHE_ENABLED', True):
+            return view(*args, **kwargs)
+        return PageCache.serve(view, args, kwargs, query_args)
+    return wrapper
+
+
+def _mark_pages_changed(session):
+    if session is not None:
+        session.info['pages_changed'] = True
+
+
+@event.listens_for(HomepagePhoto, 'after_insert')
+@event.listens_for(HomepagePhoto, 'after_update')
+@event.listens_for(HomepagePhoto, 'after_delete')
+@event.listens_for(UpdatePost, 'after_insert')
+@event.listens_for(UpdatePost, 'after_update')
+@event.listens_for(UpdatePost, 'after_delete')
+@event.listens_for(Banner, 'after_insert')
+@event.listens_for(Banner, 'after_update')
+@event.listens_for(Banner, 'after_delete')
+@event.listens_for(AdminSettings, 'after_insert')
+@event.listens_for(AdminSettings, 'after_update')
+@event.listens_for(AdminSettings, 'after_delete')
+def _site_content_changed(mapper, connection, target):
+    _mark_pages_changed(object_session(target))
+
+
+@event.listens_for(Profile, 'after_insert')
+@event.listens_for(Profile, 'after_update')
+@event.listens_for(Profile, 'after_delete')
+def _homepage_profile_changed(mapper, connection, target):
+    """Homepage profiles are the listed 'new' ones; flag flips can add or drop a card"""
+    state = inspect(target)
+    flags_changed = any(state.attrs[name].history.has_changes() for name in HOMEPAGE_PROFILE_FLAGS)
+    if flags_changed or (target.is_new_user_flag and target.is_listed):
+        _mark_pages_changed(object_session(target))
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    if session.info.pop('pages_changed', False):
+        try:
+            PageCache.bump_version()
+        except RuntimeError:  # committed outside an app context (scripts)
+            PageCache._version += 1
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('pages_changed', None)
@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from models import Plan, PlanAudience
+
+
+@dataclass(frozen=True)
+class PlanFeature:
+    """One entry of Plan.features_json, parsed once when the catalogue loads"""
+    key: str
+    value: object
+
+    @property
+    def label(self):
+        return self.key.replace('_', ' ').title()
+
+    @property
+    def is_flag(self):
+        return isinstance(self.value, bool)
+
+    @property
+    def is_limit(self):
+        return isinstance(self.value, (int, float)) and not isinstance(self.value, bool)
+
+    @property
+    def is_visible(self):
+        """Disabled flags are not advertised on the pricing page"""
+        return self.value is not False and self.value is not None
+
+
+@dataclass(frozen=True)
+class CachedPlan:
+    """Detached, read-only copy of a Plan row with typed features"""
+    id: int
+    name: str
+    audience: PlanAudience
+    price_kes: object
+    duration_days: int
+    features: tuple = ()
+    limits: dict = field(default_factory=dict)
+    flags: dict = field(default_factory=dict)
+
+    def limit(self, key, default=None):
+        return self.limits.get(key, default)
+
+    def has(self, key):
+        return self.flags.get(key, False)
+
+
+def parse_features(features_json):
+    """Parse features_json into PlanFeature objects.
+
+    Accepts either an object ({"max_photos": 10, "boosted": true}) or a list of
+    feature names, which are treated as enabled flags.
+    """
+    if not features_json:
+        return ()
+    try:
+        raw = json.loads(features_json)
+    except (TypeError, ValueError):
+        if has_app_context():
+            current_app.logger.warning("Ignoring invalid plan features_json")
+        return ()
+
+    if isinstance(raw, dict):
+        return tuple(PlanFeature(str(key), value) for key, value in raw.items())
+    if isinstance(raw, list):
+        return tuple(PlanFeature(str(key), True) for key in raw)
+    return ()
+
+
+def _to_cached(plan):
+    features = parse_features(plan.features_json)
+    return CachedPlan(
+        id=plan.id,
+        name=plan.name,
+        audience=plan.audience,
+        price_kes=plan.price_kes,
+        duration_days=plan.duration_days,
+        features=features,
+        limits={f.key: f.value for f in features if f.is_limit},
+        flags={f.key: f.value for f in features if f.is_flag},
+    )
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One load of the catalogue; replaced as a whole so readers never see a partial reload"""
+    by_id: dict
+    by_audience: dict
+    ordered: tuple
+    loaded_at: float
+    generation: int
+
+
+class PlanCatalogue:
+    """In-process catalogue of active plans.
+
+    Plans are loaded once per worker and reused until a Plan row is committed
+    in this process or PLAN_CATALOGUE_TTL seconds pass (so changes made by
+    other workers are picked up too).
+    """
+    _lock = threading.Lock()
+    _snapshot = None
+    _generation = 0  # bumped by invalidate(); snapshots of older generations are reloaded
+
+    @staticmethod
+    def _ttl():
+        if has_app_context():
+            return current_app.config.get('PLAN_CATALOGUE_TTL', 300)
+        return 300
+
+    @staticmethod
+    def _load():
+        # Read the generation before querying, so an invalidate() that lands
+        # while the query runs makes this snapshot stale straight away
+        generation = PlanCatalogue._generation
+        plans = Plan.query.filter_by(is_active=True).all()
+        cached = sorted((_to_cached(p) for p in plans),
+                        key=lambda p: (p.audience.value, p.price_kes))
+
+        by_audience = {audience: tuple(p for p in cached if p.audience == audience)
+                       for audience in PlanAudience}
+
+        PlanCatalogue._snapshot = _Snapshot(
+            by_id={p.id: p for p in cached},
+            by_audience=by_audience,
+            ordered=tuple(cached),
+            loaded_at=time.monotonic(),
+            generation=generation,
+        )
+        return PlanCatalogue._snapshot
+
+    @staticmethod
+    def _is_current(snapshot):
+        return (snapshot is not None
+                and snapshot.generation == PlanCatalogue._generation
+                and time.monotonic() - snapshot.loaded_at <= PlanCatalogue._ttl())
+
+    @staticmethod
+    def _ensure_loaded():
+        """Return the current snapshot, loading it first if it is missing, stale or expired"""
+        snapshot = PlanCatalogue._snapshot
+        if PlanCatalogue._is_current(snapshot):
+            return snapshot
+        with PlanCatalogue._lock:
+            snapshot = PlanCatalogue._snapshot
+            if PlanCatalogue._is_current(snapshot):
+                return snapshot
+            return PlanCatalogue._load()
+
+    @staticmethod
+    def invalidate():
+        """Mark the cached plans stale; the next read reloads them.
+
+        Lock-free so a commit never waits behind a reload in another thread.
+        """
+        PlanCatalogue._generation += 1
+
+    @staticmethod
+    def all_active():
+        """All active plans ordered by audience, then price"""
+        return list(PlanCatalogue._ensure_loaded().ordered)
+
+    @staticmethod
+    def for_audience(audience):
+        """Active plans for a PlanAudience, cheapest first"""
+        return list(PlanCatalogue._ensure_loaded().by_audience.get(audience, ()))
+
+    @staticmethod
+    def get(plan_id):
+        """Return an active CachedPlan by id, or None"""
+        try:
+            plan_id = int(plan_id)
+        except (TypeError, ValueError):
+            return None
+        return PlanCatalogue._ensure_loaded().by_id.get(plan_id)
+
+    @staticmethod
+    def entitlement(plan_id, key, default=None):
+        """Typed feature value for a plan, e.g. entitlement(3, 'max_photos', 0)"""
+        plan = PlanCatalogue.get(plan_id)
+        if not plan:
+            return default
+        for feature in plan.features:
+            if feature.key == key:
+                return feature.value
+        return default
+
+
+@event.listens_for(Plan, 'after_insert')
+@event.listens_for(Plan, 'after_update')
+@event.listens_for(Plan, 'after_delete')
+def _mark_plans_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['plans_changed'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop('plans_changed', False):
+        PlanCatalogue.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('plans_changed', None)
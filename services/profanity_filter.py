@@ -1,4 +1,5 @@
 import re
+from services.metrics import Metrics
 
 class ProfanityFilter:
     # Comprehensive profanity dictionary
@@ -39,6 +40,12 @@ class ProfanityFilter:
     @staticmethod
     def contains_profanity(text):
         """Check if text contains profanity"""
+        flagged = ProfanityFilter._scan(text)
+        Metrics.profanity_checked(flagged)
+        return flagged
+    
+    @staticmethod
+    def _scan(text):
         if not text:
             return False
         
@@ -0,0 +1,216 @@
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, request, g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, text, Select
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BIND_PREFIX = 'replica_'
+STICKY_COOKIE = 'db_primary_until'
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+# (an idle primary would otherwise look like growing lag)
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END")
+
+
+class RoutingSession(Session):
+    """Session that sends SELECTs inside replica_reads views to a read replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and isinstance(clause, Select)
+                and clause._for_update_arg is None):
+            replica = ReadReplicas.engine_for_read(self)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReadReplicas:
+    """Read/write routing over DATABASE_REPLICA_URLS.
+
+    Each replica is a Flask-SQLAlchemy bind ('replica_0', 'replica_1'...)
+    with the same pool settings as the primary, so every worker holds
+    workers x (pool_size + max_overflow) connections per replica as well.
+
+    Only SELECTs run inside @replica_reads views or ReadReplicas.reading()
+    blocks go to a replica, one replica per request. Everything else, and
+    every read in a request that has already written, uses the primary.
+
+    Read-your-writes: a request that commits a write sets a cookie that
+    keeps that client on the primary for REPLICA_STICKY_SECONDS, so the
+    profile page after edit_profile shows the edit even if the replicas
+    are behind.
+
+    Fallback: each worker checks a replica's lag every REPLICA_CHECK_INTERVAL
+    seconds and skips it while it is more than REPLICA_MAX_LAG_SECONDS
+    behind. A replica that fails a query is skipped for REPLICA_RETRY_SECONDS
+    and the GET is run again on the primary (see DatabasePool).
+    """
+    _state = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def binds(config, engine_options):
+        """SQLALCHEMY_BINDS entries for the replicas; engine_options(url) gives their pool settings"""
+        return {f"{BIND_PREFIX}{i}": dict(engine_options(url), url=url)
+                for i, url in enumerate(config.get('DATABASE_REPLICA_URLS', ()))}
+
+    @staticmethod
+    def init_app(app):
+        if not app.config.get('DATABASE_REPLICA_URLS'):
+            return
+        if not event.contains(Session, 'after_commit', _sticky_after_commit):
+            event.listen(Session, 'after_flush', _mark_wrote)
+            event.listen(Session, 'do_orm_execute', _mark_bulk_write)
+            event.listen(Session, 'after_commit', _sticky_after_commit)
+            event.listen(Session, 'after_rollback', _discard_after_rollback)
+            event.listen(Engine, 'handle_error', _replica_failed)
+        app.after_request(ReadReplicas._set_sticky_cookie)
+
+    @staticmethod
+    @contextmanager
+    def reading():
+        """Send the SELECTs in this block to a replica when one is usable"""
+        previous = g.get('_db_read_only', False)
+        g._db_read_only = True
+        try:
+            yield
+        finally:
+            g._db_read_only = previous
+
+    @staticmethod
+    def engine_for_read(session):
+        """Replica engine for a read in this request, or None for the primary"""
+        if not has_request_context() or not g.get('_db_read_only'):
+            return None
+        if session.info.get('db_wrote') or g.get('_db_wrote'):
+            return None
+        if '_db_replica' not in g:
+            g._db_replica = ReadReplicas._choose()
+        if g._db_replica is None:
+            return None
+        from app import db
+        return db.engines[g._db_replica]
+
+    @staticmethod
+    def _choose():
+        from services.metrics import Metrics
+        keys = ReadReplicas.keys()
+        if not keys:
+            return None
+        if ReadReplicas.is_sticky():
+            Metrics.read_routed('primary_sticky')
+            return None
+        now = time.monotonic()
+        healthy = [key for key in keys if ReadReplicas._healthy(key, now)]
+        if not healthy:
+            Metrics.read_routed('primary_fallback')
+            return None
+        Metrics.read_routed('replica')
+        return random.choice(healthy)
+
+    @staticmethod
+    def keys():
+        from app import db
+        return [key for key in db.engines if key and key.startswith(BIND_PREFIX)]
+
+    @staticmethod
+    def is_sticky():
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _healthy(key, now):
+        config = current_app.config
+        state = ReadReplicas._state.setdefault(key, {'down_until': 0.0, 'checked_at': 0.0, 'lag': 0.0})
+        if now < state['down_until']:
+            return False
+        # One thread per worker refreshes the lag; the others use the last reading
+        if now - state['checked_at'] >= config.get('REPLICA_CHECK_INTERVAL', 5) \
+                and ReadReplicas._lock.acquire(blocking=False):
+            try:
+                state['checked_at'] = now
+                state['lag'] = ReadReplicas.lag(key)
+            except Exception as e:
+                ReadReplicas.mark_down(key)
+                logger.warning(f"Read replica {key} unavailable: {e}")
+                return False
+            finally:
+                ReadReplicas._lock.release()
+        return state['lag'] <= config.get('REPLICA_MAX_LAG_SECONDS', 5)
+
+    @staticmethod
+    def lag(key):
+        """Replication lag of a replica in seconds (0 for databases without replay info)"""
+        from app import db
+        engine = db.engines[key]
+        if engine.dialect.name != 'postgresql':
+            return 0.0
+        with engine.connect() as connection:
+            return float(connection.execute(LAG_QUERY).scalar() or 0)
+
+    @staticmethod
+    def mark_down(key):
+        state = ReadReplicas._state.setdefault(key, {'down_until': 0.0, 'checked_at': 0.0, 'lag': 0.0})
+        state['down_until'] = time.monotonic() + current_app.config.get('REPLICA_RETRY_SECONDS', 30)
+
+    @staticmethod
+    def _set_sticky_cookie(response):
+        if g.get('_db_sticky'):
+            seconds = current_app.config.get('REPLICA_STICKY_SECONDS', 10)
+            response.set_cookie(STICKY_COOKIE, str(int(time.time()) + seconds), max_age=seconds,
+                                httponly=True, samesite='Lax', secure=request.is_secure)
+        return response
+
+
+def replica_reads(view):
+    """Serve the view's reads from a replica (see ReadReplicas)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with ReadReplicas.reading():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def _mark_wrote(session, flush_context):
+    session.info['db_wrote'] = True
+
+
+def _mark_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['db_wrote'] = True
+
+
+def _sticky_after_commit(session):
+    if session.info.pop('db_wrote', False) and has_request_context():
+        g._db_wrote = True
+        g._db_sticky = True
+
+
+def _discard_after_rollback(session):
+    session.info.pop('db_wrote', None)
+
+
+def _replica_failed(context):
+    """Skip a replica that failed a query and let DatabasePool retry the request on the primary"""
+    if not has_request_context() or not g.get('_db_replica'):
+        return
+    from app import db
+    # OperationalError covers refused connections, disconnects and queries the
+    # replica cancelled because they conflicted with replay
+    if context.engine is db.engines.get(g._db_replica) and (
+            context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError)):
+        ReadReplicas.mark_down(g._db_replica)
+        logger.warning(f"Read replica {g._db_replica} failed, using the primary: {context.original_exception}")
+        g._db_replica = None
+        g._db_replica_failed = True
@@ -0,0 +1,218 @@
+import json
+import time
+import bisect
+import logging
+import threading
+from flask import current_app, g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from services.metrics import Metrics
+
+request_logger = logging.getLogger('skillbridge.request')
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Statements kept per request for the slow-request dump
+MAX_CAPTURED_QUERIES = 200
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative counts are derived on read)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """[(upper bound, count <= bound)], ending with ('+Inf', count)"""
+        running, result = 0, []
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        for bound, running in self.cumulative():
+            if running >= rank:
+                return bound
+        return '+Inf'
+
+
+class RequestStats:
+    """Query, template and latency figures for the request in flight"""
+    __slots__ = ('started', 'queries', 'db_seconds', 'pool_wait_seconds', 'slowest', 'statements',
+                 'capture', 'template_seconds', '_template_depth', '_template_started')
+
+    def __init__(self, capture):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0  # added by DatabasePool on each checkout
+        self.slowest = (0.0, None)
+        self.statements = []
+        self.capture = capture
+        self.template_seconds = 0.0
+        self._template_depth = 0
+        self._template_started = 0.0
+
+    def record_query(self, statement, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        if seconds > self.slowest[0]:
+            self.slowest = (seconds, statement)
+        if self.capture and len(self.statements) < MAX_CAPTURED_QUERIES:
+            self.statements.append((seconds, statement))
+
+
+class RequestMetrics:
+    """Per-request instrumentation of SQL, template rendering and latency.
+
+    Every request records its query count, total and slowest statement time,
+    time spent waiting for a pooled connection, template render time and overall latency. The figures are:
+
+    - sent as Server-Timing / X-DB-* headers when app.debug or
+      REQUEST_DEBUG_HEADERS is on,
+    - logged as one JSON line on the 'skillbridge.request' logger,
+    - added to a per-endpoint latency histogram (see snapshot()).
+
+    Requests slower than SLOW_REQUEST_MS are logged as warnings together
+    with every statement they ran.
+    """
+    _histograms = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def init_app(app):
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        before_render_template.connect(_template_started, app)
+        template_rendered.connect(_template_finished, app)
+        app.before_request(RequestMetrics._start)
+        app.after_request(RequestMetrics._finish)
+
+    @staticmethod
+    def current():
+        """RequestStats for this request, or None outside one"""
+        if not has_request_context():
+            return None
+        return g.get('_request_stats')
+
+    @staticmethod
+    def _start():
+        g._request_stats = RequestStats(capture=current_app.config.get('SLOW_REQUEST_MS', 0) > 0)
+
+    @staticmethod
+    def _finish(response):
+        stats = g.pop('_request_stats', None)
+        if stats is None:
+            return response
+        config = current_app.config
+        elapsed_ms = (time.perf_counter() - stats.started) * 1000
+        db_ms = stats.db_seconds * 1000
+        pool_wait_ms = stats.pool_wait_seconds * 1000
+        template_ms = stats.template_seconds * 1000
+        endpoint = request.endpoint or 'unmatched'
+
+        RequestMetrics.observe(endpoint, elapsed_ms)
+        Metrics.observe_request(endpoint, request.method, elapsed_ms / 1000)
+
+        if current_app.debug or config.get('REQUEST_DEBUG_HEADERS'):
+            response.headers['X-DB-Queries'] = str(stats.queries)
+            response.headers['X-DB-Time'] = f"{db_ms:.1f}ms"
+            response.headers['X-Template-Time'] = f"{template_ms:.1f}ms"
+            response.headers['X-Request-Time'] = f"{elapsed_ms:.1f}ms"
+            response.headers.add('Server-Timing',
+                                 f'db;dur={db_ms:.1f};desc="{stats.queries} queries", '
+                                 f'pool;dur={pool_wait_ms:.1f}, '
+                                 f'tpl;dur={template_ms:.1f}, total;dur={elapsed_ms:.1f}')
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'duration_ms': round(elapsed_ms, 2),
+            'db_queries': stats.queries,
+            'db_ms': round(db_ms, 2),
+            'db_slowest_ms': round(stats.slowest[0] * 1000, 2),
+            'db_pool_wait_ms': round(pool_wait_ms, 2),
+            'template_ms': round(template_ms, 2),
+        }
+        request_logger.info(json.dumps(record))
+
+        threshold = config.get('SLOW_REQUEST_MS', 0)
+        if threshold and elapsed_ms >= threshold:
+            record['db_slowest'] = stats.slowest[1]
+            lines = [f"  {seconds * 1000:8.2f}ms  {' '.join(statement.split())}"
+                     for seconds, statement in stats.statements]
+            if stats.queries > len(stats.statements):
+                lines.append(f"  ... {stats.queries - len(stats.statements)} more not captured")
+            request_logger.warning("Slow request %s\n%s", json.dumps(record), '\n'.join(lines))
+        return response
+
+    @staticmethod
+    def observe(endpoint, elapsed_ms):
+        with RequestMetrics._lock:
+            histogram = RequestMetrics._histograms.get(endpoint)
+            if histogram is None:
+                histogram = RequestMetrics._histograms[endpoint] = Histogram()
+            histogram.observe(elapsed_ms)
+
+    @staticmethod
+    def snapshot():
+        """{endpoint: {'count', 'sum_ms', 'p50', 'p95', 'p99', 'buckets'}} for this worker"""
+        with RequestMetrics._lock:
+            return {
+                endpoint: {
+                    'count': h.count,
+                    'sum_ms': round(h.total, 2),
+                    'p50': h.quantile(0.50),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                    'buckets': h.cumulative(),
+                }
+                for endpoint, h in RequestMetrics._histograms.items()
+            }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if RequestMetrics.current() is not None:
+        conn.info['query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = RequestMetrics.current()
+    started = conn.info.pop('query_started', None)
+    if stats is None or started is None:
+        return
+    stats.record_query(statement, time.perf_counter() - started)
+
+
+def _template_started(sender, template, context, **extra):
+    stats = RequestMetrics.current()
+    if stats is not None:
+        # Only the outermost render is timed; nested renders (cards) are inside it
+        if stats._template_depth == 0:
+            stats._template_started = time.perf_counter()
+        stats._template_depth += 1
+
+
+def _template_finished(sender, template, context, **extra):
+    stats = RequestMetrics.current()
+    if stats is not None and stats._template_depth:
+        stats._template_depth -= 1
+        if stats._template_depth == 0:
+            stats.template_seconds += time.perf_counter() - stats._template_started
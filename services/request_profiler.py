@@ -0,0 +1,242 @@
+import sys
+import json
+import time
+import random
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from flask import current_app, g, request
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from services.cache_backends import CacheBackends
+
+# Deepest stack kept per sample
+MAX_STACK_DEPTH = 80
+
+# Captures signed for the X-Profile-Token header stay valid this long
+TOKEN_MAX_AGE = 24 * 3600
+
+
+class StackSampler:
+    """Background thread that samples the stacks of registered request threads.
+
+    It sleeps while nothing is registered, so unsampled requests only pay
+    for one random() call.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._targets = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        stacks = Counter()
+        with self._lock:
+            self._targets[thread_id] = stacks
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return stacks
+
+    def stop(self, thread_id):
+        """Unregister a thread and return its stacks; the sampler no longer touches them"""
+        with self._lock:
+            return self._targets.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                targets = dict(self._targets)
+                if not targets:
+                    self._wake.clear()
+            if not targets:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            samples = {thread_id: _collapse(frames[thread_id]) for thread_id in targets if thread_id in frames}
+            del frames
+            # Count under the lock, and only for threads still registered, so a
+            # Counter returned by stop() is never written to again
+            with self._lock:
+                for thread_id, stack in samples.items():
+                    stacks = self._targets.get(thread_id)
+                    if stacks is not None:
+                        stacks[stack] += 1
+            time.sleep(self.interval)
+
+
+def _collapse(frame):
+    """'module:function;module:function;...' from the outermost frame inwards"""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class RequestProfiler:
+    """Sampling profiler for live requests.
+
+    PROFILE_SAMPLE_RATE of requests (0.0-1.0), plus any request carrying a
+    valid X-Profile-Token header, are sampled every PROFILE_INTERVAL_MS.
+    Each capture stores its collapsed stacks with the endpoint, duration and
+    RELEASE_VERSION in a ring buffer of the last PROFILE_BUFFER_SIZE
+    captures, shared through Redis when CACHE_REDIS_URL is set and per
+    worker otherwise. The admin profiler page merges them into flame graphs.
+
+    Disabled under gevent (GUNICORN_PROFILE=gevent): requests run in
+    greenlets, whose ids are not keys of sys._current_frames(), and the
+    sampler greenlet would only run when a request yields.
+    """
+    SALT = 'request-profile'
+    HEADER = 'X-Profile-Token'
+
+    _sampler = None
+    _captures = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def init_app(app):
+        if RequestProfiler.greenlet_threads():
+            app.logger.warning("Request profiler disabled: threading is patched by gevent")
+            return
+        app.before_request(RequestProfiler._start)
+        app.teardown_request(RequestProfiler._finish)
+
+    @staticmethod
+    def greenlet_threads():
+        """True when gevent has monkey-patched threading in this process"""
+        monkey = sys.modules.get('gevent.monkey')
+        return monkey is not None and monkey.is_module_patched('threading')
+
+    @staticmethod
+    def _serializer():
+        return URLSafeTimedSerializer(current_app.secret_key, salt=RequestProfiler.SALT)
+
+    @staticmethod
+    def issue_token():
+        """Token for the X-Profile-Token header: forces a capture of that request"""
+        return RequestProfiler._serializer().dumps('capture')
+
+    @staticmethod
+    def _token_valid(token):
+        try:
+            return RequestProfiler._serializer().loads(token, max_age=TOKEN_MAX_AGE) == 'capture'
+        except (BadSignature, SignatureExpired):
+            return False
+
+    @staticmethod
+    def _should_sample():
+        token = request.headers.get(RequestProfiler.HEADER)
+        if token:
+            return RequestProfiler._token_valid(token)
+        rate = current_app.config.get('PROFILE_SAMPLE_RATE', 0.0)
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def _get_sampler():
+        if RequestProfiler._sampler is None:
+            with RequestProfiler._lock:
+                if RequestProfiler._sampler is None:
+                    interval = current_app.config.get('PROFILE_INTERVAL_MS', 5) / 1000
+                    RequestProfiler._sampler = StackSampler(interval)
+        return RequestProfiler._sampler
+
+    @staticmethod
+    def _start():
+        if request.endpoint == 'static' or not RequestProfiler._should_sample():
+            return
+        g._profile = (threading.get_ident(), time.perf_counter())
+        RequestProfiler._get_sampler().start(threading.get_ident())
+
+    @staticmethod
+    def _finish(exc=None):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return
+        thread_id, started = profile
+        stacks = RequestProfiler._get_sampler().stop(thread_id)
+        if not stacks:
+            return
+        RequestProfiler.store({
+            'endpoint': request.endpoint or 'unmatched',
+            'path': request.path,
+            'release': current_app.config.get('RELEASE_VERSION') or 'unknown',
+            'captured_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'samples': sum(stacks.values()),
+            'stacks': dict(stacks),
+        })
+
+    @staticmethod
+    def _shared():
+        return CacheBackends.get('profiles').shared
+
+    @staticmethod
+    def _buffer_size():
+        return current_app.config.get('PROFILE_BUFFER_SIZE', 200)
+
+    @staticmethod
+    def store(capture):
+        shared = RequestProfiler._shared()
+        if shared:
+            try:
+                key = f"{shared.prefix}captures"
+                pipe = shared.client.pipeline()
+                pipe.lpush(key, json.dumps(capture))
+                pipe.ltrim(key, 0, RequestProfiler._buffer_size() - 1)
+                pipe.execute()
+                return
+            except Exception as e:
+                current_app.logger.warning(f"Storing profile in shared cache failed: {e}")
+        with RequestProfiler._lock:
+            if RequestProfiler._captures is None or RequestProfiler._captures.maxlen != RequestProfiler._buffer_size():
+                RequestProfiler._captures = deque(RequestProfiler._captures or (), maxlen=RequestProfiler._buffer_size())
+            RequestProfiler._captures.appendleft(capture)
+
+    @staticmethod
+    def captures():
+        """Stored captures, newest first"""
+        shared = RequestProfiler._shared()
+        if shared:
+            try:
+                return [json.loads(raw) for raw in shared.client.lrange(f"{shared.prefix}captures", 0, -1)]
+            except Exception as e:
+                current_app.logger.warning(f"Reading profiles from shared cache failed: {e}")
+        with RequestProfiler._lock:
+            return list(RequestProfiler._captures or ())
+
+    @staticmethod
+    def merge(captures):
+        """Sum the collapsed stacks of several captures"""
+        merged = Counter()
+        for capture in captures:
+            merged.update(capture['stacks'])
+        return merged
+
+    @staticmethod
+    def collapsed_text(stacks):
+        """Brendan Gregg's collapsed format, readable by flamegraph.pl and speedscope"""
+        return '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common()) + '\n'
+
+    @staticmethod
+    def flame_tree(stacks, min_fraction=0.005):
+        """Nested {'name', 'value', 'children'} for rendering; frames under min_fraction are dropped"""
+        root = {'name': 'all', 'value': 0, 'children': {}}
+        for stack, count in stacks.items():
+            root['value'] += count
+            node = root
+            for name in stack.split(';'):
+                node = node['children'].setdefault(name, {'name': name, 'value': 0, 'children': {}})
+                node['value'] += count
+
+        cutoff = root['value'] * min_fraction
+
+        def finish(node):
+            children = [finish(child) for child in node['children'].values() if child['value'] >= cutoff]
+            node['children'] = sorted(children, key=lambda child: -child['value'])
+            return node
+
+        return finish(root)
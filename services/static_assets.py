@@ -0,0 +1,176 @@
+import os
+import json
+import gzip
+import hashlib
+import mimetypes
+import threading
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # .br files are skipped; browsers fall back to gzip
+    brotli = None
+
+# Minifiers from the assets extra. Without them bundles are built unminified;
+# a hand-rolled minifier cannot parse regex literals and template strings safely
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+# Logical bundle name -> source files (relative to static/), in load order
+BUNDLES = {
+    'js/app.js': ['js/main.js', 'js/star_rating.js', 'js/profanity_filter.js'],
+    'css/app.css': ['css/style.css'],
+}
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+COMPRESSIBLE = ('.js', '.css', '.svg', '.json')
+
+
+def minifier(name):
+    """rjsmin/rcssmin function for a bundle, or None when it is not installed"""
+    if name.endswith('.js'):
+        return rjsmin.jsmin if rjsmin else None
+    if name.endswith('.css'):
+        return rcssmin.cssmin if rcssmin else None
+    return None
+
+
+def _write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def build(static_folder, bundles=BUNDLES, log=print):
+    """Minify and bundle assets into static/dist/ with content-hashed names.
+
+    Writes name.<hash>.ext plus .gz and .br siblings, and a manifest mapping
+    each logical bundle name to its hashed file. Files from earlier builds
+    are left in place for pages still cached by browsers during a deploy.
+    Returns the manifest.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(dist, exist_ok=True)
+    manifest = {}
+
+    for name, sources in bundles.items():
+        minify = minifier(name)
+        if minify is None and name.endswith(('.js', '.css')):
+            log(f"{name}: {'rjsmin' if name.endswith('.js') else 'rcssmin'} not installed, bundling unminified")
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+                parts.append(minify(f.read()) if minify else f.read())
+        # ';' guards against a script that ends without a semicolon
+        separator = ';\n' if name.endswith('.js') else '\n'
+        data = separator.join(parts).encode('utf-8')
+
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        stem, ext = os.path.splitext(os.path.basename(name))
+        hashed = f"{stem}.{digest}{ext}"
+        path = os.path.join(dist, hashed)
+        _write(path, data)
+
+        if ext in COMPRESSIBLE:
+            _write(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli:
+                _write(path + '.br', brotli.compress(data, quality=11))
+
+        manifest[name] = f"{DIST_DIR}/{hashed}"
+        original = sum(os.path.getsize(os.path.join(static_folder, s)) for s in sources)
+        log(f"{name}: {original} -> {len(data)} bytes ({hashed})")
+
+    if not brotli:
+        log("brotli package not installed: skipped .br files")
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+class StaticAssets:
+    """Resolves bundle names to fingerprinted URLs and serves them.
+
+    Without a build (development) asset_urls() returns the individual
+    source files, so edits show up on reload. After `python build_assets.py`
+    it returns the hashed bundle, served with a year-long immutable
+    Cache-Control and a precompressed .br/.gz body when the client accepts it.
+    """
+    _lock = threading.Lock()
+    _manifest = None
+    _manifest_mtime = None
+
+    @staticmethod
+    def _manifest_path():
+        return os.path.join(current_app.static_folder, DIST_DIR, MANIFEST_NAME)
+
+    @staticmethod
+    def manifest():
+        path = StaticAssets._manifest_path()
+        if StaticAssets._manifest is not None and not current_app.debug:
+            return StaticAssets._manifest
+        with StaticAssets._lock:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                StaticAssets._manifest, StaticAssets._manifest_mtime = {}, None
+                return StaticAssets._manifest
+            if StaticAssets._manifest is None or mtime != StaticAssets._manifest_mtime:
+                with open(path) as f:
+                    StaticAssets._manifest = json.load(f)
+                StaticAssets._manifest_mtime = mtime
+        return StaticAssets._manifest
+
+    @staticmethod
+    def asset_urls(name):
+        """URLs to include for a bundle: the hashed build, or its sources"""
+        built = StaticAssets.manifest().get(name)
+        if built:
+            return [url_for('static', filename=built)]
+        return [url_for('static', filename=source) for source in BUNDLES.get(name, [name])]
+
+    @staticmethod
+    def asset_url(name):
+        return StaticAssets.asset_urls(name)[0]
+
+    @staticmethod
+    def _preferred_encoding(path):
+        accepted = request.accept_encodings
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accepted[encoding] and os.path.exists(path + suffix):
+                return encoding, suffix
+        return None, ''
+
+    @staticmethod
+    def send_static(filename):
+        """Replacement for Flask's static view that handles the dist/ folder"""
+        static_folder = current_app.static_folder
+        if not filename.startswith(f"{DIST_DIR}/") or '..' in filename.split('/'):
+            return send_from_directory(static_folder, filename,
+                                       max_age=current_app.get_send_file_max_age(filename))
+
+        encoding, suffix = StaticAssets._preferred_encoding(os.path.join(static_folder, filename))
+        response = send_from_directory(static_folder, filename + suffix,
+                                       mimetype=mimetypes.guess_type(filename)[0], max_age=31536000)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        response.vary.add('Accept-Encoding')
+        return response
+
+    @staticmethod
+    def init_app(app):
+        app.view_functions['static'] = StaticAssets.send_static
+
+        @app.context_processor
+        def inject_asset_helpers():
+            return {'asset_url': StaticAssets.asset_url, 'asset_urls': StaticAssets.asset_urls}
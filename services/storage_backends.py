@@ -0,0 +1,240 @@
+import os
+import shutil
+import mimetypes
+import threading
+from abc import ABC, abstractmethod
+from datetime import timezone
+from flask import current_app
+
+
+class StorageBackend(ABC):
+    """Interface for where uploaded blobs live.
+
+    Keys are relative paths such as "ab/cd/<sha256>.jpg". Backends hand out
+    URLs the browser can fetch directly, so media bytes do not have to pass
+    through the Python workers.
+    """
+    name = None
+
+    @abstractmethod
+    def save(self, local_path, key, content_type=None):
+        """Store the file at local_path under key"""
+
+    @abstractmethod
+    def exists(self, key):
+        """True if an object is stored under key"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove the object; missing objects are not an error"""
+
+    @abstractmethod
+    def touch(self, key):
+        """Reset the object's modification time; False if it does not exist"""
+
+    @abstractmethod
+    def read(self, key):
+        """Return the object's bytes, or None if it does not exist"""
+
+    @abstractmethod
+    def url(self, key):
+        """URL the browser fetches the object from"""
+
+    @abstractmethod
+    def iter_objects(self):
+        """Yield (key, last_modified_timestamp, size) for every stored object"""
+
+    @property
+    def is_local(self):
+        return False
+
+
+class LocalStorageBackend(StorageBackend):
+    name = 'LOCAL'
+
+    def __init__(self, root, url_prefix='/uploads/'):
+        self.root = root
+        self.url_prefix = url_prefix
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def save(self, local_path, key, content_type=None):
+        destination = self.path(key)
+        if os.path.abspath(local_path) == os.path.abspath(destination):
+            return
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        try:
+            os.replace(local_path, destination)
+        except OSError:
+            shutil.move(local_path, destination)
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def touch(self, key):
+        try:
+            os.utime(self.path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def read(self, key):
+        try:
+            with open(self.path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def url(self, key):
+        return f"{self.url_prefix}{key}"
+
+    def iter_objects(self):
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for filename in filenames:
+                if filename.startswith('.'):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield os.path.relpath(path, self.root).replace(os.sep, '/'), stat.st_mtime, stat.st_size
+
+    @property
+    def is_local(self):
+        return True
+
+
+class S3StorageBackend(StorageBackend):
+    """Amazon S3 or any S3-compatible store (MinIO, Cloudflare R2, Wasabi).
+
+    If S3_PUBLIC_BASE_URL is set (public bucket or CDN) objects get direct
+    URLs; otherwise they get short-lived presigned GET URLs.
+    """
+    name = 'S3'
+
+    def __init__(self, bucket, endpoint_url=None, region=None, access_key=None,
+                 secret_key=None, public_base_url=None, presign_expiry=3600):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=S3 requires the boto3 package")
+
+        self.bucket = bucket
+        self.public_base_url = public_base_url.rstrip('/') if public_base_url else None
+        self.presign_expiry = presign_expiry
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            config=Config(signature_version='s3v4', s3={'addressing_style': 'path' if endpoint_url else 'auto'}),
+        )
+
+    def save(self, local_path, key, content_type=None):
+        content_type = content_type or mimetypes.guess_type(key)[0] or 'application/octet-stream'
+        self.client.upload_file(local_path, self.bucket, key, ExtraArgs={
+            'ContentType': content_type,
+            'CacheControl': 'public, max-age=31536000, immutable',
+        })
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError:
+            return False
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        return True
+
+    def touch(self, key):
+        """Copy the object onto itself, which is the only way to bump LastModified"""
+        from botocore.exceptions import ClientError
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            return False
+        self.client.copy_object(
+            Bucket=self.bucket, Key=key, CopySource={'Bucket': self.bucket, 'Key': key},
+            MetadataDirective='REPLACE', Metadata=head.get('Metadata', {}),
+            ContentType=head.get('ContentType', 'application/octet-stream'),
+            CacheControl=head.get('CacheControl', 'public, max-age=31536000, immutable'))
+        return True
+
+    def read(self, key):
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
+        except ClientError:
+            return None
+
+    def url(self, key):
+        if self.public_base_url:
+            return f"{self.public_base_url}/{key}"
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': key}, ExpiresIn=self.presign_expiry)
+
+    def iter_objects(self):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket):
+            for obj in page.get('Contents', []):
+                modified = obj['LastModified']
+                if modified.tzinfo is None:
+                    modified = modified.replace(tzinfo=timezone.utc)
+                yield obj['Key'], modified.timestamp(), obj.get('Size', 0)
+
+
+class StorageBackends:
+    """Builds and caches one backend instance per provider name"""
+    _instances = {}
+    _lock = threading.RLock()  # _build() falls back to get() for unknown providers
+
+    @staticmethod
+    def _build(provider):
+        config = current_app.config
+        if provider == 'LOCAL':
+            return LocalStorageBackend(os.path.join(current_app.root_path, config['UPLOAD_FOLDER']))
+        if provider == 'S3':
+            return S3StorageBackend(
+                bucket=config['S3_BUCKET'],
+                endpoint_url=config.get('S3_ENDPOINT_URL'),
+                region=config.get('S3_REGION'),
+                access_key=config.get('S3_ACCESS_KEY_ID'),
+                secret_key=config.get('S3_SECRET_ACCESS_KEY'),
+                public_base_url=config.get('S3_PUBLIC_BASE_URL'),
+                presign_expiry=config.get('S3_PRESIGN_EXPIRY', 3600),
+            )
+        default = config.get('STORAGE_BACKEND', 'LOCAL').upper()
+        if provider == default:
+            raise ValueError(f"Unsupported STORAGE_BACKEND: {provider}")
+        # Rows from retired providers (e.g. CLOUDINARY) still have to render
+        current_app.logger.warning(f"Unsupported storage provider {provider}, using {default}")
+        return StorageBackends.get(default)
+
+    @staticmethod
+    def get(provider=None):
+        """Backend for a MediaAsset.storage_provider value, or the configured default"""
+        provider = (provider or current_app.config.get('STORAGE_BACKEND', 'LOCAL')).upper()
+        if provider not in StorageBackends._instances:
+            with StorageBackends._lock:
+                if provider not in StorageBackends._instances:
+                    StorageBackends._instances[provider] = StorageBackends._build(provider)
+        return StorageBackends._instances[provider]
+
+    @staticmethod
+    def local():
+        return StorageBackends.get('LOCAL')
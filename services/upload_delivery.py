@@ -0,0 +1,95 @@
+import os
+import mimetypes
+from flask import current_app, request, send_from_directory, make_response, abort
+from werkzeug.security import safe_join
+from services.media_storage import MediaStorage
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+LEGACY_CACHE_SECONDS = 3600
+
+SERVE_MODES = ('DIRECT', 'X_ACCEL', 'X_SENDFILE')
+
+
+class UploadDelivery:
+    """Serves /uploads/ files from the local uploads folder.
+
+    UPLOAD_SERVE_MODE picks who streams the bytes:
+
+      DIRECT      the worker streams the file (Range requests supported)
+      X_ACCEL     nginx, via X-Accel-Redirect to UPLOAD_ACCEL_PREFIX
+      X_SENDFILE  Apache mod_xsendfile / lighttpd, via X-Sendfile
+
+    For X_ACCEL nginx needs an internal location pointing at the folder:
+
+        location /protected-uploads/ {
+            internal;
+            alias /srv/skillbridge/uploads/;
+        }
+
+    Content-addressed blobs and their variants never change, so they get a
+    strong ETag derived from their name and a year-long immutable
+    Cache-Control. Legacy flat filenames get a short max-age instead.
+    """
+
+    @staticmethod
+    def mode():
+        mode = (current_app.config.get('UPLOAD_SERVE_MODE') or 'DIRECT').upper().replace('-', '_')
+        return mode if mode in SERVE_MODES else 'DIRECT'
+
+    @staticmethod
+    def is_immutable(relative_path):
+        return MediaStorage.hash_from_path(relative_path) is not None
+
+    @staticmethod
+    def etag(relative_path):
+        """Strong ETag for content-addressed names (blob hash plus variant suffix)"""
+        if not UploadDelivery.is_immutable(relative_path):
+            return None
+        return os.path.splitext(os.path.basename(relative_path))[0]
+
+    @staticmethod
+    def _cache_headers(response, relative_path):
+        if UploadDelivery.is_immutable(relative_path):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        else:
+            response.cache_control.public = True
+            response.cache_control.max_age = LEGACY_CACHE_SECONDS
+        return response
+
+    @staticmethod
+    def _offload(relative_path, full_path):
+        etag = UploadDelivery.etag(relative_path)
+        if etag and request.if_none_match.contains(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return UploadDelivery._cache_headers(response, relative_path)
+
+        # Empty body: the proxy streams the file and handles Range itself
+        response = make_response('')
+        response.mimetype = mimetypes.guess_type(relative_path)[0] or 'application/octet-stream'
+        if UploadDelivery.mode() == 'X_ACCEL':
+            prefix = current_app.config.get('UPLOAD_ACCEL_PREFIX', '/protected-uploads/')
+            response.headers['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{relative_path}"
+        else:
+            response.headers['X-Sendfile'] = full_path
+        if etag:
+            response.set_etag(etag)
+        return UploadDelivery._cache_headers(response, relative_path)
+
+    @staticmethod
+    def send(relative_path):
+        """Response for a file in the local uploads folder"""
+        upload_dir = MediaStorage.root()
+        full_path = safe_join(upload_dir, relative_path)
+        if full_path is None or not os.path.isfile(full_path):
+            abort(404)
+
+        if UploadDelivery.mode() != 'DIRECT':
+            return UploadDelivery._offload(relative_path, full_path)
+
+        # conditional=True (the default) answers If-None-Match and Range requests
+        immutable = UploadDelivery.is_immutable(relative_path)
+        response = send_from_directory(upload_dir, relative_path,
+                                       etag=UploadDelivery.etag(relative_path) or True,
+                                       max_age=31536000 if immutable else LEGACY_CACHE_SECONDS)
+        return UploadDelivery._cache_headers(response, relative_path)
@@ -0,0 +1,119 @@
+import time
+from dataclasses import dataclass, field
+from flask import current_app
+from services.media_storage import MediaStorage
+from services.storage_backends import StorageBackends
+
+
+class RateLimiter:
+    """Spaces out operations so that at most `rate` run per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+@dataclass
+class GCReport:
+    dry_run: bool
+    scanned: int = 0
+    referenced: int = 0
+    too_recent: int = 0
+    orphaned: int = 0
+    deleted: int = 0
+    bytes_reclaimed: int = 0
+    errors: int = 0
+    orphans: list = field(default_factory=list)  # (backend, key, size, age_seconds)
+
+    def summary(self):
+        outcome = 'to delete' if self.dry_run else f'{self.deleted} deleted'
+        return (f"Scanned {self.scanned} files: {self.referenced} referenced, "
+                f"{self.too_recent} inside grace period, {self.orphaned} orphaned ({outcome}, "
+                f"{self.bytes_reclaimed / (1024 * 1024):.1f}MB), {self.errors} errors")
+
+
+class UploadGarbageCollector:
+    """Deletes uploaded files that no row references any more.
+
+    The referenced set is built from MediaAsset, Profile.avatar_url,
+    HomepagePhoto.url and AdminSettings.logo_url, then the uploads folder
+    (and the remote backend, if one is configured) is walked once. Files
+    modified within grace_seconds are kept, so an upload whose row has not
+    been committed yet is never collected. Deletions and directory scanning
+    are rate limited to keep disk and API load low.
+    """
+
+    def __init__(self, grace_seconds=86400, dry_run=False, deletes_per_second=20,
+                 scans_per_second=2000, sample_size=1000):
+        self.grace_seconds = grace_seconds
+        self.dry_run = dry_run
+        self.delete_limiter = RateLimiter(deletes_per_second)
+        self.scan_limiter = RateLimiter(scans_per_second)
+        self.sample_size = sample_size
+
+    def _backends(self):
+        backends = [StorageBackends.local()]
+        if not MediaStorage.backend().is_local:
+            backends.append(MediaStorage.backend())
+        return backends
+
+    @staticmethod
+    def _is_referenced(key, hashes, paths):
+        sha256 = MediaStorage.hash_from_path(key)
+        if sha256:
+            return sha256 in hashes
+        return key in paths
+
+    def run(self, on_orphan=None):
+        """Sweep all backends and return a GCReport.
+
+        on_orphan(backend_name, key, size, age_seconds) is called for every
+        orphaned file, before it is deleted (or instead, in dry-run mode).
+        """
+        report = GCReport(dry_run=self.dry_run)
+        hashes, paths = MediaStorage.referenced_files()
+        now = time.time()
+
+        for backend in self._backends():
+            for key, modified, size in backend.iter_objects():
+                self.scan_limiter.wait()
+                report.scanned += 1
+
+                if self._is_referenced(key, hashes, paths):
+                    report.referenced += 1
+                    continue
+                age = now - modified
+                if age < self.grace_seconds:
+                    report.too_recent += 1
+                    continue
+
+                report.orphaned += 1
+                if len(report.orphans) < self.sample_size:
+                    report.orphans.append((backend.name, key, size, age))
+                if on_orphan:
+                    on_orphan(backend.name, key, size, age)
+
+                if self.dry_run:
+                    report.bytes_reclaimed += size
+                    continue
+
+                self.delete_limiter.wait()
+                try:
+                    backend.delete(key)
+                    report.deleted += 1
+                    report.bytes_reclaimed += size
+                except Exception as e:
+                    report.errors += 1
+                    current_app.logger.warning(f"Could not delete orphaned upload {key} from {backend.name}: {e}")
+
+        current_app.logger.info(report.summary())
+        return report
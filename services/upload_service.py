@@ -0,0 +1,229 @@
+import os
+import shutil
+import hashlib
+import tempfile
+from flask import Request, current_app, has_app_context
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# (offset, magic bytes, mime type, kind, extension)
+SIGNATURES = [
+    (0, b'\xff\xd8\xff', 'image/jpeg', 'IMAGE', 'jpg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png', 'IMAGE', 'png'),
+    (0, b'GIF87a', 'image/gif', 'IMAGE', 'gif'),
+    (0, b'GIF89a', 'image/gif', 'IMAGE', 'gif'),
+    (0, b'\x1a\x45\xdf\xa3', 'video/webm', 'VIDEO', 'webm'),
+    (0, b'FLV', 'video/x-flv', 'VIDEO', 'flv'),
+    (0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11', 'video/x-ms-wmv', 'VIDEO', 'wmv'),
+]
+
+# Major brands of ISO base media files that are MP4 video. HEIC/HEIF/AVIF
+# photos (heic, heix, mif1, msf1, avif...) share the container and are rejected
+MP4_BRANDS = {b'isom', b'iso2', b'iso4', b'iso5', b'iso6', b'mp41', b'mp42', b'avc1',
+              b'M4V ', b'M4VH', b'M4VP', b'dash', b'mmp4', b'f4v ', b'MSNV'}
+
+SNIFF_BYTES = 16
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_UPLOAD_LIMITS = {
+    'IMAGE': 10 * 1024 * 1024,  # 10MB
+    'VIDEO': 50 * 1024 * 1024,  # 50MB
+}
+
+
+def sniff(header):
+    """Detect (mime, kind, extension) from the first bytes of a file, or None"""
+    for offset, magic, mime, kind, ext in SIGNATURES:
+        if header[offset:offset + len(magic)] == magic:
+            return mime, kind, ext
+
+    # RIFF containers: WebP images and AVI videos
+    if header[:4] == b'RIFF':
+        if header[8:12] == b'WEBP':
+            return 'image/webp', 'IMAGE', 'webp'
+        if header[8:12] == b'AVI ':
+            return 'video/x-msvideo', 'VIDEO', 'avi'
+
+    # ISO base media (MP4/MOV): size(4) + 'ftyp' + brand(4)
+    if header[4:8] == b'ftyp':
+        if header[8:12] == b'qt  ':
+            return 'video/quicktime', 'VIDEO', 'mov'
+        if header[8:12] in MP4_BRANDS:
+            return 'video/mp4', 'VIDEO', 'mp4'
+
+    return None
+
+
+class IngestStream:
+    """Writable upload container used by the multipart parser.
+
+    Bytes are written to a temp file in chunks as they arrive, so memory per
+    upload stays constant. While streaming it sniffs the file type from magic
+    bytes, hashes the content and enforces the per-type size limit, raising
+    RequestEntityTooLarge as soon as a file goes over its limit.
+    """
+
+    def __init__(self, temp_dir, limits):
+        os.makedirs(temp_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix='upload_', dir=temp_dir)
+        self._file = os.fdopen(fd, 'w+b')
+        self._limits = limits
+        self._header = b''
+        self._hash = hashlib.sha256()
+        self.size = 0
+        self.mime = None
+        self.kind = None
+        self.extension = None
+        self.rejected = None  # reason the upload was discarded, if any
+        self._moved = False
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+    @property
+    def is_accepted(self):
+        return self.kind is not None and self.rejected is None
+
+    def _sniff(self, data):
+        self._header += data[:SNIFF_BYTES - len(self._header)]
+        if len(self._header) < SNIFF_BYTES:
+            return
+        detected = sniff(self._header)
+        if detected:
+            self.mime, self.kind, self.extension = detected
+        else:
+            self._reject('unsupported_type')
+
+    def _reject(self, reason):
+        self.rejected = reason
+        self._file.seek(0)
+        self._file.truncate()
+
+    def write(self, data):
+        if self.rejected:
+            return len(data)  # drain without storing
+
+        if self.kind is None:
+            self._sniff(data)
+            if self.rejected:
+                return len(data)
+
+        self.size += len(data)
+        limit = self._limits.get(self.kind) if self.kind else max(self._limits.values())
+        if limit and self.size > limit:
+            self._reject('too_large')
+            self.close()  # the parser drops this container when it aborts
+            raise RequestEntityTooLarge(
+                f"{self.kind.title() if self.kind else 'File'} uploads are limited to {limit // (1024 * 1024)}MB.")
+
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def finalize(self):
+        """Classify files shorter than the sniff window once writing is done"""
+        if self.kind is None and not self.rejected:
+            detected = sniff(self._header)
+            if detected:
+                self.mime, self.kind, self.extension = detected
+            else:
+                self._reject('unsupported_type')
+
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def readline(self, *args):
+        return self._file.readline(*args)
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def move_to(self, destination):
+        """Move the spooled file into place without copying it through Python"""
+        self._file.flush()
+        os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+        try:
+            os.replace(self.path, destination)
+        except OSError:
+            shutil.move(self.path, destination)
+        self._moved = True
+        self._file.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self._moved:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class IngestRequest(Request):
+    """Request class that streams file parts into IngestStream containers.
+
+    Every container is remembered, so the temp files of earlier parts are
+    removed at the end of the request even when a later part aborts parsing
+    (RequestEntityTooLarge) before request.files is built.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not has_app_context():
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        stream = IngestStream(UploadService.temp_dir(), UploadService.limits())
+        self.__dict__.setdefault('_ingest_streams', []).append(stream)
+        return stream
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for stream in self.__dict__.pop('_ingest_streams', ()):
+                stream.close()
+
+
+class UploadService:
+    @staticmethod
+    def limits():
+        return current_app.config.get('UPLOAD_LIMITS', DEFAULT_UPLOAD_LIMITS)
+
+    @staticmethod
+    def temp_dir():
+        return current_app.config.get('UPLOAD_TEMP_FOLDER') or os.path.join(
+            current_app.root_path, 'uploads', '.incoming')
+
+    @staticmethod
+    def inspect(file_storage):
+        """Return the IngestStream for an uploaded file.
+
+        Files that did not come through IngestRequest (e.g. built by hand in a
+        script) are streamed into a new IngestStream in CHUNK_SIZE pieces.
+        """
+        stream = file_storage.stream
+        if not isinstance(stream, IngestStream):
+            ingest = IngestStream(UploadService.temp_dir(), UploadService.limits())
+            stream.seek(0)
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                ingest.write(chunk)
+            ingest.seek(0)
+            file_storage.stream = stream = ingest
+        stream.finalize()
+        return stream
+
+    @staticmethod
+    def accept(file_storage, kinds=('IMAGE', 'VIDEO')):
+        """Return the IngestStream if the upload is one of `kinds`, else None"""
+        if not file_storage or not file_storage.filename:
+            return None
+        upload = UploadService.inspect(file_storage)
+        if not upload.is_accepted or upload.kind not in kinds:
+            return None
+        return upload